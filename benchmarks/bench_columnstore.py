@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+# Compare getting tracks from a memory-mapped column store against parsing their pages.
+#
+# Usage: python benchmarks/bench_columnstore.py [EVENTS] [ROWS]
+
+import os, sys, time, shutil, tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper import columnstore
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests import synthetic
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return (time.perf_counter() - start) * 1000, result
+
+def main(argv):
+    events = int(argv[1]) if len(argv) > 1 else 1000
+    rows = int(argv[2]) if len(argv) > 2 else 200
+    pages = [(date(2000, 1, 1) + timedelta(days=180 * i), synthetic.path_page(rows, start_lon=(37.0 * i) % 360 - 180))
+             for i in range(events)]
+
+    def parse_all():
+        tracks = []
+        for day, page in pages:
+            track = EclipseTrack(day)
+            track.loadFromRawHTML(page)
+            tracks.append(track)
+        return tracks
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'tracks.store')
+        parse_ms, tracks = timed(parse_all)
+        write_ms, _ = timed(lambda: columnstore.write_store(tracks, path))
+        open_ms, store = timed(lambda: columnstore.ColumnStore(path))
+        get_ms, _ = timed(lambda: [store.get(day) for day, page in pages])
+        print('%d events of %d rows, store of %.1f MB' % (events, rows, os.path.getsize(path) / 1e6))
+        print('%28s %10.1f ms' % ('parse every page', parse_ms))
+        print('%28s %10.1f ms' % ('write store', write_ms))
+        print('%28s %10.3f ms' % ('open store', open_ms))
+        print('%28s %10.1f ms' % ('get every track from store', get_ms))
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,49 @@
+#!/usr/bin/python
+
+# Compare the size and generation time of CZML documents with full ISO timestamps on every sample
+# against the compact encoding (epoch plus relative seconds), with and without rounded coordinates.
+#
+# Usage: python benchmarks/bench_czml.py [ROWS ...]
+
+import io, os, sys, json, time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests import synthetic
+
+MODES = (('czml()', lambda t: json.dumps(t.czml())),
+         ('write_czml', lambda t: write(t)),
+         ('compact', lambda t: write(t, compact=True)),
+         ('compact, 3dp', lambda t: write(t, compact=True, precision=3)),
+         ('compact, 2dp', lambda t: write(t, compact=True, precision=2)))
+
+def write(track, **options):
+    out = io.StringIO()
+    track.write_czml(out, **options)
+    return out.getvalue()
+
+def best(run, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main(argv):
+    sizes = [int(a) for a in argv[1:]] or [100, 1000, 10000]
+    print('%8s %14s %12s %8s %10s' % ('rows', 'mode', 'bytes', 'size', 'time (ms)'))
+    for rows in sizes:
+        track = EclipseTrack(date(2030, 6, 1))
+        track.loadFromRawHTML(synthetic.path_page(rows, step=max(1, 86000 // rows)))
+        base = None
+        for name, run in MODES:
+            elapsed, text = best(lambda: run(track))
+            size = len(text.encode('utf-8'))
+            base = base or size
+            print('%8d %14s %12d %7.1f%% %10.1f' % (rows, name, size, 100.0 * size / base, elapsed * 1000))
+
+if __name__ == '__main__':
+    main(sys.argv)
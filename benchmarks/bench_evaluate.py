@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+# Compare evaluating observers with EclipseTrack.evaluate against a per-point Python loop over
+# the central line (the approach it replaces).
+#
+# Usage: python benchmarks/bench_evaluate.py [POINTS] [ROWS] [PROCESSES]
+
+import os, sys, time
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from eclipsescraper.simplify import EARTH_RADIUS, unit_vectors
+from tests import synthetic
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return (time.perf_counter() - start) * 1000, result
+
+# Nearest central line sample and whether within half the path width, one point at a time
+def loop(track, lats, lons):
+    central = [(i, p) for i, p in enumerate(track.position['central']) if p is not None]
+    vertices = unit_vectors([p for i, p in central])
+    inside = []
+    for v in unit_vectors(np.stack([lons, lats], axis=1)):
+        nearest = max(range(len(central)), key=lambda k: float(vertices[k] @ v))
+        distance = np.arccos(min(1.0, float(vertices[nearest] @ v))) * EARTH_RADIUS
+        inside.append(distance <= track.path_width[central[nearest][0]] * 500)
+    return inside
+
+def main(argv):
+    points = int(argv[1]) if len(argv) > 1 else 1000000
+    rows = int(argv[2]) if len(argv) > 2 else 200
+    processes = int(argv[3]) if len(argv) > 3 else 1
+    track = EclipseTrack(date(2030, 1, 1))
+    track.loadFromRawHTML(synthetic.path_page(rows))
+    rng = np.random.RandomState(0)
+    lats, lons = rng.uniform(-60, 60, points), rng.uniform(-180, 180, points)
+
+    sample = min(points, 2000)
+    loop_ms, _ = timed(lambda: loop(track, lats[:sample], lons[:sample]))
+    evaluate_ms, result = timed(lambda: track.evaluate(lats, lons, processes=processes))
+    print('%d observers, %d rows, %d inside the path' % (points, rows, result['inside'].sum()))
+    print('%28s %10.1f ms (extrapolated from %d)' % ('python loop', loop_ms * points / sample, sample))
+    print('%28s %10.1f ms' % ('evaluate', evaluate_ms))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+# Compare loading saved pages by reading and decoding them whole (loadFromRawHTML) against
+# memory-mapping them and decoding only the <pre> block (loadFromFile).
+#
+# Usage: python benchmarks/bench_ingest.py [PAGES] [ROWS] [PADDING_KB]
+
+import os, sys, time, shutil, tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests import synthetic
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return (time.perf_counter() - start) * 1000, result
+
+def main(argv):
+    pages = int(argv[1]) if len(argv) > 1 else 200
+    rows = int(argv[2]) if len(argv) > 2 else 200
+    # NASA's pages carry markup, scripts and maps around the table
+    padding = '<!-- ' + 'x' * (int(argv[3]) if len(argv) > 3 else 64) * 1024 + ' -->\n'
+    directory = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(pages):
+            path = os.path.join(directory, 'SE2030Jan%02dTpath.html' % (i % 28 + 1) + str(i))
+            with open(path, 'w') as f:
+                f.write(padding + synthetic.path_page(rows) + padding)
+            paths.append(path)
+
+        def decode_whole():
+            for path in paths:
+                with open(path, encoding='utf-8', errors='ignore') as f:
+                    EclipseTrack(date(2030, 1, 1)).loadFromRawHTML(f.read())
+
+        def mapped():
+            for path in paths:
+                EclipseTrack(date(2030, 1, 1)).loadFromFile(path)
+
+        whole_ms, _ = timed(decode_whole)
+        mapped_ms, _ = timed(mapped)
+        print('%d pages of %d rows, %.1f MB' % (pages, rows, sum(os.path.getsize(p) for p in paths) / 1e6))
+        print('%28s %10.1f ms' % ('read, decode, partition', whole_ms))
+        print('%28s %10.1f ms' % ('loadFromFile', mapped_ms))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,58 @@
+#!/usr/bin/python
+
+# Report the memory held per waypoint by EclipseTrack's compact columns against plain lists.
+#
+# Usage: python benchmarks/bench_memory.py [PAGE] [STEP_SECONDS]
+
+import os, sys, json, tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper import storage
+from eclipsescraper.catalog import event_date
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'data', 'SE2015Mar20Tpath.html')
+COLUMNS = ('time', 'position', 'ms_diam_ratio', 'sun_altitude', 'sun_azimuth', 'path_width', 'central_line_duration')
+
+# Bytes still allocated after building the result of make()
+def allocated(make):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = make()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+def as_lists(text):
+    columns = json.loads(text)
+    columns['position'] = dict((key, [tuple(p) for p in points]) for key, points in columns['position'].items())
+    return columns
+
+def as_track(day, text):
+    track = EclipseTrack(day)
+    for attr, values in json.loads(text).items():
+        setattr(track, attr, values)
+    return track
+
+def main(argv):
+    page = argv[1] if len(argv) > 1 else DEFAULT_PAGE
+    step = float(argv[2]) if len(argv) > 2 else 1
+    track = EclipseTrack(event_date(page) or date(2000, 1, 1))
+    with open(page) as f:
+        track.loadFromRawHTML(f.read())
+    track = track.resample(step)
+    text = json.dumps(dict((attr, storage.plain(getattr(track, attr))) for attr in COLUMNS))
+
+    waypoints = len(track.time)
+    plain, _ = allocated(lambda: as_lists(text))
+    compact, _ = allocated(lambda: as_track(track.date, text))
+    print('%d waypoints' % waypoints)
+    print('%10s %12s %12s' % ('storage', 'bytes', 'per waypoint'))
+    print('%10s %12d %12.1f' % ('lists', plain, float(plain) / waypoints))
+    print('%10s %12d %12.1f' % ('columns', compact, float(compact) / waypoints))
+
+if __name__ == '__main__':
+    main(sys.argv)
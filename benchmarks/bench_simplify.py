@@ -0,0 +1,45 @@
+#!/usr/bin/python
+
+# Report polyline vertex and CZML size reduction against the error introduced by simplification.
+#
+# Usage: python benchmarks/bench_simplify.py [PAGE] [STEP_SECONDS]
+
+import os, sys, time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from eclipsescraper import simplify
+from eclipsescraper.catalog import event_date
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'data', 'SE2015Mar20Tpath.html')
+TOLERANCES = (None, 10, 100, 1000, 5000, 10000, 50000)
+
+def load(page, step):
+    track = EclipseTrack(event_date(page) or date(2000, 1, 1))
+    with open(page) as f:
+        track.loadFromRawHTML(f.read())
+    return track.resample(step)
+
+def main(argv):
+    page = argv[1] if len(argv) > 1 else DEFAULT_PAGE
+    step = float(argv[2]) if len(argv) > 2 else 10
+
+    rows = simplify.report(load(page, step), TOLERANCES)
+    base = rows[0]
+    print('%10s %10s %8s %12s %8s %14s %10s' % ('tolerance', 'vertices', 'kept', 'bytes', 'kept', 'max error (m)', 'time (ms)'))
+    for tolerance, row in zip(TOLERANCES, rows):
+        # report() memoized its documents on its own track, so each tolerance is timed on a fresh
+        # one, with the shadow ellipses shared by every tolerance computed beforehand
+        track = load(page, step)
+        track.getShadowEllipses()
+        start = time.perf_counter()
+        track.czml(tolerance=tolerance)
+        elapsed = (time.perf_counter() - start) * 1000
+        print('%10s %10d %7.1f%% %12d %7.1f%% %14.1f %10.1f' % (
+            'none' if tolerance is None else tolerance, row['vertices'], 100.0 * row['vertices'] / base['vertices'],
+            row['bytes'], 100.0 * row['bytes'] / base['bytes'], row['max_error'], elapsed))
+
+if __name__ == '__main__':
+    main(sys.argv)
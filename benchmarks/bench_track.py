@@ -0,0 +1,97 @@
+#!/usr/bin/python
+
+# Time the main stages of processing a path page on synthetic pages of several sizes, and record
+# the results so regressions are visible between commits.
+#
+# Each stage is run REPEAT times per size and the best time is kept. Results are appended as one
+# JSON line to benchmarks/results.jsonl (or --output; ignored by git) together with the current git
+# commit, and compared against the last recorded run.
+#
+# Usage: python benchmarks/bench_track.py [--sizes 100,1000,10000] [--repeat 5] [--output FILE]
+
+import os, sys, json, time, argparse, platform, subprocess
+from datetime import date, datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests import synthetic
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.jsonl')
+STAGES = ('loadFromRawHTML', 'parseHTML', 'czml', 'getRegions', 'json', 'czml_memoized')
+DATE = date(2030, 6, 1)
+
+def best(repeat, setup, run):
+    times = []
+    for _ in range(repeat):
+        value = setup()
+        start = time.perf_counter()
+        run(value)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def loaded(page):
+    track = EclipseTrack(DATE)
+    track.loadFromRawHTML(page)
+    return track
+
+# Best time in seconds of every stage for a synthetic page with the given number of rows
+def bench(rows, repeat):
+    page = synthetic.path_page(rows, step=max(1, 86000 // max(rows, 1)))
+    table = page.partition('<pre>')[2].partition('</pre>')[0].strip()
+    track = loaded(page)
+    return {
+        'loadFromRawHTML': best(repeat, lambda: EclipseTrack(DATE), lambda t: t.loadFromRawHTML(page)),
+        'parseHTML': best(repeat, lambda: EclipseTrack(DATE), lambda t: t.parseHTML(table)),
+        # Derived results are memoized on the track, so these start from a freshly loaded one
+        'czml': best(repeat, lambda: loaded(page), lambda t: t.czml()),
+        'getRegions': best(repeat, lambda: loaded(page), lambda t: t.getRegions()),
+        'json': best(repeat, lambda: loaded(page), lambda t: t.json()),
+        'czml_memoized': best(repeat, lambda: track, lambda t: t.czml()),
+    }
+
+def commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def last_run(path):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+def main(argv):
+    options = argparse.ArgumentParser(description='Benchmark eclipsescraper stages on synthetic path pages')
+    options.add_argument('--sizes', default='100,1000,10000', help='comma-separated numbers of rows')
+    options.add_argument('--repeat', type=int, default=5)
+    options.add_argument('--output', default=DEFAULT_OUTPUT, help='JSON lines file to append results to')
+    args = options.parse_args(argv[1:])
+
+    previous = last_run(args.output)
+    run = {'commit': commit(), 'time': datetime.utcnow().isoformat() + 'Z',
+           'python': platform.python_version(), 'repeat': args.repeat, 'results': {}}
+
+    print('%8s %16s %12s %10s' % ('rows', 'stage', 'time (ms)', 'vs last'))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        results = bench(size, args.repeat)
+        run['results'][str(size)] = results
+        for stage in STAGES:
+            before = previous and previous['results'].get(str(size), {}).get(stage)
+            change = '%+9.1f%%' % (100.0 * (results[stage] - before) / before) if before else '%10s' % '-'
+            print('%8d %16s %12.3f %s' % (size, stage, results[stage] * 1000, change))
+
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run, sort_keys=True) + '\n')
+    if previous:
+        print('compared with %s (%s)' % (previous.get('commit'), previous.get('time')))
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+# Pluggable backends for the parts of EclipseTrack that need third-party or heavyweight modules.
+#
+# Parsing needs nothing beyond the standard library (NumPy, when installed, only speeds up converting
+# long tables; see parser.py); fetching pages, geodesics and building CZML documents are delegated
+# to backends that are only imported the first time they are used. Each kind of backend has several
+# named implementations, tried in order until one imports, unless one is chosen with use():
+#
+#   fetch    "urllib" (urllib.request), "requests" - http(s) URLs; local paths and file:// URLs
+#            are always read by "file". A fetcher takes a URL and returns (status, binary stream).
+#   geodesy  "builtin" (geodesy.py, vectorized Vincenty) or "geographiclib" (Karney's geodesics, as
+#            used by geopy). An implementation is inverse(lat1, lon1, lat2, lon2) over arrays, as
+#            geodesy.inverse.
+#   czml     "builtin" (czmlwriter.py) or, when chosen with use(), "czml" (the czml package, same
+#            output but slower). An implementation takes (track, tolerance) and returns the CZML
+#            document as a list of packets.
+#
+# Other implementations can be added with register(kind, name, loader), where loader is a function
+# returning the implementation.
+
+import re
+
+def _urllib():
+    import urllib.request
+    def fetch(url):
+        r = urllib.request.urlopen(url)
+        return r.status, r
+    return fetch
+
+def _requests():
+    import requests
+    def fetch(url):
+        r = requests.get(url, stream=True)
+        r.raw.decode_content = True
+        return r.status_code, r.raw
+    return fetch
+
+def _file():
+    def fetch(url):
+        return 200, open(re.sub(r'^file://', '', url), 'rb')
+    return fetch
+
+def _builtin_geodesy():
+    from . import geodesy
+    return geodesy.inverse
+
+def _geographiclib():
+    import math
+    import numpy as np
+    from geographiclib.geodesic import Geodesic
+    def inverse(lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (lat1, lon1, lat2, lon2)])
+        results = [Geodesic.WGS84.Inverse(*pair) for pair in
+                   zip(lat1.ravel().tolist(), lon1.ravel().tolist(), lat2.ravel().tolist(), lon2.ravel().tolist())]
+        distance = np.array([r['s12'] for r in results], dtype=float).reshape(lat1.shape)
+        initial = np.radians(np.array([r['azi1'] for r in results], dtype=float)).reshape(lat1.shape)
+        final = np.radians(np.array([r['azi2'] for r in results], dtype=float)).reshape(lat1.shape)
+        return distance, np.mod(initial, 2 * math.pi), np.mod(final, 2 * math.pi)
+    return inverse
+
+def _czml_library():
+    from . import metrics
+    def document(track, tolerance=None):
+        doc = track.czml_document(tolerance)
+        with metrics.timer(track._metrics(), 'czml_serialize'):
+            return list(doc.data())
+    czml_library()
+    return document
+
+def _builtin_czml():
+    import json
+    from . import czmlwriter
+    def document(track, tolerance=None):
+        return json.loads(''.join(czmlwriter.iter_czml(track, tolerance)))
+    return document
+
+_registry = {'fetch':   [('urllib', _urllib), ('requests', _requests), ('file', _file)],
+             'geodesy': [('builtin', _builtin_geodesy), ('geographiclib', _geographiclib)],
+             'czml':    [('czml', _czml_library), ('builtin', _builtin_czml)]}
+_defaults = {'fetch': ('urllib', 'requests'), 'geodesy': ('builtin',), 'czml': ('builtin',)}
+_selected = {}
+_loaded = {}
+
+def register(kind, name, loader):
+    _registry.setdefault(kind, []).append((name, loader))
+
+def names(kind):
+    return [name for name, loader in _registry[kind]]
+
+# Choose the implementation used for a kind of backend (None goes back to the defaults)
+def use(kind, name):
+    if name is not None and name not in names(kind):
+        raise Exception('Unknown ' + kind + ' backend: ' + name)
+    _selected[kind] = name
+
+# Names of the implementations chosen with use() for kinds of backends (None where the defaults
+# apply), so that results built with different backends are memoized apart
+def chosen(*kinds):
+    return tuple(_selected.get(kind) for kind in kinds)
+
+# Load (on first use) and return an implementation: the named one, else the one chosen with use(),
+# else the first of the defaults that can be imported
+def get(kind, name=None):
+    name = name or _selected.get(kind)
+    candidates = (name,) if name else _defaults[kind]
+    for candidate in candidates:
+        if (kind, candidate) in _loaded:
+            return _loaded[(kind, candidate)]
+        loader = dict(_registry[kind]).get(candidate)
+        if loader is None:
+            raise Exception('Unknown ' + kind + ' backend: ' + candidate)
+        try:
+            implementation = loader()
+        except ImportError:
+            if name:
+                raise
+            continue
+        _loaded[(kind, candidate)] = implementation
+        return implementation
+    raise Exception('No ' + kind + ' backend available (tried ' + ', '.join(candidates) + ')')
+
+# Fetcher for a URL: local paths and file:// URLs are read directly
+def fetcher(url):
+    if re.match(r'https?://', url):
+        return get('fetch')
+    return get('fetch', 'file')
+
+# The czml package's module holding its classes, imported on first use
+def czml_library():
+    try:
+        from czml import czml
+    except ImportError:
+        import czml
+    return czml
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+
+# Incremental conversion of a directory of saved path pages.
+#
+# Every page under the source directory whose file name matches EVENT_FILENAME is converted to
+# <iso>.czml and <iso>.json in the destination directory, and manifest.json and index.bin list the
+# metadata of all events (as catalog.convert_catalog does). A build manifest records the content hash of every
+# page and the library version that converted it, so a rebuild only converts pages that are new,
+# changed, missing their outputs or were converted by another version of the library. Outputs of
+# pages that have disappeared are removed. A page that fails to convert is reported and left out of
+# the manifests (so the next build tries it again) without stopping the others.
+
+import os, json, hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import __version__
+from .catalog import event_date, convert_shard
+from . import catalogindex
+
+BUILD_MANIFEST = 'build-manifest.json'
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# The package version plus a digest of its sources, so local changes also trigger rebuilds
+def library_version():
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(PACKAGE_DIR)):
+        if name.endswith('.py') or name.endswith('.json'):
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(PACKAGE_DIR, name), 'rb') as f:
+                digest.update(f.read())
+    return __version__ + '+' + digest.hexdigest()[:12]
+
+# Saved pages under src as {path relative to src: date}
+def find_pages(src):
+    pages = {}
+    for directory, _, names in os.walk(src):
+        for name in names:
+            date = event_date(name)
+            if date is not None:
+                pages[os.path.relpath(os.path.join(directory, name), src)] = date
+    return pages
+
+def load_manifest(dest):
+    try:
+        with open(os.path.join(dest, BUILD_MANIFEST)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {'version': None, 'pages': {}}
+
+# Convert the pages under src that need it into dest. Returns {'built': [...], 'unchanged': [...],
+# 'removed': [...], 'failed': {path: error}} listing page paths relative to src.
+def build(src, dest, processes=None, force=False):
+    os.makedirs(dest, exist_ok=True)
+    pages = find_pages(src)
+    dates = sorted(pages.values())
+    for previous, date in zip(dates, dates[1:]):
+        if previous == date:
+            raise Exception('Duplicate event dates in ' + src + ': ' + date.isoformat())
+
+    version = library_version()
+    manifest = load_manifest(dest)
+    previous = manifest['pages'] if manifest['version'] == version and not force else {}
+    hashes = dict((path, file_hash(os.path.join(src, path))) for path in pages)
+
+    def up_to_date(path):
+        entry = previous.get(path)
+        return (entry is not None and entry['sha256'] == hashes[path] and
+                all(os.path.exists(os.path.join(dest, entry['event'][key])) for key in ('czml', 'json')))
+
+    changed = sorted(path for path in pages if not up_to_date(path))
+    entries = dict((path, previous[path]) for path in pages if path not in changed)
+    failed = {}
+    if changed:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = dict((executor.submit(convert_shard, (pages[path], os.path.join(src, path), dest)), path)
+                           for path in changed)
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    entries[path] = {'sha256': hashes[path], 'event': future.result()}
+                except Exception as e:
+                    failed[path] = str(e) or e.__class__.__name__
+
+    # Remove outputs of pages that are gone, unless another page now writes the same files
+    removed = sorted(path for path in manifest['pages'] if path not in pages)
+    kept = set(entry['event'][key] for entry in entries.values() for key in ('czml', 'json'))
+    for path in removed:
+        for key in ('czml', 'json'):
+            output = manifest['pages'][path]['event'][key]
+            if output not in kept and os.path.exists(os.path.join(dest, output)):
+                os.remove(os.path.join(dest, output))
+
+    events = sorted((entry['event'] for entry in entries.values()), key=lambda event: event['iso'])
+    with open(os.path.join(dest, 'manifest.json'), 'w') as f:
+        json.dump(events, f)
+    catalogindex.write_index(events, os.path.join(dest, 'index.bin'))
+    with open(os.path.join(dest, BUILD_MANIFEST), 'w') as f:
+        json.dump({'version': version, 'pages': entries}, f, indent=1, sort_keys=True)
+
+    return {'built': [path for path in changed if path not in failed],
+            'unchanged': sorted(path for path in pages if path not in changed), 'removed': removed, 'failed': failed}
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+
+# Persistent on-disk cache of fetched pages.
+#
+# Each cached URL is stored as a body file plus a small JSON metadata file (URL, ETag, Last-Modified)
+# named by a hash of the URL. Cached entries are revalidated with conditional requests so unchanged
+# pages cost a 304 instead of a download, the least recently used entries are evicted once the cache
+# grows beyond max_size bytes, and in offline mode the network is never touched at all. Pages
+# served from disk count as hits, whether read offline or revalidated with a 304 (also counted in
+# revalidated); downloads count as misses.
+
+import os, json, hashlib, threading
+
+from .fetch import ConnectionPool
+
+class HTTPCache:
+
+    def __init__(self, directory, max_size=256*1024*1024, offline=False, pool=None):
+        self.directory = directory
+        self.max_size = max_size
+        self.offline = offline
+        # Created up front: fetch() is called from several threads at once (see fetch.load_tracks)
+        self.pool = ConnectionPool() if pool is None else pool
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(self._path(key, '.body')) for key in self._keys())
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _keys(self):
+        return [name[:-5] for name in os.listdir(self.directory) if name.endswith('.body')]
+
+    def _write(self, path, data):
+        tmp = path + '.' + str(threading.get_ident()) + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # Return (metadata, body) for a cached URL, or None
+    def get(self, url):
+        key = self._key(url)
+        try:
+            with open(self._path(key, '.json')) as f:
+                meta = json.load(f)
+            with open(self._path(key, '.body'), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return meta, body
+
+    # Mark an entry as recently used (entry recency is tracked with the body file's mtime)
+    def touch(self, url):
+        try:
+            os.utime(self._path(self._key(url), '.body'))
+        except OSError:
+            pass
+
+    def put(self, url, body, etag=None, last_modified=None):
+        key = self._key(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified}
+        with self._lock:
+            body_path = self._path(key, '.body')
+            old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            self._write(body_path, body)
+            self._write(self._path(key, '.json'), json.dumps(meta).encode('utf-8'))
+            self.size += len(body) - old_size
+            self.evict(keep=key)
+
+    # Remove least recently used entries until the cache fits in max_size
+    def evict(self, keep=None):
+        if self.size <= self.max_size:
+            return
+        entries = []
+        for key in self._keys():
+            try:
+                stat = os.stat(self._path(key, '.body'))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, key, stat.st_size))
+        for mtime, key, size in sorted(entries):
+            if self.size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            for suffix in ('.body', '.json'):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+            self.size -= size
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    # Return the body of a URL, from the cache when it is still valid and from the network otherwise
+    def fetch(self, url):
+        cached = self.get(url)
+        if self.offline:
+            if cached is None:
+                raise Exception('URL not in cache (offline): ' + url)
+            self._count(hits=1)
+            self.touch(url)
+            return cached[1]
+
+        headers = {}
+        if cached is not None:
+            meta = cached[0]
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        status, response_headers, body = self.pool.request(url, headers)
+        if status == 304 and cached is not None:
+            self._count(hits=1, revalidated=1)
+            self.touch(url)
+            return cached[1]
+        if status != 200:
+            raise Exception('Unable to load URL: ' + url + ' (HTTP ' + str(status) + ')')
+        self._count(misses=1)
+        self.put(url, body, response_headers.get('ETag'), response_headers.get('Last-Modified'))
+        return body
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+# Conversion of many eclipse events at once.
+#
+# Each event is loaded, parsed and serialized (CZML and JSON metadata) in a worker process. Output is
+# either one shard per event plus a manifest, or a single combined CZML document holding the packets
+# of every event under one document packet (packet ids are prefixed with the event date, so they
+# don't clash between events).
+
+import os, re, json, shutil, tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from .eclipsescraper import EclipseTrack
+from . import czmlwriter, catalogindex
+
+# Match the file names NASA uses for path tables, e.g. SE2017Aug21Tpath.html
+EVENT_FILENAME = re.compile(r'SE(\d{4})([A-Z][a-z]{2})(\d{2})([ATH])path\.html$')
+
+# Infer the date of an event from the file name of its path table (None if it doesn't match)
+def event_date(path):
+    match = EVENT_FILENAME.search(path)
+    if match is None:
+        return None
+    return datetime.strptime(''.join(match.group(1, 2, 3)), '%Y%b%d').date()
+
+# Load a track from a saved page or a URL
+def load_event(date, source):
+    track = EclipseTrack(date)
+    if re.match(r'https?://', source):
+        track.loadFromURL(source)
+    else:
+        track.loadFromFile(source)
+    return track
+
+# Worker: write one shard per event and return its manifest entry
+def convert_shard(args):
+    date, source, dest = args
+    track = load_event(date, source)
+    iso = track.date.isoformat()
+    entry = catalogindex.summary(track)
+    entry['czml'] = iso + '.czml'
+    entry['json'] = iso + '.json'
+    with open(os.path.join(dest, entry['czml']), 'w') as f:
+        track.write_czml(f)
+    with open(os.path.join(dest, entry['json']), 'w') as f:
+        json.dump(track.json(), f)
+    return entry
+
+# Worker: return the JSON metadata, the clock interval and the serialized packets of one event
+def _convert_packets(args):
+    date, source = args
+    track = load_event(date, source)
+    start_time = track.timestamp(track.time[0])
+    end_time = track.timestamp(track.time[-1])
+    return catalogindex.summary(track), start_time, end_time, ''.join(czmlwriter.iter_packets(track))
+
+# Convert events given as (date, path or URL) pairs into dest (a directory, created if missing).
+# With combined=False, writes <iso>.czml and <iso>.json per event and a manifest.json listing them;
+# with combined=True, writes catalog.czml holding all events and catalog.json with their metadata.
+# Either way index.bin holds the same metadata for partial reads (see catalogindex.py). Returns the
+# list of metadata objects (catalogindex.summary), ordered by date.
+def convert_catalog(events, dest, combined=False, processes=None, chunksize=1):
+    os.makedirs(dest, exist_ok=True)
+    events = sorted(events)
+    dates = [e[0] for e in events]
+    if len(set(dates)) != len(dates):
+        raise Exception('Duplicate event dates in catalog')
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        if not combined:
+            manifest = list(executor.map(convert_shard, [(d, s, dest) for d, s in events], chunksize=chunksize))
+            with open(os.path.join(dest, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f)
+            catalogindex.write_index(manifest, os.path.join(dest, 'index.bin'))
+            return manifest
+
+        # The clock interval is only known once every event has been parsed, so packets are
+        # spooled to a temporary file and copied in after the document packet
+        metadata = []
+        start_time = end_time = None
+        with tempfile.TemporaryFile('w+') as spool:
+            for meta, event_start, event_end, packets in executor.map(_convert_packets, events, chunksize=chunksize):
+                if start_time is None:
+                    start_time = event_start
+                end_time = event_end
+                spool.write(', ' + packets)
+                metadata.append(meta)
+            spool.seek(0)
+            with open(os.path.join(dest, 'catalog.czml'), 'w') as f:
+                f.write('[')
+                if start_time is not None:
+                    f.write(json.dumps(czmlwriter.document_packet(start_time, end_time)))
+                    shutil.copyfileobj(spool, f)
+                f.write(']')
+
+        with open(os.path.join(dest, 'catalog.json'), 'w') as f:
+            json.dump(metadata, f)
+        catalogindex.write_index(metadata, os.path.join(dest, 'index.bin'))
+        return metadata
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+
+# Precomputed index of event metadata for serving a catalog without parsing any track.
+#
+# summary() computes everything a catalog front page needs for one track: the json() metadata
+# (iso, type, camera position, regions) plus the bounding box of the path, its start and end, its
+# duration, the longest central line duration and the widest path. An index file holds the
+# summaries of many events in a compact binary layout:
+#
+#   header   b'ESIX', format version (uint16), number of events (uint32)
+#   table    one fixed-size entry per event, sorted by date: ISO date (10 bytes), offset (uint64)
+#            and length (uint32) of its record
+#   records  the summaries as compact JSON
+#
+# CatalogIndex memory-maps the file and only decodes what is asked for: event i is found in O(1)
+# from the table, an event by date with a binary search over the table.
+
+import json, mmap, struct
+from concurrent.futures import ProcessPoolExecutor
+
+from . import parser
+
+MAGIC = b'ESIX'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHI')
+ENTRY = struct.Struct('<10sQI')
+
+# Smallest (west, south, east, north) box holding every position of the track. When the path
+# crosses the antimeridian, west is greater than east.
+def bounding_box(track):
+    import numpy as np
+    points = np.concatenate([track.position[key].array() for key in ('north', 'south', 'central')] +
+                            [np.array([p for p in track.limits[key] if p is not None], dtype=float).reshape(-1, 2)
+                             for key in ('north', 'south', 'central')])
+    points = points[~np.isnan(points[:,0])]
+    if len(points) == 0:
+        return None
+    lons = np.sort(points[:,0])
+    # The box spans the circle except for the largest gap between consecutive longitudes
+    gaps = np.append(np.diff(lons), lons[0] + 360 - lons[-1])
+    gap = int(np.argmax(gaps))
+    west, east = (lons[0], lons[-1]) if gap == len(lons) - 1 else (lons[gap + 1], lons[gap])
+    return [float(west), float(points[:,1].min()), float(east), float(points[:,1].max())]
+
+# Catalog metadata for a track (see the description above)
+def summary(track):
+    entry = track.json()
+    entry['bbox'] = bounding_box(track)
+    times = [parser.seconds(time) for time in track.time]
+    if times:
+        entry['start'] = track.timestamp(track.time[0])
+        entry['end'] = track.timestamp(track.time[-1])
+        # Times wrap around at midnight
+        entry['duration'] = sum((b - a) % 86400 for a, b in zip(times, times[1:]))
+    durations = [parser.duration_seconds(d) for d in track.central_line_duration]
+    durations = [d for d in durations if d is not None]
+    entry['max_central_line_duration'] = max(durations) if durations else None
+    widths = [w for w in track.path_width if w is not None]
+    entry['max_path_width'] = max(widths) if widths else None
+    return entry
+
+def write_index(records, path):
+    records = sorted(records, key=lambda record: record['iso'])
+    encoded = [json.dumps(record, separators=(',', ':'), sort_keys=True).encode('utf-8') for record in records]
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records)))
+        offset = HEADER.size + ENTRY.size * len(records)
+        for record, data in zip(records, encoded):
+            f.write(ENTRY.pack(record['iso'].encode('ascii'), offset, len(data)))
+            offset += len(data)
+        for data in encoded:
+            f.write(data)
+
+def _summary(args):
+    from .catalog import load_event
+    return summary(load_event(*args))
+
+# Build an index file from events given as (date, path or URL) pairs, parsing them in parallel
+def build_index(events, path, processes=None):
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        records = list(executor.map(_summary, events))
+    write_index(records, path)
+    return records
+
+class CatalogIndex:
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self.data = b''
+        if len(self.data) < HEADER.size:
+            self.close()
+            raise Exception('Not a catalog index: ' + path)
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise Exception('Not a catalog index (or unsupported version): ' + path)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, i):
+        iso, offset, length = ENTRY.unpack_from(self.data, HEADER.size + ENTRY.size * i)
+        return iso.decode('ascii'), offset, length
+
+    def iso(self, i):
+        return self.entry(i)[0]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('catalog index out of range')
+        iso, offset, length = self.entry(i)
+        return json.loads(self.data[offset:offset+length].decode('utf-8'))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    # Summary of the event on a date (a date or an ISO string), or None
+    def get(self, day):
+        iso = day if isinstance(day, str) else day.isoformat()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.iso(middle) < iso:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.iso(low) == iso:
+            return self[low]
+        return None
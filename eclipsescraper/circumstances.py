@@ -0,0 +1,156 @@
+#!/usr/bin/python
+
+# Local circumstances of an eclipse for many observers at once.
+#
+# Each observer is matched to the nearest point of the central line, found on the sphere among all
+# segments between consecutive central line samples: the cross-track distance where the observer is
+# abreast of a segment, else the distance to its nearer end. Values along the central line (time,
+# central line duration, sun altitude and the distances out to the northern and southern limits)
+# are interpolated linearly at that point. An observer is inside the path when closer to the
+# central line than the limit on its side (or half the path width where that limit is missing),
+# and the local duration is estimated as D * sqrt(1 - (d / w)**2) for a central line duration D,
+# distance d and distance w from the central line to the limit.
+#
+# Observers are processed in chunks sized so that the (observers x segments) work arrays stay
+# around CHUNK_ELEMENTS values, so memory is bounded however many observers are given. Chunks are
+# evaluated in-process unless a number of worker processes greater than one is given.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .interpolate import sample_seconds
+from .simplify import EARTH_RADIUS, unit_vectors
+
+# Target size of the per-chunk (observers x segments) arrays
+CHUNK_ELEMENTS = 1 << 19
+
+FIELDS = ('distance', 'inside', 'seconds', 'central_line_duration', 'duration', 'sun_altitude')
+
+def _column(column):
+    return np.array(column.values, dtype=float)
+
+# The central line of a track as arrays, ready to evaluate observers against (and small to pickle)
+class CentralLine:
+
+    def __init__(self, track):
+        central = track.position['central'].array()
+        keep = np.flatnonzero(~np.isnan(central[:,0]))
+        vertices = unit_vectors(central[keep])
+        # Repeated positions would make zero-length segments
+        distinct = np.concatenate([[True], np.abs(vertices[1:] - vertices[:-1]).max(axis=1) > 1e-12])
+        keep, vertices = keep[distinct], vertices[distinct]
+        if len(keep) < 2:
+            raise Exception('Not enough central line positions to evaluate: ' + track.date.isoformat())
+
+        self.seconds = sample_seconds(track.time)[keep]
+        self.central_line_duration = _column(track.central_line_duration)[keep]
+        self.sun_altitude = _column(track.sun_altitude)[keep]
+        half_width = _column(track.path_width)[keep] * 500
+
+        self.start, self.end = vertices[:-1], vertices[1:]
+        normal = np.cross(self.start, self.end)
+        self.normal = normal / np.linalg.norm(normal, axis=1)[:,None]
+        self.toward_end = np.cross(self.normal, self.start)
+        self.before_end = np.cross(self.end, self.normal)
+        self.length = np.arccos(np.clip((self.start * self.end).sum(axis=1), -1, 1))
+
+        # Cross-track distances from the central line out to each limit, and on which side of the
+        # line north lies (the last sample uses the last segment)
+        normals = np.concatenate([self.normal, self.normal[-1:]])
+        sines = {}
+        for key in ('north', 'south'):
+            sines[key] = (unit_vectors(track.position[key].array()[keep]) * normals).sum(axis=1)
+        self.north_offset, self.south_offset = [
+            np.where(np.isnan(sines[key]), half_width, np.abs(np.arcsin(np.clip(sines[key], -1, 1))) * EARTH_RADIUS)
+            for key in ('north', 'south')]
+        self.north_side = np.where(np.isnan(sines['north'][:-1]), 1.0, np.sign(sines['north'][:-1]))
+
+    def segments(self):
+        return len(self.length)
+
+    def chunk_size(self):
+        return max(1, CHUNK_ELEMENTS // self.segments())
+
+    def _interpolate(self, values, segment, fraction):
+        return values[segment] + (values[segment + 1] - values[segment]) * fraction
+
+    # Circumstances for observers at lats, lons (degrees, 1-d arrays) as a dict of arrays (see evaluate)
+    def evaluate(self, lats, lons):
+        p = unit_vectors(np.stack([np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)], axis=1))
+        # Nearest segment without trigonometry: the largest cosine of the angular distance, which
+        # is sqrt(1 - sine**2) abreast of a segment and the dot product with an end beyond it
+        sine = p @ self.normal.T
+        abreast = ((p @ self.toward_end.T) >= 0) & ((p @ self.before_end.T) >= 0)
+        cosine = np.where(abreast, np.sqrt(np.clip(1 - sine ** 2, 0, 1)), np.maximum(p @ self.start.T, p @ self.end.T))
+        segment = np.argmax(cosine, axis=1)
+        rows = np.arange(len(p))
+        sine = sine[rows, segment]
+        # arcsin keeps its precision close to the central line, where arccos loses it
+        distance = np.where(abreast[rows, segment], np.arcsin(np.minimum(np.abs(sine), 1)),
+                            np.arccos(np.clip(cosine[rows, segment], -1, 1))) * EARTH_RADIUS
+        along = np.arctan2((p * self.toward_end[segment]).sum(axis=1), (p * self.start[segment]).sum(axis=1)) / self.length[segment]
+        fraction = np.clip(along, 0, 1)
+
+        north = sine * self.north_side[segment] > 0
+        limit = np.where(north, self._interpolate(self.north_offset, segment, fraction),
+                         self._interpolate(self.south_offset, segment, fraction))
+        beyond = ((segment == 0) & (along < 0)) | ((segment == self.segments() - 1) & (along > 1))
+        with np.errstate(invalid='ignore'):
+            inside = (distance <= limit) & ~beyond
+            central_line_duration = self._interpolate(self.central_line_duration, segment, fraction)
+            duration = np.where(inside, central_line_duration * np.sqrt(np.clip(1 - (distance / limit) ** 2, 0, 1)), 0.0)
+        return {'distance': distance,
+                'inside': inside,
+                'seconds': self._interpolate(self.seconds, segment, fraction),
+                'central_line_duration': central_line_duration,
+                'duration': np.where(np.isnan(central_line_duration), np.nan, duration),
+                'sun_altitude': self._interpolate(self.sun_altitude, segment, fraction)}
+
+def _evaluate(args):
+    line, lats, lons = args
+    return line.evaluate(lats, lons)
+
+# Generate (start, circumstances) for successive chunks of observers, spread over that many worker
+# processes if processes > 1
+def iter_evaluate(track, lats, lons, chunk_size=None, processes=None):
+    line = track if isinstance(track, CentralLine) else CentralLine(track)
+    lats = np.asarray(lats, dtype=float).ravel()
+    lons = np.asarray(lons, dtype=float).ravel()
+    if lats.shape != lons.shape:
+        raise Exception('lats and lons must have the same length')
+    chunk_size = chunk_size or line.chunk_size()
+    starts = range(0, len(lats), chunk_size)
+    if processes is None or processes <= 1 or len(starts) < 2:
+        for start in starts:
+            yield start, line.evaluate(lats[start:start+chunk_size], lons[start:start+chunk_size])
+        return
+    # Keep only a few chunks per worker in flight, so memory stays bounded
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        workers = processes
+        pending = []
+        for start in starts:
+            pending.append((start, executor.submit(_evaluate, (line, lats[start:start+chunk_size], lons[start:start+chunk_size]))))
+            if len(pending) >= 2 * workers:
+                start, future = pending.pop(0)
+                yield start, future.result()
+        for start, future in pending:
+            yield start, future.result()
+
+# Local circumstances of the eclipse of a track for observers at lats, lons (degrees). Returns a dict
+# of arrays with one value per observer:
+#
+#   distance               metres from the central line
+#   inside                 whether inside the path
+#   seconds                UT (seconds after midnight on the date of the eclipse, past 86400 after
+#                          midnight) when the central line passes abreast of the observer
+#   central_line_duration  central line duration (s) at that time
+#   duration               estimated local duration (s), 0 outside the path
+#   sun_altitude           sun altitude (degrees) on the central line at that time
+def evaluate(track, lats, lons, chunk_size=None, processes=None):
+    count = np.asarray(lats).size
+    results = dict((field, np.empty(count, dtype=bool if field == 'inside' else float)) for field in FIELDS)
+    for start, chunk in iter_evaluate(track, lats, lons, chunk_size, processes):
+        for field in FIELDS:
+            results[field][start:start+len(chunk[field])] = chunk[field]
+    return results
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+
+# Command line interface, installed as the "eclipsescraper" console script.
+#
+#   eclipsescraper build SRC DEST [--processes N] [--force]
+#   eclipsescraper serve SRC [--host HOST] [--port PORT] [--output-cache N]
+#   eclipsescraper export SRC OUT [--format geojson|kml] [--no-ellipses] [--segments N]
+#   eclipsescraper crawl URL [URL ...] DEST [--delay SECONDS] [--retries N]
+
+import sys, argparse
+
+from . import __version__
+
+def build(args):
+    from .build import build
+    result = build(args.src, args.dest, processes=args.processes, force=args.force)
+    for path in result['built']:
+        print('built   ' + path)
+    for path in result['removed']:
+        print('removed ' + path)
+    for path, error in sorted(result['failed'].items()):
+        print('failed  ' + path + ': ' + error)
+    print('%d built, %d unchanged, %d removed, %d failed' % (len(result['built']), len(result['unchanged']),
+                                                            len(result['removed']), len(result['failed'])))
+    return 1 if result['failed'] else 0
+
+def serve(args):
+    from .server import TrackStore, CZMLServer
+    if args.output_cache:
+        from . import outputcache
+        outputcache.enable(args.output_cache)
+    server = CZMLServer(TrackStore.from_directory(args.src), args.host, args.port, verbose=True)
+    print('Serving CZML for the pages in %s at %s' % (args.src, server.url('/events')))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+def export(args):
+    import os
+    from . import geoexport
+    from .build import find_pages
+    from .catalog import load_event
+    pages = sorted(find_pages(args.src).items(), key=lambda page: page[1])
+    # Pages are parsed one at a time as the output is written
+    tracks = (load_event(day, os.path.join(args.src, path)) for path, day in pages)
+    fmt = args.format or ('kml' if args.out.lower().endswith('.kml') else 'geojson')
+    write = geoexport.write_kml if fmt == 'kml' else geoexport.write_geojson
+    with open(args.out, 'w') as f:
+        write(tracks, f, not args.no_ellipses, args.segments)
+    print('exported %d events to %s' % (len(pages), args.out))
+    return 0
+
+def crawl(args):
+    from .crawler import Crawler
+    result = Crawler(args.urls, args.dest, delay=args.delay, retries=args.retries).crawl()
+    for url, error in sorted(result['failed'].items()):
+        print('failed  ' + url + ': ' + error)
+    print('%d path tables found, %d downloaded, %d failed' % (result['events'], result['downloaded'], len(result['failed'])))
+    return 1 if result['failed'] else 0
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='eclipsescraper', description="Convert NASA's eclipse path pages to CZML")
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    commands = parser.add_subparsers(dest='command')
+    command = commands.add_parser('build', help='convert saved *path.html pages in SRC to CZML and JSON in DEST, '
+                                                'skipping pages unchanged since the last build')
+    command.add_argument('src')
+    command.add_argument('dest')
+    command.add_argument('-j', '--processes', type=int, default=None, help='worker processes (default: one per CPU)')
+    command.add_argument('--force', action='store_true', help='convert every page, changed or not')
+    command.set_defaults(run=build)
+    command = commands.add_parser('serve', help='serve CZML for time windows of the saved pages in SRC over HTTP '
+                                                '(see server.py)')
+    command.add_argument('src')
+    command.add_argument('--host', default='127.0.0.1')
+    command.add_argument('--port', type=int, default=8000)
+    command.add_argument('--output-cache', type=int, default=0, metavar='N',
+                         help='keep the last N documents served in a process-wide cache (see outputcache.py)')
+    command.set_defaults(run=serve)
+    command = commands.add_parser('export', help='write the paths and shadow ellipses of the saved pages in SRC to '
+                                                 'a GeoJSON or KML file (see geoexport.py)')
+    command.add_argument('src')
+    command.add_argument('out')
+    command.add_argument('--format', choices=('geojson', 'kml'), help='default: from the extension of OUT')
+    command.add_argument('--no-ellipses', action='store_true', help='export the path polygons only')
+    command.add_argument('--segments', type=int, default=36, help='points on each ellipse outline (default: 36)')
+    command.set_defaults(run=export)
+    command = commands.add_parser('crawl', help='download the path tables linked from catalog index pages to DEST, '
+                                                'resuming an interrupted crawl (see crawler.py)')
+    command.add_argument('urls', nargs='+', metavar='URL')
+    command.add_argument('dest')
+    command.add_argument('--delay', type=float, default=1.0, help='seconds between requests to a host (default: 1)')
+    command.add_argument('--retries', type=int, default=4, help='retries of a failed request (default: 4)')
+    command.set_defaults(run=crawl)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error('a command is required')
+    return args
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    return args.run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
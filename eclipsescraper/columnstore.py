@@ -0,0 +1,192 @@
+#!/usr/bin/python
+
+# Single-file columnar store of many parsed tracks, read through a memory map.
+#
+# Every column of every track is stored in one contiguous fixed-type array (int64 seconds for times,
+# float64 for everything else, lon/lat interleaved for positions; native byte order), track after
+# track in date order.
+# Opening a store only reads its header; ColumnStore.get() then returns an EclipseTrack whose columns
+# are views of the mapped file (see storage.Column.view), so nothing is parsed or copied and worker
+# processes opening the same file share its pages through the OS cache. Tracks read from a store
+# are read-only: their columns can't be appended to.
+#
+#   header    b'ESCS', format version (uint16), number of events (uint32), number of rows (uint64)
+#   table     one fixed-size entry per event, sorted by date: ISO date, first row and number of rows,
+#             offset and length of its metadata
+#   columns   one array per column in COLUMNS order, each starting on an 8-byte boundary
+#   metadata  per event, compact JSON: type, url, columns, limits and the values stored as text
+#             (see storage.Column)
+
+import json, mmap, struct
+from datetime import datetime
+
+from . import storage
+
+MAGIC = b'ESCS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sH2xI4xQ')
+ENTRY = struct.Struct('<10s6xQQQQ')
+
+# (attribute, column class, numbers per row, buffer format)
+COLUMNS = (('time', storage.TimeColumn, 1, 'q'),
+           ('north', storage.PointColumn, 2, 'd'),
+           ('south', storage.PointColumn, 2, 'd'),
+           ('central', storage.PointColumn, 2, 'd'),
+           ('ms_diam_ratio', storage.Column, 1, 'd'),
+           ('sun_altitude', storage.Column, 1, 'd'),
+           ('sun_azimuth', storage.Column, 1, 'd'),
+           ('path_width', storage.Column, 1, 'd'),
+           ('central_line_duration', storage.DurationColumn, 1, 'd'))
+
+POSITIONS = ('north', 'south', 'central')
+
+def _column(track, name):
+    return track.position[name] if name in POSITIONS else getattr(track, name)
+
+def _pad(f):
+    f.write(b'\0' * (-f.tell() % 8))
+
+# Offsets in the file of each column, for a store holding rows rows
+def _column_offsets(events, rows):
+    offset = HEADER.size + ENTRY.size * events
+    offsets = []
+    for name, column_class, width, fmt in COLUMNS:
+        offset += -offset % 8
+        offsets.append(offset)
+        offset += 8 * width * rows
+    return offsets, offset
+
+def write_store(tracks, path):
+    tracks = sorted(tracks, key=lambda track: track.date)
+    for previous, track in zip(tracks, tracks[1:]):
+        if previous.date == track.date:
+            raise Exception('Duplicate event dates in store: ' + track.date.isoformat())
+    rows = sum(len(track.time) for track in tracks)
+    offsets, end = _column_offsets(len(tracks), rows)
+
+    metadata = []
+    for track in tracks:
+        text = dict((name, _column(track, name).text) for name, column_class, width, fmt in COLUMNS
+                    if _column(track, name).text)
+        metadata.append(json.dumps({'type': track.type, 'url': track.url, 'columns': track.columns,
+                                    'limits': track.limits, 'text': text}, separators=(',', ':')).encode('utf-8'))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(tracks), rows))
+        first_row = 0
+        meta_offset = end
+        for track, meta in zip(tracks, metadata):
+            f.write(ENTRY.pack(track.date.isoformat().encode('ascii'), first_row, len(track.time), meta_offset, len(meta)))
+            first_row += len(track.time)
+            meta_offset += len(meta)
+        for (name, column_class, width, fmt), offset in zip(COLUMNS, offsets):
+            _pad(f)
+            for track in tracks:
+                values = _column(track, name).values
+                # Times are stored as int64 whatever the size of the platform's C long
+                f.write(values.tobytes() if values.itemsize == 8 else struct.pack('=%d%s' % (len(values), fmt), *values))
+        for meta in metadata:
+            f.write(meta)
+
+def _load(args):
+    from .catalog import load_event
+    return load_event(*args)
+
+# Build a store from events given as (date, path or URL) pairs, parsing them in parallel
+def build_store(events, path, processes=None):
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        write_store(executor.map(_load, events), path)
+
+class ColumnStore:
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise Exception('Not a column store: ' + path)
+        if len(self.data) < HEADER.size:
+            self.close()
+            raise Exception('Not a column store: ' + path)
+        magic, version, self.count, self.rows = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise Exception('Not a column store (or unsupported version): ' + path)
+        self.buffer = memoryview(self.data)
+        self.offsets = _column_offsets(self.count, self.rows)[0]
+
+    # The map is only unmapped once no track views are left; until then it is closed on collection
+    def close(self):
+        try:
+            if hasattr(self, 'buffer'):
+                self.buffer.release()
+            self.data.close()
+        except BufferError:
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def iso(self, i):
+        return ENTRY.unpack_from(self.data, HEADER.size + ENTRY.size * i)[0].decode('ascii')
+
+    def isos(self):
+        return [self.iso(i) for i in range(self.count)]
+
+    # EclipseTrack viewing the columns of event i
+    def track(self, i):
+        from .eclipsescraper import EclipseTrack
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('column store index out of range')
+        iso, first, rows, meta_offset, meta_length = ENTRY.unpack_from(self.data, HEADER.size + ENTRY.size * i)
+        meta = json.loads(self.buffer[meta_offset:meta_offset+meta_length].tobytes().decode('utf-8'))
+        track = EclipseTrack(datetime.strptime(iso.decode('ascii'), '%Y-%m-%d').date())
+        track.type = meta['type']
+        track.url = meta['url']
+        track.columns = meta['columns']
+        track.limits = dict((key, [tuple(v) if isinstance(v, list) else v for v in values])
+                            for key, values in meta['limits'].items())
+        positions = {}
+        for (name, column_class, width, fmt), offset in zip(COLUMNS, self.offsets):
+            start = offset + 8 * width * first
+            values = self.buffer[start:start + 8 * width * rows].cast(fmt)
+            text = dict((int(k), v) for k, v in meta['text'].get(name, {}).items())
+            column = column_class.view(values, text)
+            if name in POSITIONS:
+                positions[name] = column
+            else:
+                setattr(track, name, column)
+        track.position = positions
+        return track
+
+    def __getitem__(self, i):
+        return self.track(i)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.track(i)
+
+    # Track of the event on a date (a date or an ISO string), or None
+    def get(self, day):
+        iso = day if isinstance(day, str) else day.isoformat()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.iso(middle) < iso:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.iso(low) == iso:
+            return self.track(low)
+        return None
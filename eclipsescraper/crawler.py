@@ -0,0 +1,167 @@
+#!/usr/bin/python
+
+# Resumable crawl of NASA's eclipse catalog for path tables.
+#
+# Starting from catalog index pages (e.g. the decade or century tables of solar eclipses), links are
+# followed to further index pages and every link to a path table (named like SE2017Aug21Tpath.html)
+# is recorded with the date and type of its eclipse. The path tables are then downloaded into a
+# directory, ready for "eclipsescraper build". Requests to any one host are spaced by a minimum
+# delay; failed requests (connection errors, 429 and 5xx responses) are retried with exponential
+# backoff, honouring Retry-After. Progress is checkpointed to a JSON file after every request, so
+# an interrupted crawl picks up where it stopped; events that still failed are retried next time.
+
+import os, re, json, time
+import http.client
+from urllib.parse import urljoin, urlsplit, urldefrag
+
+from .catalog import EVENT_FILENAME, event_date
+from .fetch import ConnectionPool
+
+TYPES = {'A': 'annular', 'H': 'hybrid', 'T': 'total'}
+
+# Links to follow from index pages: decade, century and catalog tables of solar eclipses (e.g.
+# SEdecade2011.html, SE2001-2100.html)
+INDEX_LINK = re.compile(r'^SE(decade|century|cat\w*)?-?\d*(-\d+)?\.html?$', re.IGNORECASE)
+HREF = re.compile(r'''href\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+
+class CrawlError(Exception):
+    pass
+
+# Space out requests to each host by at least delay seconds
+class RateLimiter:
+
+    def __init__(self, delay=1.0, clock=time.monotonic, sleep=time.sleep):
+        self.delay = delay
+        self.clock = clock
+        self.sleep = sleep
+        self.last = {}
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        if host in self.last:
+            remaining = self.last[host] + self.delay - self.clock()
+            if remaining > 0:
+                self.sleep(remaining)
+        self.last[host] = self.clock()
+
+# Absolute URLs of the links on a page
+def links(base, html):
+    return [urldefrag(urljoin(base, href))[0] for href in HREF.findall(html)]
+
+class Crawler:
+
+    def __init__(self, start_urls, dest, checkpoint=None, delay=1.0, retries=4, backoff=2.0,
+                 follow=INDEX_LINK, pool=None, limiter=None):
+        self.dest = dest
+        self.checkpoint = checkpoint or os.path.join(dest, 'crawl-checkpoint.json')
+        self.retries = retries
+        self.backoff = backoff
+        self.follow = follow
+        self.pool = pool or ConnectionPool(per_host=1)
+        self.limiter = limiter or RateLimiter(delay)
+        self.state = self.load_checkpoint()
+        for url in start_urls:
+            if url not in self.state['visited'] and url not in self.state['queue']:
+                self.state['queue'].append(url)
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {'queue': [], 'visited': [], 'events': {}, 'failed': {}}
+
+    # Write the checkpoint atomically, so an interruption never leaves a truncated file
+    def save_checkpoint(self):
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.checkpoint)
+
+    # GET a URL under the rate limit, retrying transient failures; returns the body
+    def fetch(self, url):
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(url)
+            retry_after = None
+            try:
+                status, headers, body = self.pool.request(url)
+            except (OSError, http.client.HTTPException) as e:
+                error = str(e) or e.__class__.__name__
+            else:
+                if status == 200:
+                    return body
+                error = 'HTTP ' + str(status)
+                if status != 429 and status < 500:
+                    raise CrawlError(error)
+                retry_after = headers.get('Retry-After')
+            if attempt == self.retries:
+                break
+            wait = self.backoff * 2 ** attempt
+            if retry_after is not None and retry_after.isdigit():
+                wait = max(wait, int(retry_after))
+            if wait > 0:
+                self.limiter.sleep(wait)
+        raise CrawlError(error + ' after ' + str(self.retries + 1) + ' attempts')
+
+    # Record the path tables linked from an index page and queue the index pages it links to
+    def visit(self, url, html):
+        for link in links(url, html):
+            name = urlsplit(link).path.rsplit('/', 1)[-1]
+            match = EVENT_FILENAME.search(name)
+            if match is not None:
+                iso = event_date(name).isoformat()
+                if iso not in self.state['events']:
+                    self.state['events'][iso] = {'url': link, 'type': TYPES[match.group(4)], 'done': False}
+            elif (self.follow.search(name) and link not in self.state['visited'] and link not in self.state['queue']
+                  and urlsplit(link).netloc == urlsplit(url).netloc):
+                self.state['queue'].append(link)
+
+    # Walk index pages until none are left
+    def discover(self):
+        while self.state['queue']:
+            url = self.state['queue'][0]
+            try:
+                self.visit(url, self.fetch(url).decode('utf-8', 'ignore'))
+                self.state['failed'].pop(url, None)
+            except CrawlError as e:
+                self.state['failed'][url] = str(e)
+            self.state['queue'].pop(0)
+            self.state['visited'].append(url)
+            self.save_checkpoint()
+
+    def page_path(self, event):
+        return os.path.join(self.dest, urlsplit(event['url']).path.rsplit('/', 1)[-1])
+
+    # Download every path table not downloaded yet
+    def download(self):
+        for iso in sorted(self.state['events']):
+            event = self.state['events'][iso]
+            if event['done']:
+                continue
+            try:
+                body = self.fetch(event['url'])
+            except CrawlError as e:
+                self.state['failed'][event['url']] = str(e)
+            else:
+                path = self.page_path(event)
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(body)
+                os.replace(path + '.tmp', path)
+                event['done'] = True
+                self.state['failed'].pop(event['url'], None)
+            self.save_checkpoint()
+
+    # Discover and download everything, resuming from the checkpoint. Returns {'events': number of
+    # path tables known, 'downloaded': number saved so far, 'failed': {url: error}}.
+    def crawl(self):
+        os.makedirs(self.dest, exist_ok=True)
+        # Index pages that failed last time are tried again
+        for url in list(self.state['failed']):
+            if url in self.state['visited'] and url not in [e['url'] for e in self.state['events'].values()]:
+                self.state['visited'].remove(url)
+                self.state['queue'].append(url)
+        self.discover()
+        self.download()
+        return {'events': len(self.state['events']),
+                'downloaded': sum(1 for event in self.state['events'].values() if event['done']),
+                'failed': dict(self.state['failed'])}
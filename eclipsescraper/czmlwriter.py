@@ -0,0 +1,139 @@
+#!/usr/bin/python
+
+# Streaming CZML output for eclipse tracks.
+#
+# Produces exactly the JSON text of json.dumps(track.czml()) (same packets, property order and
+# separators) without building czml objects or intermediate lists of samples: fixed parts of each
+# packet are emitted as literal JSON and sampled values are formatted in batches as they are read.
+#
+# In compact mode sampled properties are written with an epoch (the time of the first sample) and
+# times as seconds relative to it, instead of repeating a full ISO timestamp with every value.
+# Coordinates can also be rounded to a number of decimal places to shorten the output further.
+
+import json
+
+from . import parser
+
+# Number of samples formatted into each chunk of output
+CHUNK_SIZE = 256
+
+def _color(rgba):
+    return {'color': {'rgba': list(rgba)}}
+
+NORTH_MATERIAL = {'solidColor': _color((255, 255, 255, 128))}
+CENTRAL_MATERIAL = {'polylineGlow': {'color': {'rgba': [223, 150, 47, 128]}, 'glowPower': 0.25}}
+SOUTH_MATERIAL = {'solidColor': _color((255, 255, 255, 128))}
+ELLIPSE_MATERIAL = {'solidColor': _color((0, 0, 0, 160))}
+
+# Join formatted samples into comma-separated chunks of at most CHUNK_SIZE samples
+def _chunks(samples):
+    batch = []
+    first = True
+    for sample in samples:
+        batch.append(sample)
+        if len(batch) == CHUNK_SIZE:
+            yield ('' if first else ', ') + ', '.join(batch)
+            batch = []
+            first = False
+    if batch:
+        yield ('' if first else ', ') + ', '.join(batch)
+
+# Format a coordinate, rounded to precision decimal places if given
+def _coordinate(value, precision=None):
+    return repr(value if precision is None else round(value, precision))
+
+# Seconds of every time after the first one, counting on past midnight
+def offsets(times):
+    seconds = [parser.seconds(time) for time in times]
+    relative = []
+    elapsed = 0
+    for previous, current in zip(seconds[:1] + seconds, seconds):
+        elapsed += (current - previous) % 86400
+        relative.append(int(elapsed) if elapsed == int(elapsed) else elapsed)
+    return relative
+
+def _polyline(packet_id, width, material, points, precision=None):
+    yield ('{"id": ' + json.dumps(packet_id) + ', "polyline": {"show": true, "followSurface": true, "width": ' +
+           json.dumps(width) + ', "material": ' + json.dumps(material) + ', "positions": {"cartographicDegrees": [')
+    if precision is None:
+        samples = ('%r, %r, 0.0' % (point[0], point[1]) for point in points)
+    else:
+        samples = (_coordinate(point[0], precision) + ', ' + _coordinate(point[1], precision) + ', 0.0' for point in points)
+    for chunk in _chunks(samples):
+        yield chunk
+    yield ']}}}'
+
+# Shadow ellipse packet with times relative to the first sample
+def _compact_ellipse(track, iso, ellipses, precision=None):
+    epoch = '{"epoch": ' + json.dumps(track.timestamp(track.time[0])) + ', '
+    times = offsets(track.time)
+    yield '{"id": ' + json.dumps(iso + '_shadow_ellipse') + ', "position": ' + epoch + '"cartographicDegrees": ['
+    for chunk in _chunks('%r, %s, %s, 0.0' % (t, _coordinate(e[0][0], precision), _coordinate(e[0][1], precision))
+                         for t, e in zip(times, ellipses)):
+        yield chunk
+    yield ']}, "ellipse": {"show": true, "fill": true, "rotation": ' + epoch + '"number": ['
+    for chunk in _chunks('%r, %r' % (t, e[3]) for t, e in zip(times, ellipses)):
+        yield chunk
+    yield ']}, "granularity": 0.002, "semiMajorAxis": ' + epoch + '"number": ['
+    for chunk in _chunks('%r, %r' % (t, e[1]) for t, e in zip(times, ellipses)):
+        yield chunk
+    yield ']}, "semiMinorAxis": ' + epoch + '"number": ['
+    for chunk in _chunks('%r, %r' % (t, e[2]) for t, e in zip(times, ellipses)):
+        yield chunk
+    yield ']}, "material": ' + json.dumps(ELLIPSE_MATERIAL) + '}}'
+
+def _ellipse(track, iso, ellipses, precision=None):
+    timestamps = [track.timestamp(time) for time in track.time]
+    yield '{"id": ' + json.dumps(iso + '_shadow_ellipse') + ', "position": {"cartographicDegrees": ['
+    for chunk in _chunks('"%s+00:00", %s, %s, 0.0' % (timestamp[:-1], _coordinate(e[0][0], precision),
+                                                       _coordinate(e[0][1], precision))
+                         for timestamp, e in zip(timestamps, ellipses)):
+        yield chunk
+    yield ']}, "ellipse": {"show": true, "fill": true, "rotation": {"number": ['
+    for chunk in _chunks('"%s", %r' % (timestamp, e[3]) for timestamp, e in zip(timestamps, ellipses)):
+        yield chunk
+    yield ']}, "granularity": 0.002, "semiMajorAxis": {"number": ['
+    for chunk in _chunks('"%s", %r' % (timestamp, e[1]) for timestamp, e in zip(timestamps, ellipses)):
+        yield chunk
+    yield ']}, "semiMinorAxis": {"number": ['
+    for chunk in _chunks('"%s", %r' % (timestamp, e[2]) for timestamp, e in zip(timestamps, ellipses)):
+        yield chunk
+    yield ']}, "material": ' + json.dumps(ELLIPSE_MATERIAL) + '}}'
+
+# Build the document packet holding the clock for an interval
+def document_packet(start_time, end_time):
+    return {'id': 'document', 'version': '1.0',
+            'clock': {'currentTime': start_time, 'multiplier': 300, 'interval': start_time + "/" + end_time,
+                      'range': 'LOOP_STOP', 'step': 'SYSTEM_CLOCK_MULTIPLIER'}}
+
+# Generate the polyline and shadow ellipse packets of a track (comma-separated, without the
+# enclosing brackets) as a sequence of JSON text chunks, optionally simplifying polylines. With
+# compact=True sampled properties use an epoch and relative times; precision rounds coordinates.
+def iter_packets(track, tolerance=None, compact=False, precision=None):
+    iso = track.date.isoformat()
+    for chunk in _polyline(iso + '_north_polyline', 1, NORTH_MATERIAL, track.getPolyline('north', tolerance), precision):
+        yield chunk
+    yield ', '
+    for chunk in _polyline(iso + '_central_polyline', 5, CENTRAL_MATERIAL, track.getPolyline('central', tolerance), precision):
+        yield chunk
+    yield ', '
+    for chunk in _polyline(iso + '_south_polyline', 1, SOUTH_MATERIAL, track.getPolyline('south', tolerance), precision):
+        yield chunk
+    yield ', '
+    ellipse = _compact_ellipse if compact else _ellipse
+    for chunk in ellipse(track, iso, track.getShadowEllipses(), precision):
+        yield chunk
+
+# Generate the CZML document for a track as a sequence of JSON text chunks
+def iter_czml(track, tolerance=None, compact=False, precision=None):
+    start_time = track.timestamp(track.time[0])
+    end_time = track.timestamp(track.time[-1])
+    yield '[' + json.dumps(document_packet(start_time, end_time)) + ', '
+    for chunk in iter_packets(track, tolerance, compact, precision):
+        yield chunk
+    yield ']'
+
+# Write the CZML document for a track to a file-like object opened in text mode
+def write_czml(track, fileobj, tolerance=None, compact=False, precision=None):
+    for chunk in iter_czml(track, tolerance, compact, precision):
+        fileobj.write(chunk)
@@ -1,20 +1,11 @@
 #!/usr/bin/python
 
-import re, sys, math
-from datetime import date
-from geopy.distance import vincenty
+import io, re, math, json, bisect
+from datetime import date, datetime, timezone
 
-from lxml import html
-
-if sys.version[0] is '3':
-    import urllib.request
-elif sys.version[0] is '2':
-    import requests
-
-try:
-    from czml import czml
-except ImportError:
-    import czml
+# Only parsing is imported eagerly: fetching, geodesics and CZML output are loaded on first use
+# through backends.py, and other helpers are imported by the methods that need them
+from . import parser, storage, metrics, backends
 
 class EclipseTrack:
 
@@ -23,8 +14,23 @@ class EclipseTrack:
                    'sun_altitude', 'sun_azimuth',
                    'path_width', 'central_line_duration')
 
-    # Start by taking a raw data string and parsing it build the waypoints list
-    def __init__(self, date):
+    # Per-waypoint data live in typed arrays (see storage.py) behind list-like column views.
+    # Assigning any sequence to one of these attributes stores it compactly.
+    __slots__ = ('date', 'url', 'type', 'columns', 'limits', '_time', '_position', '_ms_diam_ratio',
+                 '_sun_altitude', '_sun_azimuth', '_path_width', '_central_line_duration', '_time_index',
+                 '_derived', 'metrics')
+
+    time = storage.ColumnAttribute('_time', storage.TimeColumn)
+    position = storage.PositionsAttribute()
+    ms_diam_ratio = storage.ColumnAttribute('_ms_diam_ratio', storage.Column)
+    sun_altitude = storage.ColumnAttribute('_sun_altitude', storage.Column)
+    sun_azimuth = storage.ColumnAttribute('_sun_azimuth', storage.Column)
+    path_width = storage.ColumnAttribute('_path_width', storage.Column)
+    central_line_duration = storage.ColumnAttribute('_central_line_duration', storage.DurationColumn)
+
+    # Start by taking a raw data string and parsing it build the waypoints list. Timings and
+    # counters are recorded in metrics (see metrics.py) if given, else in metrics.registry if enabled.
+    def __init__(self, date, metrics=None):
 
         self.date = date
         self.url = None
@@ -40,12 +46,43 @@ class EclipseTrack:
         self.central_line_duration = []
         self.limits = { 'north': [], 'south': [], 'central': [], 'ms_diam_ratio': [],
                         'sun_altitude': [], 'sun_azimuth': [], 'path_width': [], 'central_line_duration': [] }
+        self._time_index = None
+        self._derived = None
+        self.metrics = metrics
 
-    def loadFromURL(self, url):
-        self.url = url
+    def _metrics(self):
+        return metrics.registry if self.metrics is None else self.metrics
+
+    # Load from a URL (or a local path), optionally through an HTTPCache (see cache.py) to avoid
+    # re-downloading pages. Pages are fetched with the "fetch" backend (see backends.py).
+    def loadFromURL(self, url, cache=None):
+        self.setURL(url)
         iso = self.date.isoformat()
+        m = self._metrics()
 
-        # Extract eclipse type from URL
+        if cache is not None:
+            with metrics.timer(m, 'fetch'):
+                body = cache.fetch(self.url)
+            if m is not None:
+                m.count('bytes_fetched', len(body))
+            self.loadFromBytes(body)
+            return
+
+        else:
+            with metrics.timer(m, 'fetch'):
+                status, r = backends.fetcher(self.url)(self.url)
+            if status != 200:
+                r.close()
+                raise Exception('Unable to load eclipse event: ' + iso + ' (URL: ' + self.url + ')')
+            else:
+                # Parse while reading and stop reading once the table has been parsed
+                with r, metrics.timer(m, 'stream'):
+                    stream = r if m is None else io.BufferedReader(metrics.CountingStream(r, m))
+                    self.loadFromStream(io.TextIOWrapper(stream, encoding='utf-8', errors='ignore'))
+
+    # Record the source URL and extract eclipse type from it
+    def setURL(self, url):
+        self.url = url
         annular = re.search(r"Apath\.html$",self.url)
         hybrid = re.search(r"Hpath\.html$",self.url)
         total = re.search(r"Tpath\.html$",self.url)
@@ -56,259 +93,483 @@ class EclipseTrack:
         elif total:
             self.type = 'total'
 
-        if sys.version[0] is '3':
-            r = urllib.request.urlopen(self.url)
-            if r.status != 200:
-                raise Exception('Unable to load eclipse event: ' + iso + ' (URL: ' + self.url + ')')
-            else:
-                html = r.read().decode('utf-8','ignore')
-
-        elif sys.version[0] is '2':
-            page = requests.get(url)
-            html = page.text.encode('ascii','ignore')
-        
-        self.loadFromRawHTML(html)
-
     def loadFromRawHTML(self, rawhtml):
-        p1 = rawhtml.partition('<pre>');
-        p2 = p1[2].partition('</pre>');
-        html = p2[0].strip()
+        with metrics.timer(self._metrics(), 'partition'):
+            p1 = rawhtml.partition('<pre>');
+            p2 = p1[2].partition('</pre>');
+            html = p2[0].strip()
         if len(html) == 0:
             raise Exception('raw data string not found between <pre> tags')
         else:
             self.parseHTML(html)
 
+    # Load from a raw page given as bytes or any other bytes-like object (e.g. a memoryview or an
+    # mmap). Only the <pre> block is decoded; the rest of the page is never copied.
+    def loadFromBytes(self, buf):
+        m = self._metrics()
+        with memoryview(buf) as view:
+            with metrics.timer(m, 'partition'):
+                start, stop = parser.pre_span(view)
+            with metrics.timer(m, 'decode'):
+                html = str(view[start:stop], 'utf-8', 'ignore').strip()
+        if len(html) == 0:
+            raise Exception('raw data string not found between <pre> tags')
+        self.parseHTML(html)
+
+    # Load from a saved page, memory-mapped so that only its <pre> block is read into memory and
+    # decoded. The type of eclipse is taken from the file name, as for a URL.
+    def loadFromFile(self, path):
+        import mmap
+        self.setURL(path)
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                data = b''
+            try:
+                self.loadFromBytes(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+    # Load from a raw page given as a string, a text stream or an iterable of text chunks, parsing
+    # rows as the source is read
+    def loadFromStream(self, source):
+        for row in self.iter_rows(source):
+            pass
+
+    # Parse rows lazily from a source (a string, a text stream or an iterable of text chunks) and
+    # store them as they are read, yielding the parsed values of each row kept. With html=True the
+    # source is a raw page and only the <pre> block is read; otherwise it is the table itself.
+    # Rows are parsed in blocks of up to block rows, each ending early at a "Limits" row, and
+    # reading stops as soon as the closing "Limits" row has been parsed.
+    def iter_rows(self, source, html=True, block=256):
+        lines = parser.iter_lines(source)
+        if html:
+            lines = parser.iter_pre_lines(lines)
+        rows = []
+        for row in parser.iter_tokens(lines, 2 - len(self.limits['north'])):
+            rows.append(row)
+            if len(rows) < block and row[0] != 'Limits':
+                continue
+            for parsed_row in self.parse_rows(rows):
+                if parsed_row is not None:
+                    yield parsed_row
+            rows = []
+        for parsed_row in self.parse_rows(rows) if rows else ():
+            if parsed_row is not None:
+                yield parsed_row
+
     def parseHTML(self, html):
-        allrows = re.sub(r'\r',r'\n',html).split('\n')
-        first_limits = False
-        for row in allrows:
-            if "Limits" in row:
-                first_limits = True
-            if first_limits and len(self.limits['north']) < 2:
-                row_stripped = row.strip()
-                if len(row_stripped) > 0:
-                    row_split = self.preparseHyphens(re.split('\s+',row_stripped))
-                    self.parse_row(row_split)
+        with metrics.timer(self._metrics(), 'tokenize'):
+            rows = parser.tokenize(html, 2 - len(self.limits['north']))
+        self.parse_rows(rows)
 
     def __str__(self):
-        return json.dumps(self.__dict__)
+        return json.dumps(self.data(), default=str)
 
     @property
     def properties(self):
         return self._properties
 
+    # Plain dict of all properties, with columns copied out to lists
     def data(self):
         d = {}
         for attr in self.properties:
             a = getattr(self, attr)
             if a is not None:
-                d[attr] = a
+                d[attr] = storage.plain(a)
         return d
 
-    # Expand some single hyphens to two fields
-    """ Sometimes a single hyphen will be used to denote a lack of a waypoint but this breaks the parsing
-        when we expect each waypoint to be two values separated by whitespace. This function detects
-        single hyphens that are placeholders for waypoints and replaces them with two spaced ?s.
-        NOTE: Only waypoints apply - sometimes single hyphens are placeholders for other values and that
-              alone doesn't break parsing. Hence we only check for hyphens between list indexes 0 and 6.
-        This is incredibly hacky, but such is the nature of parsing quirky upstream data."""
+    # Expand some single hyphens to two fields (see parser.preparseHyphens)
     def preparseHyphens(self, row):
-        try:
-            while (row.index('-') > 0) and (row.index('-') < 6):
-                index = row.index('-')
-                row[index] = '?'
-                row.insert(index+1, '?')
-            return row
-        except ValueError:
-            return row
+        return parser.preparseHyphens(row)
 
     # Generic function for converting points in degrees with cardinal direction numbers to floats
     def parseLatLon(self, v1, v2):
-        try:
-            val = float(v1) + (float(v2.rstrip('NESW'))/60)
-            if v2.endswith('S') or v2.endswith('W'):
-                val *= -1
-            return round(val,3)
-        except ValueError:
-            return None
+        return parser.parseLatLon(v1, v2)
 
-    # Parse an individual row, validate all values, store in data structures
-    def parse_row(self, row):
+    # Functions to extract individual values from a row; parse_rows converts whole columns at once
+    def cell(self, column, row):
+        return parser.convert([row], [column])[0][0]
 
-        parsed_row = []
-        
-        def get(column, row):
-            def func_not_found(row):
-                return None
-            try:
-                func = getattr(self,column,func_not_found)
-                return func(row)
-            except IndexError:
-                return None            
-        
-        for column in self.columns:
-            val = get(column, row)
-            parsed_row.append(val)
-
-        if (parsed_row[0] == None):
-            return None;
-        else:
-            time = parsed_row[0]
-            if (parsed_row[1] != None) and (parsed_row[2] != None):
-                north = (parsed_row[2], parsed_row[1])
-            else:
-                north = None
-            if (parsed_row[3] != None) and (parsed_row[4] != None):
-                south = (parsed_row[4], parsed_row[3])
-            else:
-                south = None
-            if (parsed_row[5] != None) and (parsed_row[6] != None):        
-                central = (parsed_row[6], parsed_row[5])
-            else:
-                central = None
-            ms_diam_ratio = parsed_row[7]
-            sun_altitude = parsed_row[8]
-            sun_azimuth = parsed_row[9]
-            path_width = parsed_row[10]
-            central_line_duration = parsed_row[11]
-
-        if (time == 'Limits'):
-            self.limits['north'].append(north)
-            self.limits['south'].append(south)
-            self.limits['central'].append(central)
-            self.limits['ms_diam_ratio'].append(ms_diam_ratio)
-            self.limits['sun_altitude'].append(sun_altitude)
-            self.limits['sun_azimuth'].append(sun_azimuth)
-            self.limits['path_width'].append(path_width)
-            self.limits['central_line_duration'].append(central_line_duration)
-        else:
-            if north != None and central != None and south != None:
-                self.time.append(time)
-                self.position['north'].append(north)
-                self.position['south'].append(south)
-                self.position['central'].append(central)
-                self.ms_diam_ratio.append(ms_diam_ratio)
-                self.sun_altitude.append(sun_altitude)
-                self.sun_azimuth.append(sun_azimuth)
-                self.path_width.append(path_width)
-                self.central_line_duration.append(central_line_duration)
-            else:
-                return None
-
-        return parsed_row
-
-    # Functions to be called dynamically to extract individual values from the row
     def Time(self, row):
-        return row[0]
+        return self.cell('Time', row)
 
     def NorthLimitLat(self, row):
-        return self.parseLatLon(row[1],row[2])
+        return self.cell('NorthLimitLat', row)
 
     def NorthLimitLon(self, row):
-        return self.parseLatLon(row[3],row[4])
+        return self.cell('NorthLimitLon', row)
 
     def SouthLimitLat(self, row):
-        return self.parseLatLon(row[5],row[6])
-    
+        return self.cell('SouthLimitLat', row)
+
     def SouthLimitLon(self, row):
-        return self.parseLatLon(row[7],row[8])
+        return self.cell('SouthLimitLon', row)
 
     def CentralLat(self, row):
-        return self.parseLatLon(row[9],row[10])
+        return self.cell('CentralLat', row)
 
     def CentralLon(self, row):
-        return self.parseLatLon(row[11],row[12])
+        return self.cell('CentralLon', row)
 
     def MSDiamRatio(self, row):
-        try:
-            val = float(row[13])
-            return val
-        except ValueError:
-            return None
+        return self.cell('MSDiamRatio', row)
 
     def SunAltitude(self, row):
-        try:
-            val = float(row[14])
-            return val
-        except ValueError:
-            return None
+        return self.cell('SunAltitude', row)
 
     def SunAzimuth(self, row):
-        try:
-            val = float(row[15])
-            return val
-        except ValueError:
-            return None
+        return self.cell('SunAzimuth', row)
 
     def PathWidth(self, row):
-        try:
-            val = float(row[16])
-            return val
-        except ValueError:
-            return None
+        return self.cell('PathWidth', row)
 
     def CentralLineDuration(self, row):
-        return row[17]
+        return self.cell('CentralLineDuration', row)
+
+    # Parse an individual row, validate all values, store in data structures
+    def parse_row(self, row):
+        return self.parse_rows([row])[0]
+
+    # Parse a list of tokenized rows column by column (as described by self.columns) and store
+    # every valid row in data structures. Returns the parsed values for each row (None if dropped).
+    def parse_rows(self, rows):
+        m = self._metrics()
+        with metrics.timer(m, 'parse_rows'):
+            parsed_rows = self.store_rows([list(parsed_row) for parsed_row in zip(*parser.convert(rows, self.columns))])
+        if m is not None:
+            m.count('rows_seen', len(rows))
+            m.count('rows_dropped', parsed_rows.count(None))
+            # Each expanded placeholder became two '?' tokens among the waypoint columns
+            m.count('hyphens_expanded', sum(row[1:7].count('?') for row in rows) // 2)
+        return parsed_rows
+
+    # Store a single row of parsed values in data structures
+    def store_row(self, parsed_row):
+        return self.store_rows([parsed_row])[0]
+
+    # Store rows of parsed values in data structures, appending the waypoints to each column at
+    # once. Returns the rows, with None for those dropped.
+    def store_rows(self, parsed_rows):
+
+        stored = []
+        waypoints = []
+        for parsed_row in parsed_rows:
+            if (parsed_row[0] == None):
+                stored.append(None)
+                continue
+            else:
+                time = parsed_row[0]
+                if (parsed_row[1] != None) and (parsed_row[2] != None):
+                    north = (parsed_row[2], parsed_row[1])
+                else:
+                    north = None
+                if (parsed_row[3] != None) and (parsed_row[4] != None):
+                    south = (parsed_row[4], parsed_row[3])
+                else:
+                    south = None
+                if (parsed_row[5] != None) and (parsed_row[6] != None):
+                    central = (parsed_row[6], parsed_row[5])
+                else:
+                    central = None
+                ms_diam_ratio = parsed_row[7]
+                sun_altitude = parsed_row[8]
+                sun_azimuth = parsed_row[9]
+                path_width = parsed_row[10]
+                central_line_duration = parsed_row[11]
+
+            if (time == 'Limits'):
+                self.limits['north'].append(north)
+                self.limits['south'].append(south)
+                self.limits['central'].append(central)
+                self.limits['ms_diam_ratio'].append(ms_diam_ratio)
+                self.limits['sun_altitude'].append(sun_altitude)
+                self.limits['sun_azimuth'].append(sun_azimuth)
+                self.limits['path_width'].append(path_width)
+                self.limits['central_line_duration'].append(central_line_duration)
+            else:
+                if north != None and central != None and south != None:
+                    waypoints.append((time, north, south, central, ms_diam_ratio, sun_altitude, sun_azimuth,
+                                      path_width, central_line_duration))
+                else:
+                    stored.append(None)
+                    continue
+
+            stored.append(parsed_row)
+
+        if waypoints:
+            columns = [list(column) for column in zip(*waypoints)]
+            self.time.extend(columns[0])
+            self.position['north'].extend(columns[1])
+            self.position['south'].extend(columns[2])
+            self.position['central'].extend(columns[3])
+            self.ms_diam_ratio.extend(columns[4])
+            self.sun_altitude.extend(columns[5])
+            self.sun_azimuth.extend(columns[6])
+            self.path_width.extend(columns[7])
+            self.central_line_duration.extend(columns[8])
+
+        return stored
+
+    # Return a track with samples every step_seconds, interpolated from this one (see interpolate.py).
+    # The resampled track is memoized like other derived results, until the track changes.
+    def resample(self, step_seconds):
+        from . import interpolate
+        return self._memo(('resample', step_seconds), lambda: interpolate.resample(self, step_seconds))
+
+    # Sample times in seconds since midnight (UT) at the start of the date of the eclipse, counting
+    # on past midnight, so they are sorted. Computed on first use and cached until the times change.
+    def time_index(self):
+        cached = self._time_index
+        if cached is None or cached[0] is not self.time or len(cached[1]) != len(self.time):
+            index = []
+            day = 0
+            for seconds in self.time:
+                seconds = parser.seconds(seconds) + day
+                if index and seconds < index[-1]:
+                    day += 86400
+                    seconds += 86400
+                index.append(seconds)
+            cached = self._time_index = (self.time, index)
+        return cached[1]
+
+    # Convert a time to seconds on the time index. Times may be datetimes, ISO 8601 timestamps,
+    # "HH:MM[:SS]" times of day (on the day of the eclipse, or the next day if the track runs past
+    # midnight and the time is before the first sample) or numbers of seconds. Datetimes and
+    # timestamps with a UTC offset are converted to UT; naive ones are taken to be UT already.
+    def index_seconds(self, time):
+        if isinstance(time, datetime):
+            if time.tzinfo is not None:
+                time = time.astimezone(timezone.utc).replace(tzinfo=None)
+            return (time - datetime(self.date.year, self.date.month, self.date.day)).total_seconds()
+        if isinstance(time, str):
+            if 'T' in time:
+                day, _, clock = time.partition('T')
+                days = (datetime.strptime(day, '%Y-%m-%d').date() - self.date).days
+                offset = 0
+                zone = re.search(r'(Z|([+-])(\d\d):?(\d\d))$', clock)
+                if zone:
+                    clock = clock[:zone.start()]
+                    if zone.group(2):
+                        offset = (int(zone.group(3)) * 3600 + int(zone.group(4)) * 60) * (1 if zone.group(2) == '+' else -1)
+                return days * 86400 + parser.seconds(clock) - offset
+            seconds = parser.seconds(time)
+            index = self.time_index()
+            if index and seconds < index[0] and index[-1] >= 86400:
+                seconds += 86400
+            return seconds
+        return time
+
+    # Range of indexes (first, stop) of the samples from start to end inclusive (None: unbounded)
+    def window_bounds(self, start=None, end=None):
+        index = self.time_index()
+        first = 0 if start is None else bisect.bisect_left(index, self.index_seconds(start))
+        stop = len(index) if end is None else bisect.bisect_right(index, self.index_seconds(end))
+        return first, max(first, stop)
+
+    # Return a track holding only the samples from start to end inclusive (see index_seconds for
+    # the accepted times)
+    def window(self, start=None, end=None):
+        return self.slice(*self.window_bounds(start, end))
+
+    # Return a track holding the samples with indexes from first up to stop. Limits are kept and
+    # columns are copied without decoding.
+    def slice(self, first, stop):
+        track = self.__class__(self.date)
+        track.url = self.url
+        track.type = self.type
+        track.columns = list(self.columns)
+        track.limits = dict((key, list(values)) for key, values in self.limits.items())
+        for attr in ('time', 'ms_diam_ratio', 'sun_altitude', 'sun_azimuth', 'path_width', 'central_line_duration'):
+            setattr(track, attr, getattr(self, attr).slice(first, stop))
+        track.position = dict((key, points.slice(first, stop)) for key, points in self.position.items())
+        return track
+
+    # ISO 8601 timestamp (UT) of a time on the date of the eclipse
+    def timestamp(self, time):
+        return self.date.isoformat() + "T" + parser.clock(time) + "Z"
+
+    # What derived results are computed from: the columns, positions and limits (by identity, as
+    # assigning to them replaces them), the length of each column and the number of changes made
+    # to it in place, and the number of limits, which grow as rows are parsed
+    def _state(self):
+        columns = (self._time, self._ms_diam_ratio, self._sun_altitude, self._sun_azimuth, self._path_width,
+                   self._central_line_duration) + tuple(self._position.values())
+        return ((self._position, self.limits) + columns,
+                (len(self.limits['north']), self.date, self.type) + tuple((len(column), column.changes) for column in columns))
+
+    # Derived results computed so far, {key: value}; emptied whenever the state above changes
+    def _derived_values(self):
+        state = self._state()
+        cached = self._derived
+        if (cached is None or cached[0][1] != state[1] or len(cached[0][0]) != len(state[0]) or
+                any(a is not b for a, b in zip(cached[0][0], state[0]))):
+            cached = self._derived = (state, {})
+        return cached[1]
+
+    # Value of a derived result, computed on first use and memoized until the track changes
+    def _memo(self, key, compute):
+        values = self._derived_values()
+        if key not in values:
+            values[key] = compute()
+        return values[key]
+
+    # Digest of the contents of the track (its columns and limits), computed on first use and
+    # memoized until the track changes
+    def fingerprint(self):
+        def compute():
+            import hashlib
+            digest = hashlib.sha1()
+            for column in self._state()[0][2:]:
+                digest.update(column.values)
+                digest.update(repr(sorted(column.text.items())).encode('utf-8'))
+            digest.update(repr(self.limits).encode('utf-8'))
+            return digest.hexdigest()
+        return self._memo('fingerprint', compute)
+
+    # Serialized output (JSON text), memoized on the track and, while enabled, in the process-wide
+    # cache of outputcache.py
+    def _serialized(self, kind, options, build):
+        def compute():
+            from . import outputcache
+            shared = outputcache.cache
+            if shared is None:
+                return build()
+            key = outputcache.key(self, kind, options)
+            text = shared.get(key)
+            if text is None:
+                text = build()
+                shared.put(key, text)
+            return text
+        return self._memo((kind,) + tuple(options), compute)
 
     # Generate a point 10km above the center of the track for positioning a camera
     def getCameraPosition(self):
-        index = int(round(len(self.position['central'])/2))
-        position = self.position['central'][index]
-        return [position[0], position[1], 10000000.0]
-
-    # Examine the track to determine what large-scale "regions" the track covers
-    def getRegions(self):
-        # Each region is defined as bounding limits of south, north, west, east (in that order)
-        possible_regions = { 'north atlantic': [0, 60, -70, -10],
-                             'south atlantic': [-60, 0, -50, 10],
-                             'north pacific': [0, 50, 140, -120],
-                             'south pacific': [-70, 0, 170, -80],
-                             'indian ocean': [-60, 20, 50, 100],
-                             'arctic': [60, 90, 0, 0],
-                             'north america': [20, 80, -140, -60],
-                             'central america': [7, 30, -120, -60],
-                             'south america': [-60, 10, -80, -25],
-                             'europe': [35, 70, -10, 45],
-                             'northern africa': [5, 35, -17, 50],
-                             'southern africa': [-35, 5, 10,50],
-                             'middle east': [12, 50, 30, 75],
-                             'northern asia': [45, 70, 45, 180],
-                             'eastern asia': [20, 45, 75, 145],
-                             'southeastern asia': [-10, 20, 75, 160],
-                             'australia / new zealand': [-60, -10, 110, 180],
-                             'antarctica': [-90, -60, 0, 0],
-                             }
-        active_regions = []
-        for region in possible_regions:
-            in_region = False
-            region_range = possible_regions[region]
-            for position in self.position['central']:
-                in_lat = region_range[0] < position[1] < region_range[1]
-                if region_range[2] == region_range[3]:
-                    in_lon = True
-                elif region_range[2] > region_range[3]:
-                    in_lon = region_range[2] < position[0] < 180 or -180 < position[0] < region_range[3]
-                else:
-                    in_lon = region_range[2] < position[0] < region_range[3]
-                if in_lat and in_lon:
-                    in_region = True
-                    break;
-            if in_region:
-                active_regions.append(region)
-        return sorted(active_regions)
+        def compute():
+            index = int(round(len(self.position['central'])/2))
+            position = self.position['central'][index]
+            return [position[0], position[1], 10000000.0]
+        return list(self._memo('camera_position', compute))
+
+    # Examine the track to determine what large-scale "regions" the track covers. Regions are
+    # defined in regions.json unless another regions.RegionClassifier is given.
+    def getRegions(self, classifier=None):
+        if classifier is None:
+            return list(self._memo('regions', self.regions))
+        return self.regions(classifier)
+
+    def regions(self, classifier=None):
+        import numpy as np
+        if classifier is None:
+            from . import regions
+            classifier = regions.default_classifier()
+        central = self.position['central'].array()
+        central = central[~np.isnan(central[:,0])]
+        return classifier.classify(central[:,0], central[:,1])
 
     # Generate a JSON metadata object (for useful values that can't be represented in CZML)
     def json(self):
-        obj = {'iso':  self.date.isoformat(),
-               'type': self.type,
-               'camera_position': self.getCameraPosition(),
-               'regions': self.getRegions(),
-               }
-        return obj
-
-    # Generate a valid CZML object using all available data
-    def czml(self):
-
+        return json.loads(self.json_text())
+
+    # The json() object serialized, memoized like czml_text
+    def json_text(self):
+        def build():
+            obj = {'iso':  self.date.isoformat(),
+                   'type': self.type,
+                   'camera_position': self.getCameraPosition(),
+                   'regions': self.getRegions(),
+                   }
+            return json.dumps(obj)
+        return self._serialized('json', (), build)
+
+    # Local circumstances for observers at arrays of latitudes and longitudes: distance to the
+    # central line, whether inside the path, and interpolated time, durations and sun altitude
+    # (see circumstances.py). Observers are processed in chunks, optionally across processes.
+    def evaluate(self, lats, lons, chunk_size=None, processes=None):
+        from . import circumstances
+        with metrics.timer(self._metrics(), 'evaluate'):
+            return circumstances.evaluate(self, lats, lons, chunk_size, processes)
+
+    # Approximate the shadow ellipse at every time in the interval, using limits where necessary.
+    # Returns a list of (central, semi_major_axis, semi_minor_axis, rotation) tuples.
+    # Memoized until the track changes.
+    def getShadowEllipses(self):
+        def compute():
+            with metrics.timer(self._metrics(), 'geodesics'):
+                return self.shadow_ellipses()
+        return list(self._memo(('shadow_ellipses',) + backends.chosen('geodesy'), compute))
+
+    def shadow_ellipses(self):
+        import numpy as np
+
+        # Where a position is missing, the first half of the track falls back on the first limit
+        # row and the second half on the second
+        count = len(self.time)
+        use_limit = np.minimum(np.floor(np.arange(count) / (count / 2)), 1).astype(int)
+        ellipse = {}
+        for key in ('north', 'central', 'south'):
+            limits = [point if point is not None else (math.nan, math.nan) for point in self.limits[key][:2]]
+            limits += [(math.nan, math.nan)] * (2 - len(limits))
+            positions = self.position[key].array()[:count]
+            missing = np.isnan(positions[:,0])[:,None]
+            ellipse[key] = np.where(missing, np.array(limits, dtype=float)[use_limit], positions)
+
+        # Approximate ellipse semiMajorAxis and rotation from WGS-84 geodesics across the path
+        # between the limit polylines, computed for all times at once
+        from . import geodesy
+        semi_major_axes, rotations = geodesy.shadow_axes(ellipse['north'], ellipse['south'], backends.get('geodesy'))
+
+        # Approximate elipse semiMinorAxis from sun altitude (probably way wrong!)
+        ellipse_axis_ratios = np.array(self.sun_altitude[:count], dtype=float) / 90
+        semi_minor_axes = semi_major_axes * ellipse_axis_ratios
+
+        central = [None if lon != lon else (lon, lat) for lon, lat in ellipse['central'].tolist()]
+        return [(c, round(a, 3), round(b, 3), round(r, 3)) for c, a, b, r in
+                zip(central, semi_major_axes.tolist(), semi_minor_axes.tolist(), rotations.tolist())]
+
+    # Waypoints of the north, central or south polyline where data exist, optionally simplified so
+    # that no dropped waypoint is more than tolerance metres off the line (see simplify.py)
+    def getPolyline(self, key, tolerance=None):
+        def compute():
+            positions = [position for position in self.position[key] if position != None]
+            if tolerance:
+                from . import simplify
+                positions = simplify.simplify(positions, tolerance)
+            return positions
+        return list(self._memo(('polyline', key, tolerance), compute))
+
+    # Generate a valid CZML object using all available data, optionally with polylines simplified
+    # to a tolerance in metres. The document is built by the "czml" backend (see backends.py).
+    # With compact=True sampled properties are given as an epoch plus relative seconds, and
+    # precision rounds coordinates to that many decimal places (see czmlwriter.py). Given start
+    # and/or end, only the samples in that time window are included (see window). Documents are
+    # memoized as JSON text (see czml_text), and each call returns a fresh copy.
+    def czml(self, tolerance=None, compact=False, precision=None, start=None, end=None):
+        if start is not None or end is not None:
+            track = self.window(start, end)
+            if len(track.time) == 0:
+                raise Exception('No samples between ' + str(start) + ' and ' + str(end))
+            return track.czml(tolerance, compact, precision)
+        return json.loads(self.czml_text(tolerance, compact, precision))
+
+    # The czml() document serialized as JSON text, computed on first use and memoized until the
+    # track or the czml and geodesy backends change (and shared between tracks while outputcache
+    # is enabled)
+    def czml_text(self, tolerance=None, compact=False, precision=None):
+        def build():
+            with metrics.timer(self._metrics(), 'czml'):
+                if compact or precision is not None:
+                    return ''.join(self.iter_czml(tolerance, compact, precision))
+                return json.dumps(backends.get('czml')(self, tolerance))
+        return self._serialized('czml', (tolerance, compact, precision) + backends.chosen('czml', 'geodesy'), build)
+
+    # Build the CZML document with the czml package
+    def czml_document(self, tolerance=None):
+
+        czml = backends.czml_library()
         doc = czml.CZML();
         iso = self.date.isoformat()
 
@@ -321,73 +582,25 @@ class EclipseTrack:
         ellipse_semiMinorAxis = []
         ellipse_rotation = []
 
-        for t in range(len(self.time)):
-
-            time = iso + "T" + self.time[t] + ":00Z"
-
-            # Define polyline waypoints only where data exist
-            if self.position['north'][t] != None:
-                north_polyline_degrees += [self.position['north'][t][0], self.position['north'][t][1], 0.0]
-            if self.position['central'][t] != None:
-                central_polyline_degrees += [self.position['central'][t][0], self.position['central'][t][1], 0.0]
-            if self.position['south'][t] != None:
-                south_polyline_degrees += [self.position['south'][t][0], self.position['south'][t][1], 0.0]
-
-            # Define ellipse positions and attributes for every time in the interval, using limits where necessary
-            use_limit = min(int(math.floor(t/(len(self.time)/2))),1)
-            if self.position['north'][t] == None:
-                north = self.limits['north'][use_limit]
-            else:
-                north = self.position['north'][t]
-            if self.position['central'][t] == None:
-                central = self.limits['central'][use_limit]
-            else:
-                central = self.position['central'][t]
-            if self.position['south'][t] == None:
-                south = self.limits['south'][use_limit]
-            else:
-                south = self.position['south'][t]
-
-            # Approximate ellipse semiMajorAxis from vincenty distance between limit polylines
-            north2 = (north[1], north[0])
-            south2 = (south[1], south[0])
-            semi_major_axis = vincenty(north2, south2).meters / 2
-
-            # Approximate elipse semiMinorAxis from sun altitude (probably way wrong!)
-            ellipse_axis_ratio = self.sun_altitude[t] / 90
-            semi_minor_axis = semi_major_axis * ellipse_axis_ratio
-
-            # Approximate ellipse rotation using basic spheroid (TODO: replace with WGS-84)
-            # Calculate bearing in both directions and average them
-            nlat = north[1]/180 * math.pi;
-            nlon = north[0]/180 * math.pi;
-            clat = central[1]/180 * math.pi;
-            clon = central[0]/180 * math.pi;
-            slat = south[1]/180 * math.pi;
-            slon = south[0]/180 * math.pi;
-
-            y = math.sin(slon-nlon) * math.cos(slat);
-            x = math.cos(nlat) * math.sin(slat) - math.sin(nlat) * math.cos(slat) * math.cos(slon-nlon);
-            initial_bearing = math.atan2(y, x)
-            if (initial_bearing < 0):
-                initial_bearing += math.pi * 2
-
-            y = math.sin(nlon-slon) * math.cos(nlat);
-            x = math.cos(slat) * math.sin(nlat) - math.sin(slat) * math.cos(nlat) * math.cos(nlon-slon);
-            final_bearing = math.atan2(y, x) - math.pi
-            if (final_bearing < 0):
-                final_bearing += math.pi * 2
-
-            rotation = -1 * ((initial_bearing + final_bearing) / 2 - (math.pi / 2))
-
+        # Define polyline waypoints only where data exist
+        for position in self.getPolyline('north', tolerance):
+            north_polyline_degrees += [position[0], position[1], 0.0]
+        for position in self.getPolyline('central', tolerance):
+            central_polyline_degrees += [position[0], position[1], 0.0]
+        for position in self.getPolyline('south', tolerance):
+            south_polyline_degrees += [position[0], position[1], 0.0]
+
+        # Define ellipse positions and attributes for every time in the interval
+        for t, (central, semi_major_axis, semi_minor_axis, rotation) in enumerate(self.getShadowEllipses()):
+            time = self.timestamp(self.time[t])
             ellipse_position += [time, central[0], central[1], 0.0]
-            ellipse_semiMajorAxis += [time, round(semi_major_axis, 3)]
-            ellipse_semiMinorAxis += [time, round(semi_minor_axis, 3)]
-            ellipse_rotation += [time, round(rotation, 3)]
+            ellipse_semiMajorAxis += [time, semi_major_axis]
+            ellipse_semiMinorAxis += [time, semi_minor_axis]
+            ellipse_rotation += [time, rotation]
 
         # Generate document packet with clock
-        start_time = iso + "T" + self.time[0] + ":00Z"
-        end_time = iso + "T" + self.time[-1] + ":00Z"
+        start_time = self.timestamp(self.time[0])
+        end_time = self.timestamp(self.time[-1])
         packet = czml.CZMLPacket(id='document',version='1.0')
         c = czml.Clock()
         c.multiplier = 300
@@ -441,4 +654,29 @@ class EclipseTrack:
         packet.position = czml.Position(cartographicDegrees=ellipse_position)
         doc.packets.append(packet)
 
-        return list(doc.data())
+        return doc
+
+    # Generate CZML documents at several levels of detail: {tolerance: czml(tolerance)}
+    def czmlLevels(self, tolerances=(None, 1000, 10000, 50000)):
+        return dict((tolerance, self.czml(tolerance)) for tolerance in tolerances)
+
+    # Stream the same CZML document as czml() (serialized as JSON) to a file-like object
+    def write_czml(self, fileobj, tolerance=None, compact=False, precision=None):
+        from . import czmlwriter
+        czmlwriter.write_czml(self, fileobj, tolerance, compact, precision)
+
+    # Generate the same CZML document as czml() as a sequence of JSON text chunks
+    def iter_czml(self, tolerance=None, compact=False, precision=None):
+        from . import czmlwriter
+        return czmlwriter.iter_czml(self, tolerance, compact, precision)
+
+    # Stream the path polygon and (if ellipses) the shadow ellipse outlines as GeoJSON to a
+    # file-like object (see geoexport.py)
+    def write_geojson(self, fileobj, ellipses=True, segments=None, precision=6):
+        from . import geoexport
+        geoexport.write_geojson(self, fileobj, ellipses, segments or geoexport.SEGMENTS, precision)
+
+    # Stream the same shapes as write_geojson as a KML document
+    def write_kml(self, fileobj, ellipses=True, segments=None, precision=6):
+        from . import geoexport
+        geoexport.write_kml(self, fileobj, ellipses, segments or geoexport.SEGMENTS, precision)
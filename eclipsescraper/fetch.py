@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+# Concurrent loading of many eclipse tracks over pooled keep-alive HTTP connections.
+#
+# Pages are fetched from a thread pool; each worker parses its page as soon as it arrives so that
+# parsing overlaps with waiting on the network for other events. Connections are kept open and
+# reused per host, and the number of requests in flight against any one host is capped.
+
+import threading
+import http.client
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from .eclipsescraper import EclipseTrack
+from . import metrics
+
+class ConnectionPool:
+
+    def __init__(self, per_host=2, timeout=30):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+        self._slots = {}
+
+    # Semaphore capping the number of concurrent requests against one host
+    def _slot(self, key):
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[key]
+
+    def _connect(self, key):
+        scheme, netloc = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    # Perform a GET request on an idle connection to the host (opening one if needed) and return
+    # (status, headers, body). A kept-alive connection the server has since dropped is retried once.
+    def request(self, url, headers=None):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        with self._slot(key):
+            with self._lock:
+                conn = self._idle[key].pop() if self._idle[key] else None
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = self._connect(key)
+                try:
+                    conn.request('GET', path, headers=headers or {})
+                    r = conn.getresponse()
+                    body = r.read()
+                    break
+                except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError):
+                    conn.close()
+                    conn = None
+                    if not reused:
+                        raise
+                    reused = False
+                except BaseException:
+                    # A timeout or a half-read response leaves the connection unusable
+                    conn.close()
+                    raise
+            if r.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle[key].append(conn)
+        return r.status, r.headers, body
+
+    def get(self, url):
+        status, headers, body = self.request(url)
+        if status != 200:
+            raise Exception('Unable to load URL: ' + url + ' (HTTP ' + str(status) + ')')
+        return body
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+# Fetch and parse a single track using a shared pool (or an HTTPCache, see cache.py)
+def load_track(pool, date, url, cache=None):
+    track = EclipseTrack(date)
+    track.setURL(url)
+    m = metrics.registry
+    with metrics.timer(m, 'fetch'):
+        if cache is not None:
+            body = cache.fetch(url)
+        else:
+            status, headers, body = pool.request(url)
+            if status != 200:
+                raise Exception('Unable to load eclipse event: ' + date.isoformat() + ' (URL: ' + url + ')')
+    if m is not None:
+        m.count('bytes_fetched', len(body))
+    track.loadFromBytes(body)
+    return track
+
+# Load tracks for a {date: url} mapping concurrently, yielding each EclipseTrack as it finishes
+def load_tracks(urls_by_date, concurrency=8, per_host=4, pool=None, cache=None):
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(per_host=per_host)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(load_track, pool, date, url, cache) for date, url in urls_by_date.items()]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if own_pool:
+            pool.close()
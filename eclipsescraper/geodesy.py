@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+# Batched geodesics on the WGS-84 ellipsoid.
+#
+# Solves the inverse geodesic problem (distance plus initial and final azimuths) with Vincenty's
+# method for whole arrays of point pairs at once. Iteration proceeds in lockstep over all pairs and
+# stops once every pair has converged, mirroring the scalar implementation in geopy.
+
+import math
+import numpy as np
+
+WGS84_MAJOR = 6378137.0
+WGS84_MINOR = 6356752.3142
+WGS84_FLATTENING = 1 / 298.257223563
+
+# Return (distance in meters, initial azimuth, final azimuth) for pairs of points given as arrays of
+# latitudes and longitudes in degrees. Azimuths are in radians, clockwise from north, in [0, 2*pi).
+def inverse(lat1, lon1, lat2, lon2, iterations=20):
+    major, minor, f = WGS84_MAJOR, WGS84_MINOR, WGS84_FLATTENING
+
+    lat1 = np.radians(np.asarray(lat1, dtype=float))
+    lat2 = np.radians(np.asarray(lat2, dtype=float))
+    delta_lng = np.radians(np.asarray(lon2, dtype=float) - np.asarray(lon1, dtype=float))
+
+    reduced1 = np.arctan((1 - f) * np.tan(lat1))
+    reduced2 = np.arctan((1 - f) * np.tan(lat2))
+    sin_reduced1, cos_reduced1 = np.sin(reduced1), np.cos(reduced1)
+    sin_reduced2, cos_reduced2 = np.sin(reduced2), np.cos(reduced2)
+
+    lambda_lng = delta_lng.copy()
+    converged = np.zeros(lambda_lng.shape, dtype=bool)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(iterations + 1):
+            sin_lambda_lng, cos_lambda_lng = np.sin(lambda_lng), np.cos(lambda_lng)
+            sin_sigma = np.sqrt((cos_reduced2 * sin_lambda_lng) ** 2 +
+                                (cos_reduced1 * sin_reduced2 - sin_reduced1 * cos_reduced2 * cos_lambda_lng) ** 2)
+            cos_sigma = sin_reduced1 * sin_reduced2 + cos_reduced1 * cos_reduced2 * cos_lambda_lng
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_reduced1 * cos_reduced2 * sin_lambda_lng / sin_sigma)
+            cos_sq_alpha = 1 - sin_alpha ** 2
+            cos2_sigma_m = np.where(cos_sq_alpha == 0, 0.0,
+                                    cos_sigma - 2 * sin_reduced1 * sin_reduced2 / cos_sq_alpha)
+            C = f / 16. * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+            lambda_prime = lambda_lng
+            lambda_lng = np.where(converged, lambda_lng,
+                                  delta_lng + (1 - C) * f * sin_alpha * (
+                                      sigma + C * sin_sigma * (cos2_sigma_m + C * cos_sigma * (-1 + 2 * cos2_sigma_m ** 2))))
+            converged |= (np.abs(lambda_lng - lambda_prime) <= 10e-12) | (sin_sigma == 0)
+            if converged.all():
+                break
+        else:
+            raise ValueError("Vincenty formula failed to converge!")
+
+        # Evaluate the final terms with the converged lambda
+        sin_lambda_lng, cos_lambda_lng = np.sin(lambda_lng), np.cos(lambda_lng)
+        sin_sigma = np.sqrt((cos_reduced2 * sin_lambda_lng) ** 2 +
+                            (cos_reduced1 * sin_reduced2 - sin_reduced1 * cos_reduced2 * cos_lambda_lng) ** 2)
+        cos_sigma = sin_reduced1 * sin_reduced2 + cos_reduced1 * cos_reduced2 * cos_lambda_lng
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        sin_alpha = np.where(sin_sigma == 0, 0.0, cos_reduced1 * cos_reduced2 * sin_lambda_lng / sin_sigma)
+        cos_sq_alpha = 1 - sin_alpha ** 2
+        cos2_sigma_m = np.where(cos_sq_alpha == 0, 0.0,
+                                cos_sigma - 2 * sin_reduced1 * sin_reduced2 / cos_sq_alpha)
+
+    u_sq = cos_sq_alpha * (major ** 2 - minor ** 2) / minor ** 2
+    A = 1 + u_sq / 16384. * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    B = u_sq / 1024. * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = B * sin_sigma * (cos2_sigma_m + B / 4. * (
+        cos_sigma * (-1 + 2 * cos2_sigma_m ** 2) -
+        B / 6. * cos2_sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos2_sigma_m ** 2)))
+    distance = np.where(sin_sigma == 0, 0.0, minor * A * (sigma - delta_sigma))
+
+    initial = np.arctan2(cos_reduced2 * sin_lambda_lng,
+                         cos_reduced1 * sin_reduced2 - sin_reduced1 * cos_reduced2 * cos_lambda_lng)
+    final = np.arctan2(cos_reduced1 * sin_lambda_lng,
+                       -sin_reduced1 * cos_reduced2 + cos_reduced1 * sin_reduced2 * cos_lambda_lng)
+    return distance, np.mod(initial, 2 * math.pi), np.mod(final, 2 * math.pi)
+
+# Approximate the shadow ellipse for each sample from the north and south limits of the path:
+# the semi-major axis is half the geodesic distance across the path and the rotation is the mean
+# of the initial and final azimuths across the path, measured counterclockwise from east.
+# Points are (lon, lat) pairs as stored on EclipseTrack. Returns (semi_major_axes, rotations).
+# Geodesics are solved by inverse, or by the one above if not given.
+def shadow_axes(north, south, inverse=inverse):
+    north = np.asarray(north, dtype=float).reshape(-1, 2)
+    south = np.asarray(south, dtype=float).reshape(-1, 2)
+    distance, initial, final = inverse(north[:,1], north[:,0], south[:,1], south[:,0])
+    rotation = -1 * ((initial + final) / 2 - (math.pi / 2))
+    return distance / 2, rotation
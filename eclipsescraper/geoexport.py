@@ -0,0 +1,187 @@
+#!/usr/bin/python
+
+# GeoJSON and KML export of eclipse paths and shadow footprints.
+#
+# Each track is exported as a polygon of its path (the north limit followed by the south limit in
+# reverse) and, optionally, one polygon per time step approximating the shadow ellipse that czml()
+# animates (see EclipseTrack.getShadowEllipses). The outlines of all ellipses of a track are computed
+# at once with NumPy. Outlines are computed with longitudes running on past +/-180, so that they
+# stay continuous across the antimeridian, and are then cut there (see split_ring): a shape that
+# crosses it is written as a MultiPolygon (GeoJSON) or MultiGeometry (KML), and every longitude
+# written is within [-180, 180] as RFC 7946 and KML require.
+#
+# Output is streamed feature by feature (GeoJSON) or placemark by placemark (KML) to a file, and
+# the tracks can be any iterable (e.g. a generator loading pages one at a time), so exporting a
+# whole catalog never holds more than one track and its outlines in memory.
+
+import json
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .simplify import EARTH_RADIUS
+
+# Points on the outline of each shadow ellipse
+SEGMENTS = 36
+
+# Continue longitudes (degrees) across the antimeridian instead of wrapping at +/-180
+def _unwrap(lons):
+    return np.degrees(np.unwrap(np.radians(lons)))
+
+# Twice the signed area of a closed ring of (lon, lat) points: positive when it runs counterclockwise
+def _signed_area(ring):
+    return float(np.sum(ring[:-1,0] * ring[1:,1] - ring[1:,0] * ring[:-1,1]))
+
+# Points of a closed ring on one side of the meridian at lon (below or above it), with the points
+# where its edges cross the meridian inserted (Sutherland-Hodgman); the result is closed again
+def _clip(ring, lon, below):
+    inside = ring[:,0] <= lon if below else ring[:,0] >= lon
+    if inside.all():
+        return ring
+    start, end = ring[:-1], ring[1:]
+    crosses = inside[:-1] != inside[1:]
+    span = np.where(crosses, end[:,0] - start[:,0], 1)
+    crossings = start + ((lon - start[:,0]) / span)[:,None] * (end - start)
+    crossings[:,0] = lon
+    points = np.stack([start, crossings], axis=1)[np.stack([inside[:-1], crosses], axis=1)]
+    if len(points) == 0:
+        return points
+    # Drop repeated points (where a vertex lies on the meridian)
+    points = points[np.concatenate([[True], (np.diff(points, axis=0) != 0).any(axis=1)])]
+    return np.concatenate([points, points[:1]])
+
+# Cut a closed ring of (lon, lat) points with continuous longitudes at the antimeridian. Returns a
+# list of closed rings, each with its longitudes wrapped into [-180, 180]: the ring itself when it
+# doesn't cross, otherwise one ring for each 360 degrees of longitude it spans into.
+def split_ring(ring):
+    lons = ring[:,0]
+    if lons.min() >= -180 and lons.max() <= 180:
+        return [ring]
+    rings = []
+    for turn in range(int(np.floor((lons.min() + 180) / 360)), int(np.floor((lons.max() + 180) / 360)) + 1):
+        piece = _clip(_clip(ring, 360 * turn - 180, False), 360 * turn + 180, True)
+        # Skip slivers lying along the antimeridian
+        if len(piece) >= 4 and np.ptp(piece[:,0]) > 0:
+            rings.append(piece - [360 * turn, 0])
+    return rings
+
+# Closed ring of (lon, lat) points around the path: north limit, then south limit reversed, turned
+# round where needed to run counterclockwise (the right-hand rule of RFC 7946 for exterior rings).
+# None when either limit has fewer than two points.
+def path_polygon(track):
+    north = track.position['north'].array()
+    south = track.position['south'].array()
+    north = north[~np.isnan(north[:,0])]
+    south = south[~np.isnan(south[:,0])]
+    if len(north) < 2 or len(south) < 2:
+        return None
+    ring = np.concatenate([north, south[::-1], north[:1]])
+    ring[:,0] = _unwrap(ring[:,0])
+    if _signed_area(ring) < 0:
+        ring = ring[::-1].copy()
+    return ring
+
+# Outlines of the shadow ellipses of a track. Returns (steps, rings): the indexes of the time steps
+# with a usable ellipse and an array of shape (len(steps), segments + 1, 2) holding a closed ring of
+# (lon, lat) points for each, running counterclockwise. Semi-axes are in metres, rotation is of the
+# semi-major axis, counterclockwise from east (as geodesy.shadow_axes); points are placed on a sphere.
+def ellipse_rings(track, segments=SEGMENTS, ellipses=None):
+    if ellipses is None:
+        ellipses = track.getShadowEllipses()
+    if not ellipses:
+        return np.zeros(0, dtype=int), np.zeros((0, segments + 1, 2))
+    centres = np.array([e[0] if e[0] is not None else (np.nan, np.nan) for e in ellipses], dtype=float)
+    axes = np.array([e[1:] for e in ellipses], dtype=float)
+    steps = np.flatnonzero(np.isfinite(centres).all(axis=1) & np.isfinite(axes).all(axis=1) & (axes[:,0] > 0))
+    lon0, lat0 = np.radians(centres[steps,0])[:,None], np.radians(centres[steps,1])[:,None]
+    major, minor, rotation = axes[steps,0][:,None], axes[steps,1][:,None], axes[steps,2][:,None]
+
+    # East and north offsets of the outline, then distance and bearing from the centre
+    theta = np.linspace(0, 2 * np.pi, segments + 1)[None,:]
+    u, v = major * np.cos(theta), minor * np.sin(theta)
+    east = u * np.cos(rotation) - v * np.sin(rotation)
+    north = u * np.sin(rotation) + v * np.cos(rotation)
+    delta = np.hypot(east, north) / EARTH_RADIUS
+    bearing = np.arctan2(east, north)
+
+    lat = np.arcsin(np.clip(np.sin(lat0) * np.cos(delta) + np.cos(lat0) * np.sin(delta) * np.cos(bearing), -1, 1))
+    lon = lon0 + np.arctan2(np.sin(bearing) * np.sin(delta) * np.cos(lat0), np.cos(delta) - np.sin(lat0) * np.sin(lat))
+    rings = np.stack([np.degrees(lon), np.degrees(lat)], axis=2)
+    rings[:,-1] = rings[:,0]
+    return steps, rings
+
+# Generate (properties, rings) for the path and (if ellipses) the shadow ellipses of a track, where
+# rings is the list of polygons (see split_ring) making up the shape
+def iter_shapes(track, ellipses=True, segments=SEGMENTS, precision=6):
+    iso = track.date.isoformat()
+    ring = path_polygon(track)
+    if ring is not None:
+        yield {'iso': iso, 'type': track.type, 'kind': 'path'}, [np.round(r, precision) for r in split_ring(ring)]
+    if not ellipses:
+        return
+    shadows = track.getShadowEllipses()
+    steps, rings = ellipse_rings(track, segments, shadows)
+    for step, ring in zip(steps.tolist(), rings):
+        central, semi_major_axis, semi_minor_axis, rotation = shadows[step]
+        yield ({'iso': iso, 'type': track.type, 'kind': 'shadow', 'time': track.timestamp(track.time[step]),
+                'semi_major_axis': semi_major_axis, 'semi_minor_axis': semi_minor_axis, 'rotation': rotation},
+               [np.round(r, precision) for r in split_ring(ring)])
+
+# A single track is exported like a catalog of one
+def _tracks(tracks):
+    return [tracks] if hasattr(tracks, 'position') else tracks
+
+# Generate a GeoJSON FeatureCollection of the shapes of tracks as a sequence of text chunks
+def iter_geojson(tracks, ellipses=True, segments=SEGMENTS, precision=6):
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for track in _tracks(tracks):
+        for properties, rings in iter_shapes(track, ellipses, segments, precision):
+            if len(rings) == 1:
+                geometry = {'type': 'Polygon', 'coordinates': [rings[0].tolist()]}
+            else:
+                geometry = {'type': 'MultiPolygon', 'coordinates': [[ring.tolist()] for ring in rings]}
+            yield separator + json.dumps({'type': 'Feature', 'properties': properties, 'geometry': geometry},
+                                         separators=(',', ':'))
+            separator = ',\n'
+    yield ']}\n'
+
+def _polygon(ring):
+    coordinates = ' '.join('%r,%r' % (lon, lat) for lon, lat in ring.tolist())
+    return ('<Polygon><tessellate>1</tessellate><outerBoundaryIs><LinearRing><coordinates>' + coordinates +
+            '</coordinates></LinearRing></outerBoundaryIs></Polygon>')
+
+def _placemark(properties, rings):
+    name = properties['iso'] + (' path' if properties['kind'] == 'path' else ' shadow ' + properties['time'])
+    when = '<TimeStamp><when>' + properties['time'] + '</when></TimeStamp>' if 'time' in properties else ''
+    data = ''.join('<Data name="%s"><value>%s</value></Data>' % (key, escape(str(value)))
+                   for key, value in properties.items())
+    geometry = ''.join(_polygon(ring) for ring in rings)
+    if len(rings) > 1:
+        geometry = '<MultiGeometry>' + geometry + '</MultiGeometry>'
+    return ('<Placemark><name>' + escape(name) + '</name>' + when + '<styleUrl>#' + properties['kind'] + '</styleUrl>'
+            '<ExtendedData>' + data + '</ExtendedData>' + geometry + '</Placemark>\n')
+
+KML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+              '<Style id="path"><LineStyle><color>80ffffff</color></LineStyle><PolyStyle><color>402f96df</color></PolyStyle></Style>\n'
+              '<Style id="shadow"><LineStyle><width>0</width></LineStyle><PolyStyle><color>a0000000</color></PolyStyle></Style>\n')
+
+# Generate a KML document of the shapes of tracks (a folder per track) as a sequence of text chunks
+def iter_kml(tracks, ellipses=True, segments=SEGMENTS, precision=6):
+    yield KML_HEADER
+    for track in _tracks(tracks):
+        yield '<Folder><name>' + escape(track.date.isoformat() + ' ' + str(track.type)) + '</name>\n'
+        for properties, rings in iter_shapes(track, ellipses, segments, precision):
+            yield _placemark(properties, rings)
+        yield '</Folder>\n'
+    yield '</Document></kml>\n'
+
+# Write the GeoJSON for tracks to a file-like object opened in text mode
+def write_geojson(tracks, fileobj, ellipses=True, segments=SEGMENTS, precision=6):
+    for chunk in iter_geojson(tracks, ellipses, segments, precision):
+        fileobj.write(chunk)
+
+# Write the KML for tracks to a file-like object opened in text mode
+def write_kml(tracks, fileobj, ellipses=True, segments=SEGMENTS, precision=6):
+    for chunk in iter_kml(tracks, ellipses, segments, precision):
+        fileobj.write(chunk)
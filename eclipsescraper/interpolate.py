@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+# Resampling of eclipse tracks onto a regular time grid.
+#
+# Limit and central line positions are interpolated along great circles (spherical linear
+# interpolation between unit vectors); sun altitude, path width, diameter ratio and central line
+# duration linearly; sun azimuth linearly along the shorter way around the circle. All columns are
+# interpolated for every grid time at once.
+
+import numpy as np
+
+from . import parser
+
+# Times (in seconds) of the samples of a track, unwrapped across midnight
+def sample_seconds(times):
+    t = np.array([parser.seconds(time) for time in times], dtype=float)
+    wraps = np.concatenate([[0], np.cumsum(np.diff(t) < 0)])
+    return t + wraps * 86400
+
+# Regular grid from the first to the last sample, always including the last sample
+def time_grid(t, step):
+    grid = t[0] + step * np.arange(int(np.floor((t[-1] - t[0]) / step)) + 1)
+    if grid[-1] < t[-1]:
+        grid = np.append(grid, t[-1])
+    return grid
+
+# Segment index and fraction along that segment for every grid time
+def locate(t, grid):
+    index = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, len(t) - 2)
+    fraction = (grid - t[index]) / (t[index + 1] - t[index])
+    return index, fraction
+
+def linear(values, index, fraction):
+    values = np.array([np.nan if v is None else v for v in values], dtype=float)
+    return values[index] + (values[index + 1] - values[index]) * fraction
+
+def angular(degrees, index, fraction):
+    degrees = np.array([np.nan if v is None else v for v in degrees], dtype=float)
+    delta = (degrees[index + 1] - degrees[index] + 180) % 360 - 180
+    return (degrees[index] + delta * fraction) % 360
+
+# Interpolate (lon, lat) points in degrees along great circles
+def great_circle(points, index, fraction):
+    points = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lon, lat = points[:,0], points[:,1]
+    v = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+    a, b = v[index], v[index + 1]
+    omega = np.arccos(np.clip((a * b).sum(axis=1), -1, 1))
+    sin_omega = np.sin(omega)
+    small = sin_omega < 1e-12
+    safe = np.where(small, 1, sin_omega)
+    wa = np.where(small, 1 - fraction, np.sin((1 - fraction) * omega) / safe)
+    wb = np.where(small, fraction, np.sin(fraction * omega) / safe)
+    p = a * wa[:,None] + b * wb[:,None]
+    lons = np.degrees(np.arctan2(p[:,1], p[:,0]))
+    lats = np.degrees(np.arctan2(p[:,2], np.hypot(p[:,0], p[:,1])))
+    return lons, lats
+
+def _values(array, digits):
+    return [None if np.isnan(v) else round(v, digits) for v in array.tolist()]
+
+def _points(lons, lats):
+    return [(round(lon, 3), round(lat, 3)) for lon, lat in zip(lons.tolist(), lats.tolist())]
+
+# Build a new track with samples every step seconds, interpolated from the samples of track
+def resample(track, step):
+    if step <= 0:
+        raise ValueError('step must be positive')
+    resampled = track.__class__(track.date)
+    resampled.url = track.url
+    resampled.type = track.type
+    resampled.columns = list(track.columns)
+    resampled.limits = {key: list(values) for key, values in track.limits.items()}
+
+    if len(track.time) < 2:
+        for attr in ('time', 'ms_diam_ratio', 'sun_altitude', 'sun_azimuth', 'path_width', 'central_line_duration'):
+            setattr(resampled, attr, list(getattr(track, attr)))
+        resampled.position = {key: list(values) for key, values in track.position.items()}
+        return resampled
+
+    t = sample_seconds(track.time)
+    grid = time_grid(t, step)
+    index, fraction = locate(t, grid)
+
+    resampled.time = [parser.format_time(s) for s in grid.tolist()]
+    resampled.position = {key: _points(*great_circle(track.position[key], index, fraction))
+                          for key in ('north', 'south', 'central')}
+    resampled.ms_diam_ratio = _values(linear(track.ms_diam_ratio, index, fraction), 3)
+    resampled.sun_altitude = _values(linear(track.sun_altitude, index, fraction), 1)
+    resampled.sun_azimuth = _values(angular(track.sun_azimuth, index, fraction), 1)
+    resampled.path_width = _values(linear(track.path_width, index, fraction), 1)
+    durations = linear([parser.duration_seconds(d) for d in track.central_line_duration], index, fraction)
+    resampled.central_line_duration = [None if np.isnan(d) else parser.format_duration(d) for d in durations.tolist()]
+    return resampled
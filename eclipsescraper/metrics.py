@@ -0,0 +1,126 @@
+#!/usr/bin/python
+
+# Optional instrumentation: wall time per processing stage and a few counters.
+#
+# Nothing is recorded unless a Metrics object is given to an EclipseTrack or installed process-wide
+# with enable(); while disabled each instrumented stage costs one None check. Stages recorded:
+#
+#   fetch            opening a URL (or fetching it through the cache), up to the response headers
+#   stream           reading and parsing a page as it arrives (loadFromURL without a cache)
+#   decode           decoding the <pre> block of a page given as bytes to text
+#   partition        finding the <pre> block of a raw page
+#   tokenize         splitting the table into token rows
+#   parse_rows       converting and storing token rows
+#   geodesics        computing shadow ellipses for czml()
+#   czml             building the whole CZML document (includes geodesics and czml_serialize)
+#   czml_serialize   turning the czml package's packets into plain data (czml backend "czml")
+#   evaluate         local circumstances for arrays of observers (EclipseTrack.evaluate)
+#
+# Counters: bytes_fetched, rows_seen, rows_dropped (by parse_row) and hyphens_expanded.
+
+import io, time, threading
+
+class Metrics:
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            calls, total = self.stages.get(stage, (0, 0.0))
+            self.stages[stage] = (calls + 1, total + seconds)
+
+    def count(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    # Context manager adding the wall time spent inside it to a stage
+    def timer(self, stage):
+        return Timer(self, stage)
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    def as_dict(self):
+        with self._lock:
+            return {'stages': dict((stage, {'calls': calls, 'seconds': total})
+                                   for stage, (calls, total) in self.stages.items()),
+                    'counters': dict(self.counters)}
+
+    # Prometheus text exposition format
+    def prometheus(self, prefix='eclipsescraper'):
+        data = self.as_dict()
+        lines = ['# TYPE %s_stage_seconds_total counter' % prefix]
+        for stage in sorted(data['stages']):
+            lines.append('%s_stage_seconds_total{stage="%s"} %r' % (prefix, stage, data['stages'][stage]['seconds']))
+        lines.append('# TYPE %s_stage_calls_total counter' % prefix)
+        for stage in sorted(data['stages']):
+            lines.append('%s_stage_calls_total{stage="%s"} %d' % (prefix, stage, data['stages'][stage]['calls']))
+        for counter in sorted(data['counters']):
+            lines.append('# TYPE %s_%s_total counter' % (prefix, counter))
+            lines.append('%s_%s_total %d' % (prefix, counter, data['counters'][counter]))
+        return '\n'.join(lines) + '\n'
+
+class Timer:
+
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+class NullTimer:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = NullTimer()
+
+# Binary stream counting the bytes read through it into bytes_fetched
+class CountingStream(io.RawIOBase):
+
+    def __init__(self, raw, metrics):
+        self.raw = raw
+        self.metrics = metrics
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        if n:
+            self.metrics.count('bytes_fetched', n)
+        return n
+
+# Process-wide metrics, used by tracks that weren't given their own
+registry = None
+
+def enable(metrics=None):
+    global registry
+    registry = Metrics() if metrics is None else metrics
+    return registry
+
+def disable():
+    global registry
+    registry = None
+
+# Timer for a stage of metrics, or a shared no-op one when metrics is None
+def timer(metrics, stage):
+    return NULL_TIMER if metrics is None else metrics.timer(stage)
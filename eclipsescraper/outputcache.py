@@ -0,0 +1,80 @@
+#!/usr/bin/python
+
+# Optional process-wide cache of serialized output.
+#
+# Tracks memoize their derived results themselves (see EclipseTrack._derived_values), but a server
+# that reloads or re-slices tracks would still rebuild the same documents. Once enabled with
+# enable(), the JSON text of czml() and json() is also kept here, least recently used first out,
+# shared by every track in the process. Entries are keyed by the date and type of the eclipse, the
+# span and number of its samples, a fingerprint of the track's contents (so that windows, resampled
+# tracks and tracks changed in place don't collide with the whole track as loaded) and the output
+# options, which include the backends chosen.
+
+import threading
+from collections import OrderedDict
+
+class OutputCache:
+
+    def __init__(self, maxsize=256, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    # Cached text for a key, or None
+    def get(self, key):
+        with self._lock:
+            text = self.entries.get(key)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            if key in self.entries:
+                self.bytes -= len(self.entries.pop(key))
+            self.entries[key] = text
+            self.bytes += len(text)
+            while self.entries and (len(self.entries) > self.maxsize or
+                                    (self.maxbytes is not None and self.bytes > self.maxbytes)):
+                key, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self.entries), 'bytes': self.bytes,
+                    'hit_rate': self.hits / lookups if lookups else None}
+
+# Key of an output of a track: (kind, date, type, samples, first time, last time, fingerprint)
+# + options
+def key(track, kind, options=()):
+    times = track.time
+    span = (times[0], times[-1]) if len(times) else (None, None)
+    return (kind, track.date.isoformat(), track.type, len(times)) + span + (track.fingerprint(),) + tuple(options)
+
+# Process-wide cache, used by every track while enabled
+cache = None
+
+def enable(maxsize=256, maxbytes=None):
+    global cache
+    cache = OutputCache(maxsize, maxbytes)
+    return cache
+
+def disable():
+    global cache
+    cache = None
@@ -0,0 +1,237 @@
+#!/usr/bin/python
+
+# Schema-driven parsing of the path tables found between <pre> tags on NASA's eclipse pages.
+#
+# A table is tokenized in a single pass into rows of whitespace-separated tokens and then converted
+# column by column (rather than cell by cell) using the schema below. Each schema entry maps a column
+# name, as listed in EclipseTrack.columns, to the token position it starts at and a bulk converter.
+
+import re
+
+# Generic function for converting points in degrees with cardinal direction numbers to floats
+def parseLatLon(v1, v2):
+    try:
+        val = float(v1) + (float(v2.rstrip('NESW'))/60)
+        if v2.endswith('S') or v2.endswith('W'):
+            val *= -1
+        return round(val,3)
+    except ValueError:
+        return None
+
+# Times in path tables are UT "HH:MM"; resampled tracks may also hold "HH:MM:SS"
+def clock(time):
+    if len(time) == 5:
+        return time + ':00'
+    return time
+
+def seconds(time):
+    parts = time.split(':')
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + (float(parts[2]) if len(parts) > 2 else 0)
+
+def format_time(seconds):
+    seconds = int(round(seconds)) % 86400
+    if seconds % 60 == 0:
+        return '%02d:%02d' % (seconds // 3600, seconds // 60 % 60)
+    return '%02d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+# Central line durations are given as e.g. "02m35.7s"
+def duration_seconds(duration):
+    try:
+        minutes, rest = duration.split('m')
+        return int(minutes) * 60 + float(rest.rstrip('s'))
+    except (AttributeError, ValueError):
+        return None
+
+def format_duration(seconds):
+    seconds = round(seconds, 1)
+    minutes = int(seconds // 60)
+    return '%02dm%04.1fs' % (minutes, seconds - minutes * 60)
+
+# Bulk converters: each takes every tokenized row and a token index and returns one value per row.
+# Missing or malformed cells convert to None. Parsing needs nothing beyond the standard library:
+# numeric columns of BULK_ROWS rows or more are converted with NumPy when it is installed (imported
+# on first use, so that importing the parser stays cheap), and otherwise, as for fewer rows (where
+# setting up the arrays costs more than it saves), cell by cell.
+BULK_ROWS = 64
+
+def _bulk(rows):
+    if len(rows) < BULK_ROWS:
+        return False
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+def _tokens(rows, index):
+    return [row[index] if index < len(row) else '' for row in rows]
+
+# Float for a single token, None where it is not a number
+def _number(token):
+    try:
+        value = float(token)
+    except ValueError:
+        return None
+    return None if value != value else value
+
+PLACEHOLDERS = frozenset(('-', '?', ''))
+
+# Floats for a list of tokens, NaN where a token is not a plain decimal number. A column holding
+# placeholders for missing values ("-", "?") is converted again with those replaced by NaN, and
+# only a column holding anything else is screened with string operations.
+def _numbers(tokens):
+    import numpy as np
+    try:
+        return np.array(tokens, dtype=float)
+    except ValueError:
+        pass
+    try:
+        return np.array(['nan' if token in PLACEHOLDERS else token for token in tokens], dtype=float)
+    except ValueError:
+        pass
+    strings = np.array(tokens, dtype=str)
+    digits = np.char.replace(np.char.lstrip(strings, '+-'), '.', '', count=1)
+    valid = np.char.isdigit(digits) & (np.char.count(strings, '-') + np.char.count(strings, '+') <= 1)
+    values = np.full(len(strings), np.nan)
+    values[valid] = strings[valid].astype(float)
+    return values
+
+def _values(numbers):
+    import numpy as np
+    values = numbers.astype(object)
+    values[np.isnan(numbers)] = None
+    return values.tolist()
+
+def text_column(rows, index):
+    return [row[index] if index < len(row) else None for row in rows]
+
+def float_column(rows, index):
+    if not _bulk(rows):
+        return [_number(token) for token in _tokens(rows, index)]
+    return _values(_numbers(_tokens(rows, index)))
+
+# Degrees and minutes with a cardinal direction (e.g. "41 30.2N") in two tokens
+def latlon_column(rows, index):
+    if not _bulk(rows):
+        return [parseLatLon(row[index], row[index + 1]) if index + 1 < len(row) else None for row in rows]
+    import numpy as np
+    minutes = _tokens(rows, index + 1)
+    south_west = np.array([token[-1:] in ('S', 'W') for token in minutes])
+    values = np.round(_numbers(_tokens(rows, index)) + _numbers([token.rstrip('NESW') for token in minutes]) / 60, 3)
+    return _values(np.where(south_west, -values, values))
+
+SCHEMA = { 'Time':                (0,  text_column),
+           'NorthLimitLat':       (1,  latlon_column),
+           'NorthLimitLon':       (3,  latlon_column),
+           'SouthLimitLat':       (5,  latlon_column),
+           'SouthLimitLon':       (7,  latlon_column),
+           'CentralLat':          (9,  latlon_column),
+           'CentralLon':          (11, latlon_column),
+           'MSDiamRatio':         (13, float_column),
+           'SunAltitude':         (14, float_column),
+           'SunAzimuth':          (15, float_column),
+           'PathWidth':           (16, float_column),
+           'CentralLineDuration': (17, text_column),
+           }
+
+# Expand some single hyphens to two fields
+""" Sometimes a single hyphen will be used to denote a lack of a waypoint but this breaks the parsing
+    when we expect each waypoint to be two values separated by whitespace. This function detects
+    single hyphens that are placeholders for waypoints and replaces them with two spaced ?s.
+    NOTE: Only waypoints apply - sometimes single hyphens are placeholders for other values and that
+          alone doesn't break parsing. Hence we only check for hyphens between list indexes 0 and 6.
+    This is incredibly hacky, but such is the nature of parsing quirky upstream data."""
+def preparseHyphens(row):
+    if '-' not in row[:6] or row[0] == '-':
+        return row
+    index = 1
+    while index < 6 and index < len(row):
+        if row[index] == '-':
+            row[index:index+1] = ['?', '?']
+            index += 2
+        else:
+            index += 1
+    return row
+
+# Split a source into lines lazily. The source may be a string, a file-like object with read() or
+# any iterable of text chunks; \r and \n both end a line.
+def iter_lines(source, chunk_size=8192):
+    if isinstance(source, str):
+        chunks = [source]
+    elif hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+    else:
+        chunks = source
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).replace('\r', '\n').split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    yield pending
+
+# Restrict lines of a raw page to those between <pre> tags
+def iter_pre_lines(lines):
+    inside = False
+    content = False
+    for line in lines:
+        if not inside:
+            if '<pre>' not in line:
+                continue
+            inside = True
+            line = line.partition('<pre>')[2]
+        closed = '</pre>' in line
+        if closed:
+            line = line.partition('</pre>')[0]
+        content = content or len(line.strip()) > 0
+        yield line
+        if closed:
+            break
+    if not content:
+        raise Exception('raw data string not found between <pre> tags')
+
+PRE_OPEN = re.compile(rb'<pre>')
+PRE_CLOSE = re.compile(rb'</pre>')
+
+# Offsets (start, stop) of the contents of the <pre> block of a raw page given as any bytes-like
+# object (bytes, a memoryview, an mmap), found without copying the page. An unclosed block runs to
+# the end; without a block the span is empty.
+def pre_span(buf):
+    match = PRE_OPEN.search(buf)
+    if match is None:
+        return len(buf), len(buf)
+    close = PRE_CLOSE.search(buf, match.end())
+    return match.end(), len(buf) if close is None else close.start()
+
+# Split lines of table text into token rows, starting at the first line mentioning "Limits" and
+# stopping as soon as the given number of "Limits" rows has been consumed
+def iter_tokens(lines, limits=2):
+    if limits <= 0:
+        return
+    first_limits = False
+    for line in lines:
+        if not first_limits:
+            if "Limits" not in line:
+                continue
+            first_limits = True
+        row = line.split()
+        if len(row) == 0:
+            continue
+        yield preparseHyphens(row)
+        if row[0] == 'Limits':
+            limits -= 1
+            if limits == 0:
+                break
+
+def tokenize(html, limits=2):
+    return list(iter_tokens(html.replace('\r', '\n').split('\n'), limits))
+
+# Convert token rows into one list of values per column, in the order given by columns
+def convert(rows, columns):
+    converted = []
+    for column in columns:
+        if column not in SCHEMA:
+            raise Exception('Unknown column: ' + str(column))
+        index, converter = SCHEMA[column]
+        converted.append(converter(rows, index))
+    return converted
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+
+# Classification of tracks into named geographic regions.
+#
+# Regions are loaded from a JSON file (see regions.json for the format and the default regions) and
+# indexed once on a regular lat/lon grid: every grid cell lists the regions whose extent touches it.
+# Classifying a track then bins all of its points into cells with array operations and only tests
+# each cell's points against that cell's candidate regions, rather than every region against every
+# point.
+
+import os, json
+import numpy as np
+
+DEFAULT_REGIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'regions.json')
+
+class Region:
+
+    def __init__(self, name, box=None, polygon=None):
+        self.name = name
+        self.box = box
+        self.polygon = None if polygon is None else np.asarray(polygon, dtype=float).reshape(-1, 2)
+        if (box is None) == (polygon is None):
+            raise Exception('Region ' + repr(name) + ' must define exactly one of box or polygon')
+
+    # Longitude intervals and the latitude interval covered by the region
+    def extent(self):
+        if self.box is not None:
+            south, north, west, east = self.box
+            if west == east:
+                lons = [(-180, 180)]
+            elif west > east:
+                lons = [(west, 180), (-180, east)]
+            else:
+                lons = [(west, east)]
+            return lons, (south, north)
+        lons, lats = self.polygon[:,0], self.polygon[:,1]
+        return [(lons.min(), lons.max())], (lats.min(), lats.max())
+
+    # Boolean mask of which points (arrays of lon and lat) fall strictly inside the region
+    def contains(self, lons, lats):
+        if self.box is not None:
+            south, north, west, east = self.box
+            inside = (south < lats) & (lats < north)
+            if west == east:
+                return inside
+            elif west > east:
+                return inside & (((west < lons) & (lons < 180)) | ((-180 < lons) & (lons < east)))
+            return inside & (west < lons) & (lons < east)
+
+        # Even-odd ray casting against every edge of the polygon at once
+        x1, y1 = self.polygon[:,0], self.polygon[:,1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+        lons = lons[:,None]
+        lats = lats[:,None]
+        crosses = (y1 > lats) != (y2 > lats)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+        return (crosses & (lons < x_cross)).sum(axis=1) % 2 == 1
+
+class RegionClassifier:
+
+    def __init__(self, regions, cell_size=5.0):
+        self.regions = regions
+        self.cell_size = cell_size
+        self.rows = int(np.ceil(180 / cell_size))
+        self.cols = int(np.ceil(360 / cell_size))
+        self.index = self.build_index()
+
+    @classmethod
+    def load(cls, path=DEFAULT_REGIONS, cell_size=5.0):
+        with open(path) as f:
+            data = json.load(f)
+        regions = [Region(r['name'], box=r.get('box'), polygon=r.get('polygon')) for r in data['regions']]
+        return cls(regions, cell_size)
+
+    # Map each point (arrays of lon and lat) to the id of its grid cell
+    def cells(self, lons, lats):
+        return self.rows_of(lats) * self.cols + self.cols_of(lons)
+
+    def rows_of(self, lats):
+        return np.clip(np.floor((np.asarray(lats) + 90) / self.cell_size), 0, self.rows - 1).astype(int)
+
+    def cols_of(self, lons):
+        return np.clip(np.floor((np.asarray(lons) + 180) / self.cell_size), 0, self.cols - 1).astype(int)
+
+    # Build the grid index: cell id -> array of indexes of regions touching that cell
+    def build_index(self):
+        index = {}
+        for i, region in enumerate(self.regions):
+            lon_ranges, (south, north) = region.extent()
+            rows = range(int(self.rows_of(south)), int(self.rows_of(north)) + 1)
+            for west, east in lon_ranges:
+                cols = range(int(self.cols_of(west)), int(self.cols_of(east)) + 1)
+                for row in rows:
+                    for col in cols:
+                        index.setdefault(row * self.cols + col, set()).add(i)
+        return {cell: np.array(sorted(regions)) for cell, regions in index.items()}
+
+    # Return the sorted names of all regions containing at least one of the points
+    def classify(self, lons, lats):
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        if lons.size == 0:
+            return []
+        cells, inverse = np.unique(self.cells(lons, lats), return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(cells) + 1))
+        found = set()
+        for c, cell in enumerate(cells.tolist()):
+            candidates = self.index.get(cell)
+            if candidates is None:
+                continue
+            members = order[bounds[c]:bounds[c+1]]
+            for i in candidates.tolist():
+                if i in found:
+                    continue
+                if self.regions[i].contains(lons[members], lats[members]).any():
+                    found.add(i)
+        return sorted(set(self.regions[i].name for i in found))
+
+_default_classifier = None
+
+# Classifier for the regions shipped with the package, loaded on first use
+def default_classifier():
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = RegionClassifier.load()
+    return _default_classifier
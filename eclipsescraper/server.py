@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+# Local HTTP server handing out CZML for time windows of eclipse tracks.
+#
+#   GET /events                  JSON list of the events served, with the URLs below for each
+#   GET /czml/<iso>              CZML for the event on that date, sent with chunked encoding as it is
+#                                generated. Query parameters: start and end (see
+#                                EclipseTrack.index_seconds) limit it to a time window; tolerance,
+#                                compact and precision are passed to czmlwriter.
+#   GET /stream/<iso>            Server-sent events for Cesium's CzmlDataSource: the document packet
+#                                first, then the packets of successive windows of `window` seconds of
+#                                track time (default 600) from start to end, waiting `delay` wall
+#                                seconds between windows (default 0) to follow a client clock.
+#
+# Tracks are loaded from their pages the first time they are requested and kept in memory.
+
+import re, json, time, bisect, threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from . import czmlwriter
+
+# Tracks by ISO date, given as EclipseTrack objects or as (date, path or URL) pairs loaded on demand
+class TrackStore:
+
+    def __init__(self, tracks=(), events=()):
+        self.tracks = dict((track.date.isoformat(), track) for track in tracks)
+        self.sources = dict((day.isoformat(), (day, source)) for day, source in events)
+        self.lock = threading.Lock()
+
+    # Serve the saved pages found under a directory (see build.find_pages)
+    @classmethod
+    def from_directory(cls, src):
+        import os
+        from .build import find_pages
+        return cls(events=[(day, os.path.join(src, path)) for path, day in find_pages(src).items()])
+
+    def isos(self):
+        return sorted(set(self.tracks) | set(self.sources))
+
+    def get(self, iso):
+        with self.lock:
+            track = self.tracks.get(iso)
+            if track is None and iso in self.sources:
+                from .catalog import load_event
+                track = self.tracks[iso] = load_event(*self.sources[iso])
+            return track
+
+class CZMLHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = dict((key, values[-1]) for key, values in parse_qs(url.query).items())
+        match = re.match(r'^/(czml|stream)/(\d{4}-\d{2}-\d{2})$', url.path)
+        try:
+            if url.path == '/events':
+                self.send_events()
+            elif match is None:
+                self.send_error(404)
+            else:
+                track = self.server.store.get(match.group(2))
+                if track is None:
+                    self.send_error(404, 'No eclipse on ' + match.group(2))
+                elif match.group(1) == 'czml':
+                    self.send_czml(track, query)
+                else:
+                    self.send_stream(track, query)
+        except (ValueError, LookupError) as e:
+            self.send_error(400, str(e))
+
+    def send_events(self):
+        events = [{'iso': iso, 'czml': '/czml/' + iso, 'stream': '/stream/' + iso} for iso in self.server.store.isos()]
+        body = json.dumps(events).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Options for czmlwriter from query parameters
+    def options(self, query):
+        return {'tolerance': float(query['tolerance']) if 'tolerance' in query else None,
+                'compact': query.get('compact', '') in ('1', 'true', 'yes'),
+                'precision': int(query['precision']) if 'precision' in query else None}
+
+    # Window of the track selected by the start and end query parameters
+    def window(self, track, query):
+        first, stop = track.window_bounds(query.get('start'), query.get('end'))
+        if first == stop:
+            raise LookupError('No samples in the requested time window')
+        return first, stop
+
+    def start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+    def send_chunk(self, text):
+        data = text.encode('utf-8')
+        if data:
+            self.wfile.write(('%x\r\n' % len(data)).encode('ascii') + data + b'\r\n')
+
+    def end_chunked(self):
+        self.wfile.write(b'0\r\n\r\n')
+
+    # The whole track is sent from its memoized document; windows are generated as they are sent
+    def send_czml(self, track, query):
+        options = self.options(query)
+        first, stop = self.window(track, query)
+        self.start_chunked('application/json')
+        if (first, stop) == (0, len(track.time)):
+            self.send_chunk(track.czml_text(**options))
+        else:
+            for chunk in czmlwriter.iter_czml(track.slice(first, stop), **options):
+                self.send_chunk(chunk)
+        self.end_chunked()
+
+    def send_stream(self, track, query):
+        options = self.options(query)
+        step = float(query.get('window', 600))
+        delay = float(query.get('delay', 0))
+        if step <= 0:
+            raise ValueError('window must be positive')
+        first, stop = self.window(track, query)
+        index = track.time_index()
+        self.start_chunked('text/event-stream')
+        start_time = track.timestamp(track.time[first])
+        end_time = track.timestamp(track.time[stop - 1])
+        self.send_chunk('data: ' + json.dumps([czmlwriter.document_packet(start_time, end_time)]) + '\n\n')
+        window_start = index[first]
+        while first < stop:
+            window_start += step
+            window_stop = min(stop, bisect.bisect_left(index, window_start))
+            if window_stop > first:
+                packets = ''.join(czmlwriter.iter_packets(track.slice(first, window_stop), **options))
+                self.send_chunk('data: [' + packets + ']\n\n')
+                self.wfile.flush()
+                first = window_stop
+                if delay and first < stop:
+                    time.sleep(delay)
+        self.end_chunked()
+
+class CZMLServer:
+
+    def __init__(self, store, host='127.0.0.1', port=8000, verbose=False):
+        self.server = ThreadingHTTPServer((host, port), CZMLHandler)
+        self.server.daemon_threads = True
+        self.server.store = store
+        self.server.verbose = verbose
+        self.thread = None
+
+    def url(self, path):
+        host, port = self.server.server_address[:2]
+        return 'http://%s:%d%s' % (host, port, path)
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    # Serve from a background thread
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
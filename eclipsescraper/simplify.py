@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+# Level-of-detail simplification of track polylines.
+#
+# Douglas-Peucker on the sphere: a polyline is reduced to the fewest of its own vertices such that
+# no dropped vertex lies further than the tolerance (in metres) from the great-circle segment that
+# replaces it. Distances from all vertices of a span to its chord are computed at once with NumPy.
+
+import json
+import numpy as np
+
+EARTH_RADIUS = 6371008.8
+
+def unit_vectors(points):
+    points = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lon, lat = points[:,0], points[:,1]
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+# Distance in metres from each unit vector in p to the great-circle segment from a to b
+def segment_distance(p, a, b):
+    to_a = np.arccos(np.clip(p @ a, -1, 1))
+    to_b = np.arccos(np.clip(p @ b, -1, 1))
+    normal = np.cross(a, b)
+    norm = np.linalg.norm(normal)
+    if norm < 1e-15:
+        return np.minimum(to_a, to_b) * EARTH_RADIUS
+    normal /= norm
+    cross_track = np.abs(np.arcsin(np.clip(p @ normal, -1, 1)))
+    # The perpendicular foot lies within the segment when p is "between" a and b
+    within = ((p @ np.cross(normal, a)) >= 0) & ((p @ np.cross(b, normal)) >= 0)
+    return np.where(within, cross_track, np.minimum(to_a, to_b)) * EARTH_RADIUS
+
+# Indexes of the vertices kept when simplifying points ((lon, lat) pairs) to tolerance metres
+def simplify_indexes(points, tolerance):
+    n = len(points)
+    if n < 3 or not tolerance or tolerance <= 0:
+        return list(range(n))
+    v = unit_vectors(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = segment_distance(v[first+1:last], v[first], v[last])
+        worst = int(np.argmax(distances))
+        if distances[worst] > tolerance:
+            middle = first + 1 + worst
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+    return np.flatnonzero(keep).tolist()
+
+def simplify(points, tolerance):
+    return [points[i] for i in simplify_indexes(points, tolerance)]
+
+# Largest distance in metres from any vertex of points to the simplified polyline
+def simplification_error(points, simplified_indexes):
+    if len(points) < 3:
+        return 0.0
+    v = unit_vectors(points)
+    error = 0.0
+    for first, last in zip(simplified_indexes[:-1], simplified_indexes[1:]):
+        if last - first >= 2:
+            error = max(error, float(segment_distance(v[first+1:last], v[first], v[last]).max()))
+    return error
+
+# Compare CZML output of a track across tolerances: one row per tolerance with the number of
+# polyline vertices, the size of the serialized CZML in bytes and the largest error introduced
+def report(track, tolerances):
+    rows = []
+    for tolerance in tolerances:
+        vertices = 0
+        error = 0.0
+        for key in ('north', 'central', 'south'):
+            points = [p for p in track.position[key] if p != None]
+            indexes = simplify_indexes(points, tolerance)
+            vertices += len(indexes)
+            error = max(error, simplification_error(points, indexes))
+        size = len(json.dumps(track.czml(tolerance=tolerance)).encode('utf-8'))
+        rows.append({'tolerance': tolerance, 'vertices': vertices, 'bytes': size, 'max_error': error})
+    return rows
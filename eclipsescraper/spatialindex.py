@@ -0,0 +1,160 @@
+#!/usr/bin/python
+
+# Spatial index over the paths of many eclipses, answering "which eclipses cross this point/area".
+#
+# Each path is cut into segments: the quadrilateral between the north and south limits at two
+# consecutive times. Segment bounding boxes are indexed on a regular lat/lon grid stored as flat
+# arrays (cell offsets plus segment ids), so a query only looks at the segments in the cells it
+# touches. Longitudes within a segment are unwrapped so segments crossing the antimeridian stay
+# contiguous. The index can be saved to and loaded from a single .npz file.
+
+import json, math
+import numpy as np
+
+class TrackIndex:
+
+    def __init__(self, events, segment_event, segment_times, quads, cell_size=2.0):
+        self.events = events
+        self.segment_event = segment_event
+        self.segment_times = segment_times
+        self.quads = quads
+        self.cell_size = cell_size
+        self.rows = int(math.ceil(180 / cell_size))
+        self.cols = int(math.ceil(360 / cell_size))
+        self.boxes = np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1).reshape(-1, 4)
+        self.cell_offsets, self.cell_segments = self.build_grid()
+
+    # Build an index from EclipseTrack objects
+    @classmethod
+    def build(cls, tracks, cell_size=2.0):
+        events = []
+        segment_event = []
+        segment_times = []
+        quads = []
+        for track in tracks:
+            north = track.position['north']
+            south = track.position['south']
+            event = len(events)
+            events.append({'iso': track.date.isoformat(), 'type': track.type})
+            for t in range(len(track.time) - 1):
+                corners = [north[t], north[t+1], south[t+1], south[t]]
+                if None in corners:
+                    continue
+                quad = np.array(corners, dtype=float)
+                # Unwrap longitudes relative to the first corner
+                quad[:,0] = quad[0,0] + (quad[:,0] - quad[0,0] + 180) % 360 - 180
+                quads.append(quad)
+                segment_event.append(event)
+                segment_times.append((track.time[t], track.time[t+1]))
+        return cls(events,
+                   np.array(segment_event, dtype=np.int32),
+                   np.array(segment_times, dtype='U8').reshape(-1, 2),
+                   np.array(quads, dtype=float).reshape(-1, 4, 2),
+                   cell_size)
+
+    # Build an index offline from saved pages given as (date, path) pairs
+    @classmethod
+    def from_pages(cls, events, cell_size=2.0):
+        from .catalog import load_event
+        return cls.build((load_event(date, path) for date, path in events), cell_size)
+
+    def save(self, path):
+        np.savez(path, events=np.array(json.dumps(self.events)), segment_event=self.segment_event,
+                 segment_times=self.segment_times, quads=self.quads, cell_size=np.array(self.cell_size))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(json.loads(str(data['events'])), data['segment_event'], data['segment_times'],
+                       data['quads'], float(data['cell_size']))
+
+    def rows_of(self, lats):
+        return np.clip(np.floor((np.asarray(lats) + 90) / self.cell_size), 0, self.rows - 1).astype(int)
+
+    # Columns wrap around the antimeridian
+    def cols_of(self, lons):
+        return (np.floor((np.asarray(lons) + 180) / self.cell_size).astype(int)) % self.cols
+
+    # Grid index as flat arrays: segments in cell c are cell_segments[cell_offsets[c]:cell_offsets[c+1]]
+    def build_grid(self):
+        cells = []
+        segments = []
+        for s, (west, south, east, north) in enumerate(self.boxes.tolist()):
+            rows = np.arange(self.rows_of(south), self.rows_of(north) + 1)
+            first = int(math.floor((west + 180) / self.cell_size))
+            last = int(math.floor((east + 180) / self.cell_size))
+            cols = np.arange(first, last + 1) % self.cols
+            covered = (rows[:,None] * self.cols + cols[None,:]).ravel()
+            cells.append(covered)
+            segments.append(np.full(len(covered), s, dtype=np.int32))
+        if cells:
+            cells = np.concatenate(cells)
+            segments = np.concatenate(segments)
+        else:
+            cells = np.zeros(0, dtype=int)
+            segments = np.zeros(0, dtype=np.int32)
+        order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self.rows * self.cols)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return offsets, segments[order]
+
+    def candidates(self, cells):
+        return np.unique(np.concatenate([self.cell_segments[self.cell_offsets[c]:self.cell_offsets[c+1]]
+                                         for c in cells] + [np.zeros(0, dtype=np.int32)]))
+
+    # Filter segments to events whose ISO date falls within [start, end] (dates or None)
+    def in_dates(self, segments, start, end):
+        if start is None and end is None:
+            return segments
+        keep = []
+        for s in segments.tolist():
+            iso = self.events[self.segment_event[s]]['iso']
+            if (start is None or iso >= start.isoformat()) and (end is None or iso <= end.isoformat()):
+                keep.append(s)
+        return np.array(keep, dtype=np.int32)
+
+    # Group matching segments by event: [{'iso', 'type', 'segments': [(start, end), ...]}, ...]
+    def results(self, segments):
+        hits = {}
+        for s in sorted(segments.tolist()):
+            event = int(self.segment_event[s])
+            if event not in hits:
+                hits[event] = dict(self.events[event], segments=[])
+            hits[event]['segments'].append(tuple(self.segment_times[s].tolist()))
+        return sorted(hits.values(), key=lambda hit: hit['iso'])
+
+    # Eclipses whose path covers the point (lon, lat), optionally limited to dates in [start, end]
+    def query_point(self, lon, lat, start=None, end=None):
+        cell = int(self.rows_of(lat)) * self.cols + int(self.cols_of(lon))
+        segments = self.in_dates(self.candidates([cell]), start, end)
+        if len(segments) == 0:
+            return []
+        quads = self.quads[segments]
+        # Shift the point by whole turns to the unwrapped longitudes of each segment
+        x = lon + np.round((quads[:,0,0] - lon) / 360) * 360
+        x1, y1 = quads[:,:,0], quads[:,:,1]
+        x2, y2 = np.roll(x1, -1, axis=1), np.roll(y1, -1, axis=1)
+        crosses = (y1 > lat) != (y2 > lat)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+        inside = (crosses & (x[:,None] < x_cross)).sum(axis=1) % 2 == 1
+        return self.results(segments[inside])
+
+    # Eclipses with a path segment whose bounding box overlaps the box (west, south, east, north)
+    def query_box(self, west, south, east, north, start=None, end=None):
+        rows = np.arange(self.rows_of(south), self.rows_of(north) + 1)
+        if east < west:
+            east += 360
+        cols = np.arange(int(math.floor((west + 180) / self.cell_size)),
+                         int(math.floor((east + 180) / self.cell_size)) + 1) % self.cols
+        segments = self.in_dates(self.candidates((rows[:,None] * self.cols + cols[None,:]).ravel().tolist()), start, end)
+        if len(segments) == 0:
+            return []
+        boxes = self.boxes[segments]
+        # Compare longitudes with the query box shifted by whole turns towards each segment
+        shift = np.round((boxes[:,0] - west) / 360) * 360
+        overlap = ((boxes[:,0] <= east + shift) & (boxes[:,2] >= west + shift) |
+                   (boxes[:,0] <= east + shift - 360) & (boxes[:,2] >= west + shift - 360) |
+                   (boxes[:,0] <= east + shift + 360) & (boxes[:,2] >= west + shift + 360))
+        overlap &= (boxes[:,1] <= north) & (boxes[:,3] >= south)
+        return self.results(segments[overlap])
@@ -0,0 +1,374 @@
+#!/usr/bin/python
+
+# Compact column storage for EclipseTrack data.
+#
+# Each column keeps its values in a typed array (doubles, or integer seconds for times) instead of
+# a list of Python objects, and converts values back on access, so a waypoint costs a few machine
+# words rather than several tuples and floats. Missing values are stored as NaN and read back as
+# None. Values that wouldn't survive the round trip through the array exactly (e.g. a duration
+# that isn't in the usual "02m35.7s" form) are kept verbatim in a small side table. Whether a
+# value is exact is decided from its type and form (and for a whole batch at once when extending),
+# so appending never has to decode values again.
+
+import re, math
+from array import array
+from collections.abc import MutableSequence
+
+from . import parser
+
+FLOAT_TYPES = frozenset((float, type(None)))
+
+# Columns behave as mutable sequences (indexing, slicing, append, insert, pop, index, + with lists,
+# ...), but they aren't lists: json.dumps() needs them copied out first, e.g. with plain() below.
+class Column(MutableSequence):
+
+    __slots__ = ('values', 'text', 'changes')
+    typecode = 'd'
+
+    def __init__(self, values=()):
+        self.values = array(self.typecode)
+        self.text = {}
+        self.changes = 0
+        self.extend(values)
+
+    # Column reading values from any buffer of numbers, e.g. a memoryview of a memory-mapped file
+    # (see columnstore.py), without copying them. Such columns can't be modified.
+    @classmethod
+    def view(cls, values, text=None):
+        column = cls.__new__(cls)
+        column.values = values
+        column.text = text or {}
+        column.changes = 0
+        return column
+
+    def encode(self, value):
+        return math.nan if value is None else float(value)
+
+    def decode(self, number):
+        return None if number != number else number
+
+    # Whether a value comes back unchanged from its encoded number. Cheap checks decide the usual
+    # cases; anything else is decoded again to compare.
+    def exact(self, value, number):
+        kind = type(value)
+        if kind is float:
+            return value == value
+        if value is None or (kind is int and -2**53 <= value <= 2**53):
+            return True
+        return self.decode(number) == value
+
+    def _read_only(self):
+        return Exception('Column is read-only: its values are in a ' + type(self.values).__name__)
+
+    def _encoded(self, value):
+        try:
+            number = self.encode(value)
+            return number, self.exact(value, number)
+        except (TypeError, ValueError):
+            return self.encode(None), False
+
+    def append(self, value):
+        try:
+            number = self.encode(value)
+            exact = self.exact(value, number)
+        except (TypeError, ValueError):
+            number, exact = self.encode(None), False
+        try:
+            self.values.append(number)
+        except AttributeError:
+            raise self._read_only()
+        if not exact:
+            self.text[len(self.values) - 1] = value
+
+    # Values are encoded in bulk when the whole batch is known to come back exactly (see
+    # encode_all), else one by one
+    def extend(self, values):
+        values = values if isinstance(values, list) else list(values)
+        numbers = self.encode_all(values)
+        if numbers is None:
+            for value in values:
+                self.append(value)
+            return
+        try:
+            self.values.extend(numbers)
+        except AttributeError:
+            raise self._read_only()
+
+    # Array of the encoded values of a batch, or None unless every value comes back unchanged
+    def encode_all(self, values):
+        if not set(map(type, values)) <= FLOAT_TYPES:
+            return None
+        numbers = array(self.typecode, [math.nan if value is None else value for value in values])
+        return numbers if sum(map(math.isnan, numbers)) == values.count(None) else None
+
+    def __len__(self):
+        return len(self.values)
+
+    # All values as a list
+    def tolist(self):
+        decode = self.decode
+        values = [decode(number) for number in self.values]
+        for i, value in self.text.items():
+            values[i] = value
+        return values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indexes = range(*index.indices(len(self.values)))
+            decode = self.decode
+            values = [decode(number) for number in self.values[index]]
+            if self.text:
+                for i, position in enumerate(indexes):
+                    if position in self.text:
+                        values[i] = self.text[position]
+            return values
+        if index < 0:
+            index += len(self.values)
+        if self.text and index in self.text:
+            return self.text[index]
+        return self.decode(self.values[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            values = self.tolist()
+            values[index] = value
+            self._replace(values)
+            return
+        if index < 0:
+            index += len(self.values)
+        number, exact = self._encoded(value)
+        try:
+            self.values[index] = number
+        except TypeError:
+            raise self._read_only()
+        self.changes += 1
+        self.text.pop(index, None)
+        if not exact:
+            self.text[index] = value
+
+    def __delitem__(self, index):
+        values = self.tolist()
+        del values[index]
+        self._replace(values)
+
+    def insert(self, index, value):
+        values = self.tolist()
+        values.insert(index, value)
+        self._replace(values)
+
+    # Replace all values, keeping the column object
+    def _replace(self, values):
+        if not isinstance(self.values, array):
+            raise self._read_only()
+        self.values = array(self.typecode)
+        self.text = {}
+        self.extend(values)
+        self.changes += 1
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other):
+        try:
+            return self.tolist() == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return self.tolist() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.tolist()
+
+    def __mul__(self, count):
+        return self.tolist() * count
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def nbytes(self):
+        return self.values.itemsize * len(self.values)
+
+    # Column of the values from index start up to stop, copied without decoding them
+    def slice(self, start, stop):
+        column = self.__class__()
+        column.values = array(self.typecode, self.values[start:stop])
+        column.text = dict((i - start, value) for i, value in self.text.items() if start <= i < stop)
+        return column
+
+# Times of day ("HH:MM" or "HH:MM:SS") as integer seconds. Times written the way format_time()
+# writes them are stored exactly.
+class TimeColumn(Column):
+
+    __slots__ = ()
+    typecode = 'l'
+    canonical = re.compile(r'([01]\d|2[0-3]):[0-5]\d(:(0[1-9]|[1-5]\d))?$')
+
+    def encode(self, value):
+        return 0 if value is None else int(parser.seconds(value))
+
+    def decode(self, number):
+        return parser.format_time(number)
+
+    def exact(self, value, number):
+        return type(value) is str and self.canonical.match(value) is not None
+
+    def encode_all(self, values):
+        if not (set(map(type, values)) <= {str} and all(map(self.canonical.match, values))):
+            return None
+        return array(self.typecode, [int(value[:2]) * 3600 + int(value[3:5]) * 60 + int(value[6:] or 0)
+                                     for value in values])
+
+# Central line durations ("MMmSS.Ss") as seconds. Durations written the way format_duration()
+# writes them are stored exactly.
+class DurationColumn(Column):
+
+    __slots__ = ()
+    canonical = re.compile(r'(\d\d|[1-9]\d\d+)m[0-5]\d\.\ds$')
+
+    def encode(self, value):
+        seconds = parser.duration_seconds(value)
+        return math.nan if seconds is None else seconds
+
+    def decode(self, number):
+        return None if number != number else parser.format_duration(number)
+
+    def exact(self, value, number):
+        return value is None or (type(value) is str and self.canonical.match(value) is not None)
+
+    def encode_all(self, values):
+        texts = [value for value in values if value is not None]
+        if not (set(map(type, texts)) <= {str} and all(map(self.canonical.match, texts))):
+            return None
+        return array(self.typecode, [math.nan if value is None else int(value[:-6]) * 60 + float(value[-5:-1])
+                                     for value in values])
+
+MISSING_POINT = (math.nan, math.nan)
+
+# (lon, lat) points as interleaved doubles
+class PointColumn(Column):
+
+    __slots__ = ()
+
+    def append(self, point):
+        try:
+            if point is None:
+                self.values.extend((math.nan, math.nan))
+            else:
+                self.values.extend((float(point[0]), float(point[1])))
+        except AttributeError:
+            raise self._read_only()
+
+    def extend(self, points):
+        points = points if isinstance(points, list) else list(points)
+        try:
+            numbers = array('d', [number for point in points for number in (MISSING_POINT if point is None else point[:2])])
+        except (TypeError, ValueError):
+            numbers = None
+        if numbers is None or len(numbers) != 2 * len(points):
+            for point in points:
+                self.append(point)
+            return
+        try:
+            self.values.extend(numbers)
+        except AttributeError:
+            raise self._read_only()
+
+    def __len__(self):
+        return len(self.values) // 2
+
+    def tolist(self):
+        values = self.values
+        return [None if lon != lon else (lon, lat) for lon, lat in zip(values[0::2], values[1::2])]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        if index < 0:
+            index += len(self)
+        lon = self.values[2*index]
+        if lon != lon:
+            return None
+        return (lon, self.values[2*index+1])
+
+    def __setitem__(self, index, point):
+        if isinstance(index, slice):
+            values = self.tolist()
+            values[index] = point
+            self._replace(values)
+            return
+        if index < 0:
+            index += len(self)
+        if not isinstance(self.values, array):
+            raise self._read_only()
+        self.values[2*index:2*index+2] = array('d', (math.nan, math.nan) if point is None else
+                                                    (float(point[0]), float(point[1])))
+        self.changes += 1
+
+    def slice(self, start, stop):
+        column = PointColumn()
+        column.values = array('d', self.values[2*start:2*stop])
+        return column
+
+    # NumPy (n, 2) array of (lon, lat) sharing memory with the column; missing points are NaN
+    def array(self):
+        import numpy as np
+        return np.frombuffer(self.values, dtype=float).reshape(-1, 2)
+
+# The north, south and central limit columns of a track; assigned values are stored compactly
+class Positions(dict):
+
+    def __init__(self, positions=None):
+        dict.__init__(self)
+        for key, points in (positions or {'north': (), 'south': (), 'central': ()}).items():
+            self[key] = points
+
+    def __setitem__(self, key, points):
+        if not isinstance(points, PointColumn):
+            points = PointColumn(points)
+        dict.__setitem__(self, key, points)
+
+# Descriptor exposing a column stored in a slot; assigning any sequence rebuilds the column
+class ColumnAttribute:
+
+    def __init__(self, slot, column_class):
+        self.slot = slot
+        self.column_class = column_class
+
+    def __get__(self, track, owner):
+        if track is None:
+            return self
+        return getattr(track, self.slot)
+
+    def __set__(self, track, values):
+        if not isinstance(values, self.column_class):
+            values = self.column_class(values)
+        setattr(track, self.slot, values)
+
+class PositionsAttribute:
+
+    def __get__(self, track, owner):
+        if track is None:
+            return self
+        return track._position
+
+    def __set__(self, track, positions):
+        if not isinstance(positions, Positions):
+            positions = Positions(positions)
+        track._position = positions
+
+# Convert column views back to plain lists (and positions to a dict of lists)
+def plain(value):
+    if isinstance(value, Column):
+        return value.tolist()
+    if isinstance(value, Positions):
+        return dict((key, list(points)) for key, points in value.items())
+    return value
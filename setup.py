@@ -1,7 +1,12 @@
 from setuptools import setup, find_packages
-import sys
+import os, re, sys
 from setuptools.command.test import test as TestCommand
 
+# The version is kept in eclipsescraper/__init__.py only (it's also stamped on build manifests)
+def read_version():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eclipsescraper', '__init__.py')) as f:
+        return re.search(r"^__version__ = '([^']+)'", f.read(), re.MULTILINE).group(1)
+
 class PyTest(TestCommand):
     def finalize_options(self):
         TestCommand.finalize_options(self)
@@ -14,13 +19,19 @@ class PyTest(TestCommand):
         sys.exit(errno)
 
 setup(name='eclipsescraper',
-      version=0.4,
+      version=read_version(),
       description="Python module for scraping NASA's eclipse site into usable CZML documents",
       long_description=open('README.md').read(),
       classifiers=[
         'Topic :: Scientific/Engineering :: GIS',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.3',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: Apache Software License',
         'Operating System :: OS Independent',
@@ -30,16 +41,24 @@ setup(name='eclipsescraper',
       author_email='frencils@gmail.com',
       url='https://github.com/Frencil/eclipsescraper',
       license='Apache 2.0',
+      # http.server.ThreadingHTTPServer (see server.py)
+      python_requires='>=3.7',
       packages=find_packages(exclude=['ez_setup', 'examples', 'tests']),
       include_package_data=True,
+      package_data={'eclipsescraper': ['regions.json']},
       zip_safe=False,
-      tests_require=['pytest'],
+      tests_require=['pytest', 'geopy>=1.9.1,<2', 'czml>=0.3.2'],
       cmdclass = {'test': PyTest},
+      entry_points={'console_scripts': ['eclipsescraper = eclipsescraper.cli:main']},
       install_requires=[
           # -*- Extra requirements: -*-
-          "czml>=0.3.2",
-          "geopy>=1.9.1",
-          "lxml",
+          "numpy",
           ],
+      # Optional backends (see eclipsescraper/backends.py)
+      extras_require={
+          'czml': ["czml>=0.3.2"],
+          'requests': ["requests"],
+          'geographiclib': ["geographiclib"],
+          },
       )
 
@@ -0,0 +1,62 @@
+import os, threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from eclipsescraper.catalog import event_date
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# A track parsed from a saved page in DATA_DIR, dated from the page's file name
+def load_track(name='SE2017Aug21Tpath.html', metrics=None):
+    track = EclipseTrack(event_date(name), metrics=metrics)
+    with open(os.path.join(DATA_DIR, name)) as f:
+        track.loadFromRawHTML(f.read())
+    return track
+
+class MirrorHandler(SimpleHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        SimpleHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def send_response(self, code, message=None):
+        self.server.statuses.append(code)
+        SimpleHTTPRequestHandler.send_response(self, code, message)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        # Fail the first requests for paths listed in server.failures with a temporary error
+        if self.server.failures.get(self.path, 0) > 0:
+            self.server.failures[self.path] -= 1
+            self.send_error(503)
+            return
+        SimpleHTTPRequestHandler.do_GET(self)
+
+    def log_message(self, format, *args):
+        pass
+
+# Local stand-in for NASA's eclipse site, serving saved pages from a directory over keep-alive HTTP
+class MirrorServer:
+
+    def __init__(self, directory=DATA_DIR):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), partial(MirrorHandler, directory=directory))
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.requests = []
+        self.server.statuses = []
+        self.server.failures = {}
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return 'http://127.0.0.1:%d/%s' % (self.server.server_address[1], path)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+# Synthetic NASA path pages for benchmarks and tests.
+#
+# Generates a page laid out like NASA's eclipse path pages: a <pre> block holding the column
+# header, an opening "Limits" row, one row per time step and a closing "Limits" row. The central
+# line runs eastwards along a gentle sine wave from start_lon, so with the defaults it crosses the
+# antimeridian part way along. Near both ends of the path a limit is missing and written as a
+# single hyphen placeholder, as NASA does where the shadow grazes the edge of the Earth.
+
+import math
+from datetime import date
+
+from eclipsescraper import parser
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+HEADER = '''M:S                 Central
+Universal  Northern Limit      Southern Limit       Central Line     Diam.  Sun Sun Path   Line
+         ------------------  ------------------  ------------------  Ratio  Alt Azm Width Durat.
+  Time   Latitude Longitude  Latitude Longitude  Latitude Longitude
+'''
+
+def latitude(value):
+    minutes = round(abs(value) * 60, 1)
+    return '%02d %04.1f%s' % (minutes // 60, minutes % 60, 'S' if value < 0 else 'N')
+
+def longitude(value):
+    value = (value + 180) % 360 - 180
+    minutes = round(abs(value) * 60, 1)
+    return '%03d %04.1f%s' % (minutes // 60, minutes % 60, 'W' if value < 0 else 'E')
+
+def point(lat, lon):
+    return latitude(lat) + ' ' + longitude(lon)
+
+def row(time, north, south, central, ratio, altitude, azimuth, width, duration):
+    return ' %-7s %-17s  %-17s  %-17s  %5.3f %3s %3s %4d  %s' % (
+        time, north, south, central, ratio, altitude, azimuth, width, duration)
+
+# Lines of a synthetic path table with the given number of timed rows (besides the two Limits rows)
+def path_table(rows, step=60, start='10:00', start_lon=150.0, span=120.0, hyphens=2):
+    start = parser.seconds(start)
+    lines = HEADER.splitlines()
+    lines.append('')
+
+    def at(i):
+        fraction = float(i) / max(rows - 1, 1)
+        lat = 20 + 15 * math.sin(2 * math.pi * fraction)
+        lon = start_lon + span * fraction
+        width = 80 + 40 * math.sin(math.pi * fraction)
+        altitude = int(round(5 + 60 * math.sin(math.pi * fraction)))
+        duration = parser.format_duration(60 + 120 * math.sin(math.pi * fraction))
+        return lat, lon, width, altitude, duration
+
+    def limits(lat, lon, width):
+        half = width / 222.0
+        return (point(lat + half, lon - 0.5), point(lat - half, lon + 0.5), point(lat, lon))
+
+    lat, lon, width, altitude, duration = at(0)
+    north, south, central = limits(lat, lon - 1, width)
+    lines.append(row('Limits', north, south, central, 1.030, 0, '-', width, duration))
+    for i in range(rows):
+        lat, lon, width, altitude, duration = at(i)
+        north, south, central = limits(lat, lon, width)
+        if i < hyphens:
+            north = '-'
+        elif i >= rows - hyphens:
+            south = '-'
+        azimuth = int(90 + 180 * float(i) / max(rows - 1, 1))
+        lines.append(row(parser.format_time(start + i * step), north, south, central,
+                         1.030, altitude, azimuth, width, duration))
+    lat, lon, width, altitude, duration = at(rows - 1)
+    north, south, central = limits(lat, lon + 1, width)
+    lines.append(row('Limits', north, south, central, 1.030, 0, '-', width, duration))
+    return '\n'.join(lines)
+
+# A full synthetic page (see path_table for the arguments)
+def path_page(rows, title='Synthetic Total Solar Eclipse', **kwargs):
+    return ('<html>\n<head>\n<title>' + title + '</title>\n</head>\n<body>\n<h2>' + title + '</h2>\n<pre>\n' +
+            path_table(rows, **kwargs) + '\n</pre>\n</body>\n</html>\n')
+
+# A track parsed from a synthetic page (keyword arguments as for path_table)
+def load(rows, day=date(2030, 6, 1), **kwargs):
+    track = EclipseTrack(day)
+    track.loadFromRawHTML(path_page(rows, **kwargs))
+    return track
@@ -0,0 +1,133 @@
+import io, json, os, subprocess, sys, unittest
+from datetime import date
+
+import numpy as np
+
+from eclipsescraper import backends, geodesy, outputcache
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests import synthetic
+from tests.mirror import DATA_DIR, load_track
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY = ('numpy', 'lxml', 'czml', 'urllib.request', 'requests', 'geopy', 'geographiclib')
+
+# Import the core, parse a page and report which heavy modules got loaded by importing and by parsing
+# and how long importing took
+IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from eclipsescraper.eclipsescraper import EclipseTrack
+elapsed = time.perf_counter() - start
+imported = [m for m in sys.argv[2:] if m in sys.modules]
+from datetime import date
+track = EclipseTrack(date(2017, 8, 21))
+track.loadFromRawHTML(open(sys.argv[1]).read())
+print(json.dumps({'seconds': elapsed, 'rows': len(track.time), 'imported': imported,
+                  'loaded': [m for m in sys.argv[2:] if m in sys.modules]}))
+'''
+
+# Parse a long table with NumPy blocked from importing and print the parsed track
+NO_NUMPY_SCRIPT = '''
+import sys
+sys.modules['numpy'] = None
+from tests import synthetic
+track = synthetic.load(200)
+print(track)
+'''
+
+class BackendsTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        backends.use('fetch', None)
+        backends.use('geodesy', None)
+        backends.use('czml', None)
+
+    # Importing the core and parsing must not load any backend; the import time is reported
+    def test_ImportTime(self):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT, os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html')] + list(HEAVY),
+                                         cwd=ROOT)
+        result = json.loads(output.decode('utf-8'))
+        sys.stderr.write('eclipsescraper.eclipsescraper imported in %.1f ms\n' % (result['seconds'] * 1000))
+        self.assertEqual(result['imported'], [])
+        # Tables this short are converted without NumPy
+        self.assertEqual(result['loaded'], [])
+        self.assertEqual(result['rows'], 3)
+        self.assertLess(result['seconds'], 1.0)
+
+    # Parsing works without NumPy, to the same values
+    def test_WithoutNumPy(self):
+        output = subprocess.check_output([sys.executable, '-c', NO_NUMPY_SCRIPT], cwd=ROOT)
+        track = synthetic.load(200)
+        self.assertEqual(json.loads(output.decode('utf-8')), json.loads(str(track)))
+
+    def test_FileFetcher(self):
+        track = EclipseTrack(date(2017, 8, 21))
+        track.loadFromURL(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'))
+        self.assertEqual(track.type, 'total')
+        self.assertEqual(track.time, load_track().time)
+
+    def test_RegisteredFetcher(self):
+        with open(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'), 'rb') as f:
+            page = f.read()
+        backends.register('fetch', 'memory', lambda: lambda url: (200, io.BytesIO(page)))
+        backends.use('fetch', 'memory')
+        track = EclipseTrack(date(2017, 8, 21))
+        track.loadFromURL('http://example.invalid/SE2017Aug21Tpath.html')
+        self.assertEqual(len(track.time), 3)
+        with self.assertRaises(Exception):
+            backends.use('fetch', 'carrier pigeon')
+
+    def test_Status(self):
+        backends.register('fetch', 'missing', lambda: lambda url: (404, io.BytesIO(b'')))
+        backends.use('fetch', 'missing')
+        with self.assertRaises(Exception):
+            EclipseTrack(date(2017, 8, 21)).loadFromURL('http://example.invalid/SE2017Aug21Tpath.html')
+
+    # The built-in writer is the default; the czml package is only used when chosen
+    def test_CZML(self):
+        self.assertIs(backends.get('czml'), backends.get('czml', 'builtin'))
+        track = load_track('SE2015Mar20Tpath.html')
+        library = backends.get('czml', 'czml')(track)
+        builtin = backends.get('czml', 'builtin')(track)
+        self.assertEqual(library, builtin)
+        backends.use('czml', 'czml')
+        self.assertEqual(track.czml(tolerance=10000), backends.get('czml', 'builtin')(track, 10000))
+
+    def test_Geographiclib(self):
+        lat1, lon1, lat2, lon2 = np.array([[10.0, 20.0, 11.0, 21.5], [-40.0, 170.0, -39.0, -179.0]]).T
+        for expected, actual in zip(geodesy.inverse(lat1, lon1, lat2, lon2), backends.get('geodesy', 'geographiclib')(lat1, lon1, lat2, lon2)):
+            np.testing.assert_allclose(actual, expected, rtol=1e-6)
+        builtin = load_track('SE2015Mar20Tpath.html').getShadowEllipses()
+        backends.use('geodesy', 'geographiclib')
+        for a, b in zip(builtin, load_track('SE2015Mar20Tpath.html').getShadowEllipses()):
+            self.assertAlmostEqual(a[1], b[1], delta=0.01)
+            self.assertAlmostEqual(a[3], b[3], places=3)
+
+    # Choosing other backends for a track that was already rendered renders it again, in the
+    # track's own memo and in the output cache alike
+    def test_Switch(self):
+        backends.register('geodesy', 'doubled', lambda: lambda *points: (2 * geodesy.inverse(*points)[0],) + geodesy.inverse(*points)[1:])
+        backends.register('czml', 'empty', lambda: lambda track, tolerance=None: [{'id': 'document', 'version': '1.0'}])
+        track = load_track('SE2015Mar20Tpath.html')
+        for cache in (False, True):
+            # With the output cache on, every call gets a freshly parsed track
+            current = (lambda: load_track('SE2015Mar20Tpath.html')) if cache else (lambda: track)
+            if cache:
+                outputcache.enable()
+            try:
+                ellipses, document = current().getShadowEllipses(), current().czml()
+                backends.use('geodesy', 'doubled')
+                self.assertAlmostEqual(current().getShadowEllipses()[0][1], ellipses[0][1] * 2, delta=1)
+                self.assertNotEqual(current().czml(), document)
+                backends.use('czml', 'empty')
+                self.assertEqual(current().czml(), [{'id': 'document', 'version': '1.0'}])
+                backends.use('geodesy', None)
+                backends.use('czml', None)
+                self.assertEqual(current().getShadowEllipses(), ellipses)
+                self.assertEqual(current().czml(), document)
+            finally:
+                outputcache.disable()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import io, json, os, shutil, tempfile, unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from eclipsescraper import build, cli
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class BuildTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        self.dest = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.src, '2010s'))
+        shutil.copy(os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'), os.path.join(self.src, '2010s'))
+        shutil.copy(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'), self.src)
+        with open(os.path.join(self.src, 'index.html'), 'w') as f:
+            f.write('<html></html>')
+
+    def tearDown(self):
+        shutil.rmtree(self.src)
+        shutil.rmtree(self.dest)
+
+    def outputs(self):
+        return sorted(os.listdir(self.dest))
+
+    def test_Incremental(self):
+        result = build.build(self.src, self.dest, processes=2)
+        self.assertEqual(result['built'], [os.path.join('2010s', 'SE2015Mar20Tpath.html'), 'SE2017Aug21Tpath.html'])
+        self.assertEqual(self.outputs(), ['2015-03-20.czml', '2015-03-20.json', '2017-08-21.czml',
+                                          '2017-08-21.json', 'build-manifest.json', 'index.bin', 'manifest.json'])
+        with open(os.path.join(self.dest, 'manifest.json')) as f:
+            self.assertEqual([event['iso'] for event in json.load(f)], ['2015-03-20', '2017-08-21'])
+
+        # Nothing changed
+        result = build.build(self.src, self.dest)
+        self.assertEqual(result['built'], [])
+        self.assertEqual(len(result['unchanged']), 2)
+
+        # Only the edited page and the page with a missing output are rebuilt
+        with open(os.path.join(self.src, 'SE2017Aug21Tpath.html'), 'a') as f:
+            f.write('\n')
+        os.remove(os.path.join(self.dest, '2015-03-20.json'))
+        result = build.build(self.src, self.dest)
+        self.assertEqual(len(result['built']), 2)
+        self.assertEqual(build.build(self.src, self.dest)['built'], [])
+
+        # A removed page takes its outputs with it
+        os.remove(os.path.join(self.src, 'SE2017Aug21Tpath.html'))
+        result = build.build(self.src, self.dest)
+        self.assertEqual(result['removed'], ['SE2017Aug21Tpath.html'])
+        self.assertEqual(self.outputs(), ['2015-03-20.czml', '2015-03-20.json', 'build-manifest.json', 'index.bin', 'manifest.json'])
+
+    # A page that fails to convert is reported and retried next time; the others are still built
+    def test_Failure(self):
+        with open(os.path.join(self.src, 'SE2019Jul02Tpath.html'), 'w') as f:
+            f.write('<html></html>')
+        result = build.build(self.src, self.dest, processes=2)
+        self.assertEqual(list(result['failed']), ['SE2019Jul02Tpath.html'])
+        self.assertEqual(len(result['built']), 2)
+        with open(os.path.join(self.dest, 'manifest.json')) as f:
+            self.assertEqual([event['iso'] for event in json.load(f)], ['2015-03-20', '2017-08-21'])
+
+        result = build.build(self.src, self.dest)
+        self.assertEqual(list(result['failed']), ['SE2019Jul02Tpath.html'])
+        self.assertEqual(len(result['unchanged']), 2)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(cli.main(['build', self.src, self.dest]), 1)
+        self.assertIn('failed  SE2019Jul02Tpath.html: ', out.getvalue())
+
+    # A different library version rebuilds everything
+    def test_Version(self):
+        build.build(self.src, self.dest)
+        with mock.patch.object(build, 'library_version', return_value='0.0'):
+            self.assertEqual(len(build.build(self.src, self.dest)['built']), 2)
+        self.assertEqual(len(build.build(self.src, self.dest, force=True)['built']), 2)
+
+    def test_Command(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(cli.main(['build', self.src, self.dest, '-j', '1']), 0)
+        self.assertTrue(out.getvalue().endswith('2 built, 0 unchanged, 0 removed, 0 failed\n'))
+        with open(os.path.join(self.dest, '2017-08-21.json')) as f:
+            self.assertEqual(json.load(f)['iso'], '2017-08-21')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os, shutil, tempfile, unittest
+from datetime import date
+
+from eclipsescraper import fetch
+from eclipsescraper.cache import HTTPCache
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests.mirror import MirrorServer
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # A second load revalidates with Last-Modified and is served from disk on a 304
+    def test_Revalidation(self):
+        with MirrorServer() as server:
+            url = server.url('SE2017Aug21Tpath.html')
+            cache = HTTPCache(self.directory)
+            first = EclipseTrack(date(2017, 8, 21))
+            first.loadFromURL(url, cache=cache)
+            second = EclipseTrack(date(2017, 8, 21))
+            second.loadFromURL(url, cache=cache)
+            self.assertEqual(server.server.statuses, [200, 304])
+        self.assertEqual((cache.hits, cache.misses, cache.revalidated), (1, 1, 1))
+        self.assertEqual(first.data(), second.data())
+        self.assertEqual(first.type, 'total')
+
+    # Offline mode serves cached pages without a server and refuses uncached ones
+    def test_Offline(self):
+        with MirrorServer() as server:
+            url = server.url('SE2017Aug21Tpath.html')
+            list(fetch.load_tracks({date(2017, 8, 21): url}, cache=HTTPCache(self.directory)))
+        cache = HTTPCache(self.directory, offline=True)
+        track = EclipseTrack(date(2017, 8, 21))
+        track.loadFromURL(url, cache=cache)
+        self.assertEqual(track.time, ['16:50', '18:00', '20:00'])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertRaises(Exception, cache.fetch, 'http://127.0.0.1:1/SE2015Mar20Tpath.html')
+
+    # Pages fetched from several threads share the cache's pool and are all counted
+    def test_Concurrent(self):
+        cache = HTTPCache(self.directory)
+        self.assertIsInstance(cache.pool, fetch.ConnectionPool)
+        pool = cache.pool
+        with MirrorServer() as server:
+            urls = {date(2015, 3, 20): server.url('SE2015Mar20Tpath.html'), date(2017, 8, 21): server.url('SE2017Aug21Tpath.html')}
+            for i in range(3):
+                self.assertEqual(len(list(fetch.load_tracks(urls, cache=cache))), 2)
+        self.assertIs(cache.pool, pool)
+        self.assertEqual((cache.hits, cache.misses, cache.revalidated), (4, 2, 4))
+
+    # Least recently used entries are evicted once the cache exceeds its size limit
+    def test_Eviction(self):
+        cache = HTTPCache(self.directory, max_size=25)
+        cache.put('http://a/', b'0123456789')
+        cache.put('http://b/', b'0123456789')
+        os.utime(cache._path(cache._key('http://a/'), '.body'), (0, 0))
+        cache.put('http://c/', b'0123456789')
+        self.assertIsNone(cache.get('http://a/'))
+        self.assertEqual(cache.get('http://b/')[1], b'0123456789')
+        self.assertEqual(cache.get('http://c/')[1], b'0123456789')
+        self.assertEqual(HTTPCache(self.directory).size, 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json, os, shutil, tempfile, unittest
+from datetime import date
+
+from eclipsescraper import catalog
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class CatalogTestCase(unittest.TestCase):
+
+    events = [(date(2017, 8, 21), os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html')),
+              (date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))]
+
+    def setUp(self):
+        self.dest = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dest)
+
+    def test_EventDate(self):
+        self.assertEqual(catalog.event_date('/mirror/SE2017Aug21Tpath.html'), date(2017, 8, 21))
+        self.assertEqual(catalog.event_date('SE2023Oct14Apath.html'), date(2023, 10, 14))
+        self.assertIsNone(catalog.event_date('index.html'))
+
+    def test_Sharded(self):
+        manifest = catalog.convert_catalog(self.events, self.dest, processes=2)
+        self.assertEqual([m['iso'] for m in manifest], ['2015-03-20', '2017-08-21'])
+        with open(os.path.join(self.dest, 'manifest.json')) as f:
+            self.assertEqual(json.load(f), manifest)
+        for event_date, source in self.events:
+            track = catalog.load_event(event_date, source)
+            with open(os.path.join(self.dest, event_date.isoformat() + '.czml')) as f:
+                self.assertEqual(json.load(f), track.czml())
+            with open(os.path.join(self.dest, event_date.isoformat() + '.json')) as f:
+                self.assertEqual(json.load(f), track.json())
+            self.assertEqual(track.type, 'total')
+
+    def test_Combined(self):
+        metadata = catalog.convert_catalog(self.events, self.dest, combined=True, processes=2)
+        with open(os.path.join(self.dest, 'catalog.czml')) as f:
+            doc = json.load(f)
+        ids = [packet['id'] for packet in doc]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(doc), 9)
+        self.assertEqual(doc[0]['clock']['interval'], '2015-03-20T09:18:00Z/2017-08-21T20:00:00Z')
+        for event_date, source in self.events:
+            packets = catalog.load_event(event_date, source).czml()[1:]
+            for packet in packets:
+                self.assertIn(packet, doc)
+        with open(os.path.join(self.dest, 'catalog.json')) as f:
+            self.assertEqual(json.load(f), metadata)
+
+if __name__ == '__main__':
+    unittest.main()
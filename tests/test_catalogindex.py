@@ -0,0 +1,72 @@
+import os, shutil, tempfile, unittest
+from datetime import date
+
+from eclipsescraper import catalog, catalogindex
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests import synthetic
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class CatalogIndexTestCase(unittest.TestCase):
+
+    events = [(date(2017, 8, 21), os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html')),
+              (date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))]
+
+    def setUp(self):
+        self.dest = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dest)
+
+    def test_Summary(self):
+        track = catalog.load_event(*self.events[0])
+        entry = catalogindex.summary(track)
+        for key, value in track.json().items():
+            self.assertEqual(entry[key], value)
+        self.assertEqual(entry['bbox'], [-171.748, 10.782, -27.332, 41.495])
+        self.assertEqual(entry['start'], '2017-08-21T16:50:00Z')
+        self.assertEqual(entry['duration'], 11400)
+        self.assertEqual(entry['max_central_line_duration'], 155.7)
+        self.assertEqual(entry['max_path_width'], 112.0)
+
+    # A path crossing the antimeridian gets a box with west > east
+    def test_Antimeridian(self):
+        track = EclipseTrack(date(2030, 6, 1))
+        track.loadFromRawHTML(synthetic.path_page(50))
+        west, south, east, north = catalogindex.bounding_box(track)
+        self.assertEqual((west, east), (148.5, -88.5))
+        self.assertLess(south, north)
+
+    def test_Index(self):
+        path = os.path.join(self.dest, 'index.bin')
+        records = catalogindex.build_index(self.events, path, processes=2)
+        with catalogindex.CatalogIndex(path) as index:
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.iso(0), '2015-03-20')
+            self.assertEqual(index[1], catalogindex.summary(catalog.load_event(*self.events[0])))
+            self.assertEqual(index[-1]['iso'], '2017-08-21')
+            self.assertEqual(index.get(date(2015, 3, 20))['regions'], ['arctic', 'europe', 'north atlantic'])
+            self.assertIsNone(index.get('2016-03-09'))
+            self.assertEqual(sorted(records, key=lambda r: r['iso']), list(index))
+            with self.assertRaises(IndexError):
+                index[2]
+
+    def test_Empty(self):
+        path = os.path.join(self.dest, 'index.bin')
+        catalogindex.write_index([], path)
+        with catalogindex.CatalogIndex(path) as index:
+            self.assertEqual(list(index), [])
+            self.assertIsNone(index.get('2017-08-21'))
+        open(path, 'w').close()
+        with self.assertRaises(Exception):
+            catalogindex.CatalogIndex(path)
+
+    # Catalog conversion writes the index next to its manifest
+    def test_Catalog(self):
+        manifest = catalog.convert_catalog(self.events, self.dest, processes=2)
+        with catalogindex.CatalogIndex(os.path.join(self.dest, 'index.bin')) as index:
+            self.assertEqual(list(index), manifest)
+
+if __name__ == '__main__':
+    unittest.main()
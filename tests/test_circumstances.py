@@ -0,0 +1,88 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+
+from eclipsescraper import circumstances, parser
+from eclipsescraper.eclipsescraper import EclipseTrack
+from eclipsescraper.simplify import EARTH_RADIUS, unit_vectors
+
+from tests import synthetic
+
+class CircumstancesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.track = EclipseTrack(date(2030, 1, 1))
+        self.track.loadFromRawHTML(synthetic.path_page(200))
+        self.central = self.track.position['central'].array()
+        self.north = self.track.position['north'].array()
+        self.south = self.track.position['south'].array()
+
+    # Observers on the central line get the values of the track at that time
+    def test_CentralLine(self):
+        steps = [20, 100, 150]
+        result = self.track.evaluate(self.central[steps,1], self.central[steps,0])
+        self.assertTrue(result['inside'].all())
+        np.testing.assert_allclose(result['distance'], 0, atol=1.0)
+        np.testing.assert_allclose(result['seconds'], [parser.seconds(self.track.time[t]) for t in steps])
+        np.testing.assert_allclose(result['sun_altitude'], [self.track.sun_altitude[t] for t in steps])
+        np.testing.assert_allclose(result['duration'],
+                                   [parser.duration_seconds(self.track.central_line_duration[t]) for t in steps])
+        np.testing.assert_allclose(result['duration'], result['central_line_duration'], rtol=1e-6)
+
+    # Points straight across the path, from the central line out past each limit
+    def test_AcrossPath(self):
+        t = 120
+        line = circumstances.CentralLine(self.track)
+        centre = unit_vectors(self.central[t:t+1])[0]
+        for side, limit in ((1, line.north_offset[t]), (-1, line.south_offset[t])):
+            distances = limit * np.array([0.25, 0.5, 0.9, 1.1, 2.0])
+            angles = distances / EARTH_RADIUS
+            points = np.cos(angles)[:,None] * centre + np.sin(angles)[:,None] * side * line.north_side[t] * line.normal[t]
+            lats = np.degrees(np.arcsin(points[:,2]))
+            lons = np.degrees(np.arctan2(points[:,1], points[:,0]))
+            result = self.track.evaluate(lats, lons)
+            self.assertEqual(result['inside'].tolist(), [True, True, True, False, False])
+            np.testing.assert_allclose(result['distance'], distances, rtol=1e-3)
+            np.testing.assert_allclose(result['seconds'], parser.seconds(self.track.time[t]), atol=1.0)
+            duration = result['duration']
+            self.assertTrue((np.diff(duration[:3]) < 0).all())
+            self.assertEqual(duration[3:].tolist(), [0.0, 0.0])
+            np.testing.assert_allclose(duration[:3], result['central_line_duration'][:3] * np.sqrt(1 - np.array([0.25, 0.5, 0.9]) ** 2), rtol=1e-3)
+
+    # Far away and beyond the ends of the path
+    def test_Outside(self):
+        result = self.track.evaluate([-80.0, self.central[5,1]], [0.0, self.central[5,0] - 20])
+        self.assertEqual(result['inside'].tolist(), [False, False])
+        self.assertTrue((result['distance'] > 1e6).all())
+        self.assertEqual(result['duration'].tolist(), [0.0, 0.0])
+
+    # Chunked and multi-process evaluation give the same results as a single pass
+    def test_Chunks(self):
+        rng = np.random.RandomState(1)
+        lats = np.concatenate([rng.uniform(-60, 60, 3000), self.central[10:190,1] + rng.normal(0, 0.5, 180)])
+        lons = np.concatenate([rng.uniform(-180, 180, 3000), self.central[10:190,0] + rng.normal(0, 0.5, 180)])
+        whole = circumstances.evaluate(self.track, lats, lons, chunk_size=len(lats))
+        self.assertGreater(whole['inside'].sum(), 50)
+        for chunk_size, processes in ((7, 1), (500, 2)):
+            result = circumstances.evaluate(self.track, lats, lons, chunk_size, processes)
+            for field in circumstances.FIELDS:
+                np.testing.assert_array_equal(result[field], whole[field])
+        # Without a number of processes every chunk is evaluated in-process
+        with mock.patch.object(circumstances, 'ProcessPoolExecutor', side_effect=AssertionError('no workers expected')):
+            result = circumstances.evaluate(self.track, lats, lons, chunk_size=500)
+        np.testing.assert_array_equal(result['distance'], whole['distance'])
+        # Chunks are sized to the number of segments
+        self.assertEqual(circumstances.CentralLine(self.track).chunk_size(),
+                         circumstances.CHUNK_ELEMENTS // (np.count_nonzero(~np.isnan(self.central[:,0])) - 1))
+
+    def test_Errors(self):
+        with self.assertRaises(Exception):
+            self.track.evaluate([1.0, 2.0], [1.0])
+        track = EclipseTrack(date(2030, 1, 1))
+        with self.assertRaises(Exception):
+            track.evaluate([1.0], [1.0])
+
+if __name__ == '__main__':
+    unittest.main()
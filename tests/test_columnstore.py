@@ -0,0 +1,88 @@
+import gc, os, shutil, tempfile, unittest
+from datetime import date
+
+from eclipsescraper import columnstore
+from eclipsescraper.catalog import load_event
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests import synthetic
+from tests.mirror import DATA_DIR
+
+class ColumnStoreTestCase(unittest.TestCase):
+
+    events = [(date(2017, 8, 21), os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html')),
+              (date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))]
+
+    def setUp(self):
+        self.dest = tempfile.mkdtemp()
+        self.path = os.path.join(self.dest, 'tracks.store')
+
+    def tearDown(self):
+        gc.collect()
+        shutil.rmtree(self.dest)
+
+    # Tracks read back give the same data, json() and CZML as freshly parsed ones
+    def test_RoundTrip(self):
+        columnstore.build_store(self.events, self.path, processes=2)
+        with columnstore.ColumnStore(self.path) as store:
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.isos(), ['2015-03-20', '2017-08-21'])
+            for day, source in self.events:
+                track = load_event(day, source)
+                view = store.get(day)
+                self.assertEqual(view.data(), track.data())
+                self.assertEqual(view.json(), track.json())
+                self.assertEqual(view.czml(), track.czml())
+                self.assertEqual(store.get(day.isoformat()).time, track.time)
+            self.assertIsNone(store.get('2016-03-09'))
+            self.assertEqual(store[-1].date, date(2017, 8, 21))
+            with self.assertRaises(IndexError):
+                store.track(2)
+
+    # Columns are views of the mapped file, not copies
+    def test_Views(self):
+        track = EclipseTrack(date(2030, 6, 1))
+        track.loadFromRawHTML(synthetic.path_page(200))
+        track.central_line_duration = list(track.central_line_duration[:-1]) + ['unknown']
+        columnstore.write_store([track], self.path)
+        store = columnstore.ColumnStore(self.path)
+        view = store.get(date(2030, 6, 1))
+        self.assertIsInstance(view.time.values, memoryview)
+        self.assertTrue(view.position['north'].values.readonly)
+        self.assertEqual(view.position['north'].array().shape, (len(track.time), 2))
+        self.assertEqual(view.central_line_duration[-1], 'unknown')
+        self.assertEqual(view.data(), track.data())
+        self.assertEqual(view.window('10:10', '10:20').time, track.window('10:10', '10:20').time)
+        with self.assertRaises(TypeError):
+            view.time.values[0] = 0
+        store.close()
+
+    # Tracks read from a store can't be changed
+    def test_ReadOnly(self):
+        columnstore.write_store([load_event(*self.events[0])], self.path)
+        with columnstore.ColumnStore(self.path) as store:
+            view = store.get(self.events[0][0])
+            row = '18:00 40 00.0N 070 00.0W 39 00.0N 070 00.0W 39 30.0N 070 00.0W 1.030 40 200 100 02m00.0s'.split()
+            for change in (lambda: view.parse_row(row), lambda: view.time.append('18:00'),
+                           lambda: view.position['north'].append((-70.0, 40.0)),
+                           lambda: view.sun_altitude.__setitem__(0, 1.0)):
+                with self.assertRaisesRegex(Exception, 'read-only'):
+                    change()
+            self.assertEqual(view.time[-1], load_event(*self.events[0]).time[-1])
+
+    def test_Errors(self):
+        track = load_event(*self.events[0])
+        with self.assertRaises(Exception):
+            columnstore.write_store([track, track], self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'not a store at all')
+        with self.assertRaises(Exception):
+            columnstore.ColumnStore(self.path)
+
+    def test_Empty(self):
+        columnstore.write_store([], self.path)
+        with columnstore.ColumnStore(self.path) as store:
+            self.assertEqual(list(store), [])
+
+if __name__ == '__main__':
+    unittest.main()
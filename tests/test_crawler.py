@@ -0,0 +1,139 @@
+import io, os, shutil, tempfile, unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from eclipsescraper import cli, crawler
+from tests.mirror import MirrorServer, DATA_DIR
+
+CENTURY = '''<html><body><h1>Solar Eclipses: 2001 to 2100</h1>
+<a href="../SEdecade/SEdecade2011.html">2011 - 2020</a>
+<a href="../SEdecade/SEdecade2021.html#top">2021 - 2030</a>
+<a href="http://elsewhere.invalid/SEdecade2031.html">2031 - 2040</a>
+<a href="../index.html">Home</a>
+</body></html>'''
+
+DECADE_2011 = '''<html><body>
+<a href="../SEpath/SEpath2001/SE2015Mar20Tpath.html">2015 Mar 20</a>
+<a href='../SEpath/SEpath2001/SE2017Aug21Tpath.html'>2017 Aug 21</a>
+<a href="../SEcentury/SEcentury2001.html">Century</a>
+<a href="../SEplot/SE2015Mar20T.gif">Map</a>
+</body></html>'''
+
+DECADE_2021 = '''<html><body>
+<a href="../SEpath/SEpath2001/SE2023Oct14Apath.html">2023 Oct 14</a>
+</body></html>'''
+
+class CrawlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mirror = tempfile.mkdtemp()
+        self.dest = tempfile.mkdtemp()
+        for directory in ('SEcentury', 'SEdecade', os.path.join('SEpath', 'SEpath2001')):
+            os.makedirs(os.path.join(self.mirror, directory))
+        for path, text in (('SEcentury/SEcentury2001.html', CENTURY), ('SEdecade/SEdecade2011.html', DECADE_2011),
+                           ('SEdecade/SEdecade2021.html', DECADE_2021)):
+            with open(os.path.join(self.mirror, path), 'w') as f:
+                f.write(text)
+        shutil.copy(os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'), os.path.join(self.mirror, 'SEpath', 'SEpath2001'))
+        shutil.copy(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'), os.path.join(self.mirror, 'SEpath', 'SEpath2001'))
+        with open(os.path.join(self.mirror, 'SEpath', 'SEpath2001', 'SE2023Oct14Apath.html'), 'w') as f:
+            f.write('<html><pre>\n</pre></html>')
+
+    def tearDown(self):
+        shutil.rmtree(self.mirror)
+        shutil.rmtree(self.dest)
+
+    def crawler(self, server, **kwargs):
+        kwargs.setdefault('delay', 0)
+        kwargs.setdefault('backoff', 0)
+        return crawler.Crawler([server.url('SEcentury/SEcentury2001.html')], self.dest, **kwargs)
+
+    def test_Crawl(self):
+        with MirrorServer(self.mirror) as server:
+            result = self.crawler(server).crawl()
+            self.assertEqual(result, {'events': 3, 'downloaded': 3, 'failed': {}})
+            state = self.crawler(server).state
+            self.assertEqual(state['events']['2023-10-14']['type'], 'annular')
+            self.assertEqual(state['events']['2015-03-20']['url'], server.url('SEpath/SEpath2001/SE2015Mar20Tpath.html'))
+            # Other hosts and non-index links are not followed
+            self.assertNotIn('/index.html', server.server.requests)
+            self.assertEqual(len(server.server.requests), 6)
+        self.assertEqual(sorted(os.listdir(self.dest)), ['SE2015Mar20Tpath.html', 'SE2017Aug21Tpath.html',
+                                                         'SE2023Oct14Apath.html', 'crawl-checkpoint.json'])
+        with open(os.path.join(self.dest, 'SE2017Aug21Tpath.html'), 'rb') as f, \
+             open(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'), 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    # Temporary failures are retried
+    def test_Retry(self):
+        with MirrorServer(self.mirror) as server:
+            server.server.failures['/SEdecade/SEdecade2011.html'] = 2
+            result = self.crawler(server, retries=2).crawl()
+            self.assertEqual(result['downloaded'], 3)
+            self.assertEqual(server.server.statuses.count(503), 2)
+
+    # Backoff waits go through the limiter's sleep, doubling with each attempt
+    def test_Backoff(self):
+        sleeps = []
+        limiter = crawler.RateLimiter(0, sleep=sleeps.append)
+        with MirrorServer(self.mirror) as server:
+            server.server.failures['/SEdecade/SEdecade2011.html'] = 3
+            result = self.crawler(server, retries=3, backoff=0.5, limiter=limiter).crawl()
+        self.assertEqual(result['downloaded'], 3)
+        self.assertEqual(sleeps, [0.5, 1.0, 2.0])
+
+    # A crawl that gave up on a page resumes from its checkpoint without refetching anything else
+    def test_Resume(self):
+        path = '/SEpath/SEpath2001/SE2017Aug21Tpath.html'
+        with MirrorServer(self.mirror) as server:
+            server.server.failures[path] = 2
+            result = self.crawler(server, retries=1).crawl()
+            self.assertEqual(result['downloaded'], 2)
+            self.assertEqual(list(result['failed']), [server.url(path[1:])])
+            self.assertIn('after 2 attempts', result['failed'][server.url(path[1:])])
+
+            requests = len(server.server.requests)
+            result = self.crawler(server, retries=1).crawl()
+            self.assertEqual(result, {'events': 3, 'downloaded': 3, 'failed': {}})
+            self.assertEqual(server.server.requests[requests:], [path])
+
+    # An interrupted crawl carries on from the last checkpoint
+    def test_Interrupted(self):
+        with MirrorServer(self.mirror) as server:
+            first = self.crawler(server)
+            with mock.patch.object(first, 'download', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    first.crawl()
+            requests = len(server.server.requests)
+            self.assertEqual(self.crawler(server).crawl()['downloaded'], 3)
+            self.assertEqual(len(server.server.requests) - requests, 3)
+
+    def test_NotFound(self):
+        os.remove(os.path.join(self.mirror, 'SEdecade', 'SEdecade2021.html'))
+        with MirrorServer(self.mirror) as server:
+            result = self.crawler(server, retries=3).crawl()
+            self.assertEqual(result['events'], 2)
+            self.assertEqual(result['failed'], {server.url('SEdecade/SEdecade2021.html'): 'HTTP 404'})
+            self.assertEqual(server.server.statuses.count(404), 1)
+
+    def test_Command(self):
+        with MirrorServer(self.mirror) as server, redirect_stdout(io.StringIO()) as out:
+            status = cli.main(['crawl', server.url('SEcentury/SEcentury2001.html'), self.dest, '--delay', '0'])
+        self.assertEqual(status, 0)
+        self.assertEqual(out.getvalue(), '3 path tables found, 3 downloaded, 0 failed\n')
+
+    def test_RateLimiter(self):
+        now = [100.0]
+        sleeps = []
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+        limiter = crawler.RateLimiter(2.0, clock=lambda: now[0], sleep=sleep)
+        limiter.wait('http://a.invalid/1')
+        limiter.wait('http://b.invalid/1')
+        now[0] += 0.5
+        limiter.wait('http://a.invalid/2')
+        self.assertEqual(sleeps, [1.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import io, json, unittest
+from datetime import datetime, timedelta
+
+from eclipsescraper import backends, czmlwriter
+from tests.mirror import load_track
+
+try:
+    import czml
+except ImportError:
+    czml = None
+
+class CZMLWriterTestCase(unittest.TestCase):
+
+    # Streamed output must be byte-for-byte identical to serializing the document built with the
+    # czml package
+    @unittest.skipIf(czml is None, 'czml is not installed')
+    def test_SameAsCZML(self):
+        for page in ('SE2015Mar20Tpath.html', 'SE2017Aug21Tpath.html'):
+            track = load_track(page)
+            library = backends.get('czml', 'czml')(track)
+            out = io.StringIO()
+            track.write_czml(out)
+            self.assertEqual(out.getvalue(), json.dumps(library))
+            self.assertEqual(track.czml(), library)
+
+    # Output spanning several chunks must still match
+    def test_ManyChunks(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        for attr in ('time', 'ms_diam_ratio', 'sun_altitude', 'sun_azimuth', 'path_width', 'central_line_duration'):
+            setattr(track, attr, getattr(track, attr) * 20)
+        for key in track.position:
+            track.position[key] = track.position[key] * 20
+        chunks = list(track.iter_czml())
+        self.assertGreater(len(chunks), 4 * len(track.time) // czmlwriter.CHUNK_SIZE)
+        self.assertEqual(''.join(chunks), json.dumps(track.czml()))
+
+    # Compact output holds the same samples, timed relative to an epoch, in fewer bytes
+    def test_Compact(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        full = track.czml()
+        compact = track.czml(compact=True)
+        self.assertEqual(compact[:4], full[:4])
+        self.assertEqual(json.loads(''.join(track.iter_czml(compact=True))), compact)
+        self.assertLess(len(json.dumps(compact)), len(json.dumps(full)) * 0.8)
+
+        epoch = datetime.strptime('2015-03-20T09:18:00', '%Y-%m-%dT%H:%M:%S')
+        def timestamp(seconds):
+            return (epoch + timedelta(seconds=seconds)).isoformat()
+        position = compact[4]['position']
+        self.assertEqual(position['epoch'], '2015-03-20T09:18:00Z')
+        samples = position['cartographicDegrees']
+        expected = full[4]['position']['cartographicDegrees']
+        self.assertEqual([timestamp(t) + '+00:00' for t in samples[0::4]], expected[0::4])
+        self.assertEqual(samples[1::4], expected[1::4])
+        for name in ('rotation', 'semiMajorAxis', 'semiMinorAxis'):
+            numbers = compact[4]['ellipse'][name]['number']
+            self.assertEqual([timestamp(t) + 'Z' for t in numbers[0::2]], full[4]['ellipse'][name]['number'][0::2])
+            self.assertEqual(numbers[1::2], full[4]['ellipse'][name]['number'][1::2])
+
+    def test_Precision(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        doc = track.czml(precision=1)
+        self.assertEqual(doc[1]['polyline']['positions']['cartographicDegrees'][:3], [-37.2, 56.2, 0.0])
+        self.assertEqual(doc[4]['position']['cartographicDegrees'][1:3], [-29.7, 55.1])
+        self.assertEqual(track.czml(compact=True, precision=1)[4]['position']['cartographicDegrees'][:3], [0, -29.7, 55.1])
+
+    def test_Offsets(self):
+        self.assertEqual(czmlwriter.offsets(['23:58', '23:59:30', '00:01']), [0, 90, 180])
+
+if __name__ == '__main__':
+    unittest.main()
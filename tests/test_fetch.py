@@ -0,0 +1,67 @@
+import unittest
+from datetime import date
+
+from eclipsescraper import fetch
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests.mirror import MirrorServer, DATA_DIR
+
+class FetchTestCase(unittest.TestCase):
+
+    pages = {date(2015, 3, 20): 'SE2015Mar20Tpath.html',
+             date(2017, 8, 21): 'SE2017Aug21Tpath.html'}
+
+    def expected(self, test_date, url):
+        track = EclipseTrack(test_date)
+        track.setURL(url)
+        with open(DATA_DIR + '/' + self.pages[test_date]) as f:
+            track.loadFromRawHTML(f.read())
+        return track.data()
+
+    # Tracks loaded concurrently must match tracks parsed from the same saved pages
+    def test_LoadTracks(self):
+        with MirrorServer() as server:
+            urls = {d: server.url(page) for d, page in self.pages.items()}
+            tracks = list(fetch.load_tracks(urls, concurrency=2))
+        self.assertEqual(len(tracks), 2)
+        for track in tracks:
+            self.assertEqual(track.type, 'total')
+            self.assertEqual(track.data(), self.expected(track.date, urls[track.date]))
+
+    # Repeated requests against one host should reuse kept-alive connections
+    def test_ConnectionReuse(self):
+        with MirrorServer() as server:
+            urls = {date(2017, 8, d): server.url('SE2017Aug21Tpath.html') for d in range(1, 21)}
+            pool = fetch.ConnectionPool(per_host=2)
+            tracks = list(fetch.load_tracks(urls, concurrency=8, pool=pool))
+            pool.close()
+            self.assertEqual(len(tracks), 20)
+            self.assertEqual(len(server.server.requests), 20)
+            self.assertLessEqual(server.server.connections, 2)
+
+    def test_MissingPage(self):
+        with MirrorServer() as server:
+            urls = {date(2017, 8, 21): server.url('missing.html')}
+            with self.assertRaises(Exception):
+                list(fetch.load_tracks(urls))
+
+    # A connection failing in any other way (e.g. timing out) is closed rather than left open or pooled
+    def test_FailedConnectionClosed(self):
+        class Connection:
+            closed = False
+            def request(self, *args, **kwargs):
+                pass
+            def getresponse(self):
+                raise TimeoutError('timed out')
+            def close(self):
+                self.closed = True
+        conn = Connection()
+        pool = fetch.ConnectionPool()
+        pool._connect = lambda key: conn
+        with self.assertRaises(TimeoutError):
+            pool.request('http://example.com/SE2017Aug21Tpath.html')
+        self.assertTrue(conn.closed)
+        self.assertEqual(sum(len(conns) for conns in pool._idle.values()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
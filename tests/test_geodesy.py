@@ -0,0 +1,57 @@
+import math, random, unittest
+import numpy as np
+
+from eclipsescraper import geodesy
+
+try:
+    from geopy.distance import vincenty
+except ImportError:
+    vincenty = None
+
+try:
+    from geographiclib.geodesic import Geodesic
+except ImportError:
+    Geodesic = None
+
+class GeodesyTestCase(unittest.TestCase):
+
+    # Random point pairs roughly as far apart as the limits of an eclipse path, anywhere on the globe
+    def pairs(self, count=500):
+        rng = random.Random(20170821)
+        pairs = []
+        for i in range(count):
+            lat = rng.uniform(-85, 85)
+            lon = rng.uniform(-180, 180)
+            pairs.append((lat, lon, lat + rng.uniform(-5, 5), lon + rng.uniform(-5, 5)))
+        return np.array(pairs)
+
+    @unittest.skipIf(vincenty is None, 'geopy with vincenty is not installed')
+    def test_DistanceParity(self):
+        pairs = self.pairs()
+        distance, initial, final = geodesy.inverse(pairs[:,0], pairs[:,1], pairs[:,2], pairs[:,3])
+        for (lat1, lon1, lat2, lon2), d in zip(pairs, distance):
+            self.assertAlmostEqual(d, vincenty((lat1, lon1), (lat2, lon2)).meters, delta=1e-3)
+
+    @unittest.skipIf(Geodesic is None, 'geographiclib is not installed')
+    def test_AzimuthParity(self):
+        pairs = self.pairs()
+        distance, initial, final = geodesy.inverse(pairs[:,0], pairs[:,1], pairs[:,2], pairs[:,3])
+        for (lat1, lon1, lat2, lon2), d, a1, a2 in zip(pairs, distance, initial, final):
+            g = Geodesic.WGS84.Inverse(lat1, lon1, lat2, lon2)
+            self.assertAlmostEqual(d, g['s12'], delta=1e-3)
+            self.assertAlmostEqual(a1, math.radians(g['azi1']) % (2 * math.pi), delta=1e-8)
+            self.assertAlmostEqual(a2, math.radians(g['azi2']) % (2 * math.pi), delta=1e-8)
+
+    def test_CoincidentPoints(self):
+        distance, initial, final = geodesy.inverse([10.0, 0.0], [20.0, 0.0], [10.0, 0.0], [20.0, 1.0])
+        self.assertEqual(distance[0], 0.0)
+        self.assertAlmostEqual(distance[1], 111319.491, places=3)
+
+    # Shadow axes take (lon, lat) pairs as stored on EclipseTrack
+    def test_ShadowAxes(self):
+        semi_major_axes, rotations = geodesy.shadow_axes([(-98.148, 41.333)], [(-98.462, 40.343)])
+        self.assertEqual(round(float(semi_major_axes[0]), 3), 56542.367)
+        self.assertEqual(round(float(rotations[0]), 3), -1.807)
+
+if __name__ == '__main__':
+    unittest.main()
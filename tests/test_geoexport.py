@@ -0,0 +1,145 @@
+import io, json, os, shutil, tempfile, unittest
+import xml.etree.ElementTree as ElementTree
+from contextlib import redirect_stdout
+from datetime import date
+
+import numpy as np
+
+from eclipsescraper import cli, geodesy, geoexport
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests import synthetic
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+KML = '{http://www.opengis.net/kml/2.2}'
+
+class GeoExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.track = EclipseTrack(date(2030, 1, 1))
+        self.track.loadFromRawHTML(synthetic.path_page(100))
+
+    def test_PathPolygon(self):
+        ring = geoexport.path_polygon(self.track)
+        self.assertEqual(ring[0].tolist(), ring[-1].tolist())
+        self.assertEqual(len(ring), 2 * np.count_nonzero(~np.isnan(self.track.position['north'].array()[:,0])) + 1)
+        # Continuous across the antimeridian
+        self.assertGreater(ring[:,0].max(), 180)
+        self.assertLess(np.abs(np.diff(ring[:,0])).max(), 180)
+        # Counterclockwise, whichever way the track runs
+        self.assertGreater(geoexport._signed_area(ring), 0)
+        westward = synthetic.load(100, start_lon=-150.0, span=-120.0)
+        self.assertGreater(geoexport._signed_area(geoexport.path_polygon(westward)), 0)
+
+    # Rings crossing the antimeridian are cut there into rings with longitudes within [-180, 180]
+    def test_SplitRing(self):
+        square = np.array([[170.0, 10.0], [190.0, 10.0], [190.0, -10.0], [170.0, -10.0], [170.0, 10.0]])
+        self.assertEqual([ring.tolist() for ring in geoexport.split_ring(square)],
+                         [[[170.0, 10.0], [180.0, 10.0], [180.0, -10.0], [170.0, -10.0], [170.0, 10.0]],
+                          [[-180.0, 10.0], [-170.0, 10.0], [-170.0, -10.0], [-180.0, -10.0], [-180.0, 10.0]]])
+        inside = square - [20, 0]
+        self.assertIs(geoexport.split_ring(inside)[0], inside)
+        self.assertEqual(geoexport.split_ring(square + [20, 0])[0].tolist(), (square - [340, 0]).tolist())
+
+        ring = geoexport.path_polygon(self.track)
+        rings = geoexport.split_ring(ring)
+        self.assertEqual(len(rings), 2)
+        for piece in rings:
+            self.assertEqual(piece[0].tolist(), piece[-1].tolist())
+            self.assertTrue((np.abs(piece[:,0]) <= 180).all())
+        self.assertEqual(max(piece[:,0].max() for piece in rings), 180)
+
+    # Ellipse outlines reach the north and south limits along the semi-major axis
+    def test_EllipseRings(self):
+        ellipses = self.track.getShadowEllipses()
+        steps, rings = geoexport.ellipse_rings(self.track, segments=36)
+        self.assertEqual(rings.shape, (len(steps), 37, 2))
+        self.assertEqual(rings[:,0].tolist(), rings[:,-1].tolist())
+        for step, ring in zip(steps[::10], rings[::10]):
+            central, semi_major_axis, semi_minor_axis, rotation = ellipses[step]
+            distance, initial, final = geodesy.inverse(central[1], central[0], ring[:,1], ring[:,0])
+            self.assertAlmostEqual(distance.max() / semi_major_axis, 1, places=2)
+            self.assertAlmostEqual(distance.min() / semi_minor_axis, 1, places=2)
+            north = self.track.position['north'][step]
+            if north is not None:
+                self.assertLess(geodesy.inverse(north[1], north[0], ring[18,1], ring[18,0])[0], 0.02 * semi_major_axis)
+
+    def test_GeoJSON(self):
+        out = io.StringIO()
+        self.track.write_geojson(out)
+        collection = json.loads(out.getvalue())
+        steps, rings = geoexport.ellipse_rings(self.track)
+        features = collection['features']
+        self.assertEqual(len(features), 1 + len(steps))
+        self.assertEqual(features[0]['properties'], {'iso': '2030-01-01', 'type': self.track.type, 'kind': 'path'})
+        self.assertEqual(features[1]['properties']['time'], self.track.timestamp(self.track.time[steps[0]]))
+        self.assertEqual(features[1]['geometry']['coordinates'], [np.round(rings[0], 6).tolist()])
+        # The path crosses the antimeridian
+        self.assertEqual(features[0]['geometry']['type'], 'MultiPolygon')
+        for feature in features:
+            polygons = feature['geometry']['coordinates']
+            if feature['geometry']['type'] == 'Polygon':
+                polygons = [polygons]
+            lons = [lon for polygon in polygons for ring in polygon for lon, lat in ring]
+            self.assertLessEqual(max(map(abs, lons)), 180)
+            # Exterior rings follow the right-hand rule
+            for polygon in polygons:
+                self.assertGreater(geoexport._signed_area(np.array(polygon[0])), 0)
+
+        out = io.StringIO()
+        self.track.write_geojson(out, ellipses=False)
+        self.assertEqual([f['properties']['kind'] for f in json.loads(out.getvalue())['features']], ['path'])
+
+    def test_KML(self):
+        out = io.StringIO()
+        self.track.write_kml(out, segments=12)
+        document = ElementTree.fromstring(out.getvalue().encode('utf-8'))
+        placemarks = document.findall('.//' + KML + 'Placemark')
+        steps, rings = geoexport.ellipse_rings(self.track, segments=12)
+        self.assertEqual(len(placemarks), 1 + len(steps))
+        coordinates = placemarks[1].find('.//' + KML + 'coordinates').text.split()
+        self.assertEqual(len(coordinates), 13)
+        self.assertEqual([float(v) for v in coordinates[0].split(',')], np.round(rings[0,0], 6).tolist())
+        self.assertEqual(placemarks[1].find(KML + 'TimeStamp/' + KML + 'when').text,
+                         self.track.timestamp(self.track.time[steps[0]]))
+        self.assertEqual(len(placemarks[0].findall(KML + 'MultiGeometry/' + KML + 'Polygon')), 2)
+        lons = [float(point.split(',')[0]) for element in document.iter(KML + 'coordinates') for point in element.text.split()]
+        self.assertLessEqual(max(map(abs, lons)), 180)
+
+    # Tracks are taken from an iterable one at a time as the output is written
+    def test_Streaming(self):
+        loaded = []
+        def tracks():
+            for n in (20, 30):
+                track = EclipseTrack(date(2030, 1, n // 10))
+                track.loadFromRawHTML(synthetic.path_page(n))
+                loaded.append(track)
+                yield track
+        chunks = geoexport.iter_geojson(tracks())
+        next(chunks)
+        next(chunks)
+        self.assertEqual(len(loaded), 1)
+        features = json.loads(''.join(geoexport.iter_geojson([self.track, self.track]))[:-1])['features']
+        self.assertEqual(len(features), 2 * (1 + len(geoexport.ellipse_rings(self.track)[0])))
+
+    def test_Command(self):
+        src, dest = tempfile.mkdtemp(), tempfile.mkdtemp()
+        try:
+            shutil.copy(os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'), src)
+            shutil.copy(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'), src)
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(cli.main(['export', src, os.path.join(dest, 'paths.kml'), '--no-ellipses']), 0)
+                self.assertEqual(cli.main(['export', src, os.path.join(dest, 'paths.geojson')]), 0)
+            self.assertIn('exported 2 events', out.getvalue())
+            with open(os.path.join(dest, 'paths.kml')) as f:
+                folders = ElementTree.fromstring(f.read().encode('utf-8')).findall('.//' + KML + 'Folder')
+            self.assertEqual([folder.find(KML + 'name').text for folder in folders], ['2015-03-20 total', '2017-08-21 total'])
+            with open(os.path.join(dest, 'paths.geojson')) as f:
+                isos = [feature['properties']['iso'] for feature in json.load(f)['features']]
+            self.assertEqual(sorted(set(isos)), ['2015-03-20', '2017-08-21'])
+        finally:
+            shutil.rmtree(src)
+            shutil.rmtree(dest)
+
+if __name__ == '__main__':
+    unittest.main()
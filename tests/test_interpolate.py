@@ -0,0 +1,62 @@
+import unittest
+from datetime import date
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests.mirror import load_track
+
+class InterpolateTestCase(unittest.TestCase):
+
+    # Resampling at the table's own cadence reproduces the table
+    def test_SameCadence(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        resampled = track.resample(120)
+        self.assertEqual(resampled.time, track.time)
+        for key in ('north', 'south', 'central'):
+            for a, b in zip(resampled.position[key], track.position[key]):
+                self.assertAlmostEqual(a[0], b[0], places=3)
+                self.assertAlmostEqual(a[1], b[1], places=3)
+        self.assertEqual(resampled.sun_altitude, track.sun_altitude)
+        self.assertEqual(resampled.central_line_duration, track.central_line_duration)
+        self.assertEqual(resampled.czml()[4]['ellipse']['rotation'], track.czml()[4]['ellipse']['rotation'])
+
+    def test_DenseGrid(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        resampled = track.resample(45)
+        self.assertEqual(resampled.time[:4], ['09:18', '09:18:45', '09:19:30', '09:20:15'])
+        self.assertEqual(resampled.time[-1], '10:14')
+        self.assertEqual(len(resampled.time), 76)
+        self.assertEqual(resampled.czml()[0]['clock']['currentTime'], '2015-03-20T09:18:00Z')
+        self.assertEqual(resampled.czml()[4]['ellipse']['rotation']['number'][2], '2015-03-20T09:18:45Z')
+        self.assertEqual(resampled.json()['regions'], track.json()['regions'])
+
+    # Positions follow great circles and azimuths take the short way around
+    def test_Interpolation(self):
+        track = EclipseTrack(date(2030, 1, 1))
+        track.parse_row('10:00 10 00.0N 170 00.0E 00 00.0N 170 00.0E 05 00.0N 170 00.0E 1.01 50 350 200 03m00.0s'.split())
+        track.parse_row('10:10 10 00.0N 170 00.0W 00 00.0N 170 00.0W 05 00.0N 170 00.0W 1.03 60 010 300 04m00.0s'.split())
+        resampled = track.resample(300)
+        self.assertEqual(resampled.time, ['10:00', '10:05', '10:10'])
+        self.assertEqual(resampled.position['south'][1], (180.0, 0.0))
+        self.assertGreater(resampled.position['north'][1][1], 10.0)
+        self.assertEqual(resampled.sun_azimuth[1], 0.0)
+        self.assertEqual(resampled.sun_altitude[1], 55.0)
+        self.assertEqual(resampled.central_line_duration[1], '03m30.0s')
+
+    # Results are cached until more rows are parsed or the track is otherwise changed
+    def test_Cache(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        resampled = track.resample(60)
+        self.assertIs(track.resample(60), resampled)
+        track.parse_row('10:16 85 39.3N 003 30.2E 77 29.3N 021 48.5E 80 43.2N 018 10.8E 1.045 9 186 95 02m29.8s'.split())
+        self.assertIsNot(track.resample(60), resampled)
+        self.assertEqual(track.resample(60).time[-1], '10:16')
+        resampled = track.resample(60)
+        track.sun_altitude = [altitude + 1 for altitude in track.sun_altitude]
+        self.assertIsNot(track.resample(60), resampled)
+        self.assertEqual(track.resample(60).sun_altitude[0], resampled.sun_altitude[0] + 1)
+        resampled = track.resample(60)
+        track.limits['north'] = []
+        self.assertIsNot(track.resample(60), resampled)
+
+if __name__ == '__main__':
+    unittest.main()
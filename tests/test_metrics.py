@@ -0,0 +1,71 @@
+import os, unittest
+from datetime import date
+
+from eclipsescraper import backends, metrics
+from eclipsescraper.eclipsescraper import EclipseTrack
+from eclipsescraper.fetch import load_tracks
+from tests.mirror import MirrorServer, DATA_DIR, load_track
+
+class MetricsTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+        backends.use('czml', None)
+
+    def test_Stages(self):
+        m = metrics.Metrics()
+        track = load_track(metrics=m)
+        track.czml()
+        stages = m.as_dict()['stages']
+        for stage in ('partition', 'tokenize', 'parse_rows', 'geodesics', 'czml'):
+            self.assertEqual(stages[stage]['calls'], 1)
+        self.assertGreaterEqual(stages['czml']['seconds'], stages['geodesics']['seconds'])
+        self.assertEqual(m.as_dict()['counters'], {'rows_seen': 5, 'rows_dropped': 0, 'hyphens_expanded': 0})
+        # Only the czml package's packets need serializing
+        self.assertNotIn('czml_serialize', stages)
+        backends.use('czml', 'czml')
+        load_track(metrics=m).czml()
+        self.assertEqual(m.as_dict()['stages']['czml_serialize']['calls'], 1)
+
+    def test_Hyphens(self):
+        m = metrics.Metrics()
+        track = EclipseTrack(date(2017, 8, 21), metrics=m)
+        track.parseHTML(' Limits  -  10 00.0N 010 00.0E  - 1.0 0 - 50 00m10.0s\n'
+                        ' 10:00  -  10 00.0N 010 00.0E  10 00.0N 010 00.0E 1.0 10 100 50 00m10.0s\n')
+        counters = m.as_dict()['counters']
+        self.assertEqual(counters['rows_seen'], 2)
+        self.assertEqual(counters['rows_dropped'], 1)
+        self.assertEqual(counters['hyphens_expanded'], 2)
+
+    # Nothing is recorded while disabled; the registry collects from every track once enabled
+    def test_Registry(self):
+        load_track()
+        registry = metrics.enable()
+        load_track()
+        load_track()
+        self.assertEqual(registry.as_dict()['stages']['parse_rows']['calls'], 2)
+        self.assertEqual(registry.as_dict()['counters']['rows_seen'], 10)
+        metrics.disable()
+        load_track()
+        self.assertEqual(registry.as_dict()['counters']['rows_seen'], 10)
+
+    def test_Fetch(self):
+        registry = metrics.enable()
+        with MirrorServer() as server:
+            list(load_tracks({date(2017, 8, 21): server.url('SE2017Aug21Tpath.html')}))
+        size = os.path.getsize(os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'))
+        self.assertEqual(registry.as_dict()['counters']['bytes_fetched'], size)
+        self.assertEqual(registry.as_dict()['stages']['fetch']['calls'], 1)
+
+    def test_Prometheus(self):
+        m = metrics.Metrics()
+        load_track(metrics=m)
+        text = m.prometheus()
+        self.assertIn('# TYPE eclipsescraper_stage_seconds_total counter\n', text)
+        self.assertIn('eclipsescraper_stage_calls_total{stage="parse_rows"} 1\n', text)
+        self.assertIn('eclipsescraper_rows_seen_total 5\n', text)
+        m.reset()
+        self.assertEqual(m.as_dict(), {'stages': {}, 'counters': {}})
+
+if __name__ == '__main__':
+    unittest.main()
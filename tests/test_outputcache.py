@@ -0,0 +1,132 @@
+import json, unittest
+from datetime import date
+from unittest import mock
+
+from eclipsescraper import metrics, outputcache
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+from tests import synthetic
+from tests.mirror import load_track
+
+class MemoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.track = synthetic.load(50, date(2030, 1, 1))
+
+    def test_Memoized(self):
+        with mock.patch.object(EclipseTrack, 'shadow_ellipses', autospec=True,
+                               side_effect=EclipseTrack.shadow_ellipses) as shadow_ellipses:
+            first = self.track.czml()
+            self.assertEqual(self.track.czml(), first)
+            self.track.getShadowEllipses()
+            self.assertEqual(shadow_ellipses.call_count, 1)
+            # Other options are documents of their own
+            self.track.czml(compact=True)
+            self.assertEqual(shadow_ellipses.call_count, 1)
+        with mock.patch.object(EclipseTrack, 'regions', autospec=True, side_effect=EclipseTrack.regions) as regions:
+            self.assertEqual(self.track.json(), self.track.json())
+            self.assertEqual(self.track.getRegions(), self.track.json()['regions'])
+            self.assertEqual(regions.call_count, 1)
+
+    # Callers get copies they can change
+    def test_Copies(self):
+        self.track.czml()[0]['id'] = 'changed'
+        self.track.json()['regions'].append('changed')
+        self.track.getCameraPosition()[0] = 0
+        self.track.getPolyline('north').clear()
+        self.assertEqual(self.track.czml()[0]['id'], 'document')
+        self.assertNotIn('changed', self.track.getRegions())
+        self.assertNotEqual(self.track.getCameraPosition()[0], 0)
+        self.assertTrue(self.track.getPolyline('north'))
+
+    # Parsing more rows or replacing columns invalidates everything derived
+    def test_Invalidation(self):
+        czml = self.track.czml()
+        camera = self.track.getCameraPosition()
+        ellipses = len(self.track.getShadowEllipses())
+        self.track.parse_row('13:00 10 00.0N 170 00.0E 08 00.0N 170 00.0E 09 00.0N 170 00.0E 1.01 50 100 200 03m00.0s'.split())
+        self.assertEqual(len(self.track.getShadowEllipses()), ellipses + 1)
+        self.assertNotEqual(self.track.czml(), czml)
+        self.assertNotEqual(self.track.getCameraPosition(), camera)
+
+        self.track.position['north'] = self.track.position['north'][:]
+        self.track.sun_altitude = [10.0] * len(self.track.time)
+        for central, semi_major_axis, semi_minor_axis, rotation in self.track.getShadowEllipses():
+            self.assertAlmostEqual(semi_minor_axis, semi_major_axis * 10.0 / 90, places=2)
+        self.track.type = 'annular'
+        self.assertEqual(self.track.json()['type'], 'annular')
+
+    def test_Metrics(self):
+        m = metrics.Metrics()
+        track = load_track(metrics=m)
+        for i in range(3):
+            track.czml()
+        self.assertEqual(m.as_dict()['stages']['czml']['calls'], 1)
+        self.assertEqual(m.as_dict()['stages']['geodesics']['calls'], 1)
+
+class OutputCacheTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        outputcache.disable()
+
+    # Tracks loaded separately share serialized output
+    def test_Shared(self):
+        cache = outputcache.enable()
+        text = synthetic.load(50, date(2030, 1, 1)).czml_text()
+        with mock.patch.object(EclipseTrack, 'shadow_ellipses') as shadow_ellipses:
+            self.assertEqual(synthetic.load(50, date(2030, 1, 1)).czml_text(), text)
+            self.assertEqual(synthetic.load(50, date(2030, 1, 1)).czml(), json.loads(text))
+            shadow_ellipses.assert_not_called()
+        synthetic.load(50, date(2030, 1, 1)).json_text()
+        synthetic.load(50, date(2030, 1, 1)).json_text()
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (3, 2, 2))
+        self.assertEqual(stats['bytes'], len(text) + len(synthetic.load(50, date(2030, 1, 1)).json_text()))
+
+    # Windows and other options are cached separately
+    def test_Keys(self):
+        cache = outputcache.enable()
+        track = synthetic.load(50, date(2030, 1, 1))
+        whole = track.czml()
+        window = track.czml(start='10:10', end='10:20')
+        compact = track.czml(compact=True)
+        self.assertNotEqual(window, whole)
+        self.assertNotEqual(compact, whole)
+        self.assertEqual(cache.stats()['entries'], 3)
+        self.assertEqual(synthetic.load(50, date(2030, 1, 1)).czml(start='10:10', end='10:20'), window)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    # A track changed in place doesn't get the output cached for it as it was
+    def test_Modified(self):
+        outputcache.enable()
+        track = synthetic.load(50, date(2030, 1, 1))
+        document = track.czml()
+        track.sun_altitude = [10.0] * len(track.time)
+        changed = track.czml()
+        self.assertNotEqual(changed, document)
+        track.sun_altitude[0] = 20.0
+        self.assertNotEqual(track.czml(), changed)
+        outputcache.disable()
+        expected = synthetic.load(50, date(2030, 1, 1))
+        expected.sun_altitude = [10.0] * len(expected.time)
+        self.assertEqual(changed, expected.czml())
+
+    def test_Eviction(self):
+        cache = outputcache.OutputCache(maxsize=2)
+        for key in 'abc':
+            cache.put(key, key * 10)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'b' * 10)
+        cache.put('d', 'd')
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'evictions': 2, 'entries': 2, 'bytes': 11,
+                                         'hit_rate': 1 / 3})
+        cache = outputcache.OutputCache(maxbytes=25)
+        for key in 'abc':
+            cache.put(key, key * 10)
+        self.assertEqual(list(cache.entries), ['b', 'c'])
+        cache.clear()
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
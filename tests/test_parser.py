@@ -0,0 +1,145 @@
+import io, mmap, os, tempfile, unittest
+from datetime import date
+
+from eclipsescraper import parser
+from eclipsescraper.eclipsescraper import EclipseTrack
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class ParserTestCase(unittest.TestCase):
+
+    def page(self, name='SE2015Mar20Tpath.html'):
+        with open(os.path.join(DATA_DIR, name)) as f:
+            return f.read()
+
+    def expected(self, name='SE2015Mar20Tpath.html'):
+        track = EclipseTrack(date(2015, 3, 20))
+        track.loadFromRawHTML(self.page(name))
+        return track.data()
+
+    # Rows parsed from small chunks, a text stream or a string match loading the whole page
+    def test_Sources(self):
+        page = self.page()
+        chunks = (page[i:i+7] for i in range(0, len(page), 7))
+        for source in (chunks, io.StringIO(page), page, page.replace('\n', '\r\n')):
+            track = EclipseTrack(date(2015, 3, 20))
+            track.loadFromStream(source)
+            self.assertEqual(track.data(), self.expected())
+
+    # Rows are stored block by block as they are yielded, a block ending at each Limits row, and
+    # nothing past the closing Limits row is read
+    def test_Incremental(self):
+        page = self.page()
+        end = page.index('</pre>')
+        read = []
+        def chunks():
+            for i in range(0, len(page), 100):
+                read.append(i)
+                yield page[i:i+100]
+        track = EclipseTrack(date(2015, 3, 20))
+        rows = track.iter_rows(chunks())
+        first = next(rows)
+        self.assertEqual(first[0], 'Limits')
+        self.assertEqual(len(track.limits['north']), 1)
+        self.assertEqual(len(track.time), 0)
+        second = next(rows)
+        self.assertEqual(second[0], '09:18')
+        self.assertEqual(len(track.time), 29)
+        remaining = list(rows)
+        self.assertEqual(remaining[-1][0], 'Limits')
+        self.assertEqual(len(track.time), 29)
+        self.assertLess(read[-1], end)
+
+        track = EclipseTrack(date(2015, 3, 20))
+        rows = track.iter_rows(page, block=10)
+        next(rows)
+        next(rows)
+        self.assertEqual(len(track.time), 10)
+        self.assertEqual(len(list(rows)), 29)
+
+    def test_TableOnly(self):
+        page = self.page('SE2017Aug21Tpath.html')
+        table = page.partition('<pre>')[2].partition('</pre>')[0]
+        track = EclipseTrack(date(2017, 8, 21))
+        rows = list(track.iter_rows(table, html=False))
+        self.assertEqual([row[0] for row in rows], ['Limits', '16:50', '18:00', '20:00', 'Limits'])
+
+    def test_MissingTable(self):
+        track = EclipseTrack(date(2017, 8, 21))
+        with self.assertRaises(Exception):
+            track.loadFromStream(io.StringIO('<html><pre>  </pre></html>'))
+        with self.assertRaises(Exception):
+            track.loadFromStream(io.StringIO('<html>no table</html>'))
+
+    # Pages given as bytes-like objects or files parse like the decoded page
+    def test_Bytes(self):
+        with open(os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'), 'rb') as f:
+            data = f.read()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for source in (data, bytearray(data), memoryview(data), mapped):
+                track = EclipseTrack(date(2015, 3, 20))
+                track.loadFromBytes(source)
+                self.assertEqual(track.data(), self.expected())
+        finally:
+            mapped.close()
+
+        track = EclipseTrack(date(2015, 3, 20))
+        track.loadFromFile(os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))
+        expected = self.expected()
+        expected['url'] = os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html')
+        expected['type'] = 'total'
+        self.assertEqual(track.data(), expected)
+
+    # Only the <pre> block is decoded, so bytes elsewhere on the page don't matter
+    def test_PreSpan(self):
+        page = b'\xff\xfe<html><pre>table</pre>\xff</html>'
+        self.assertEqual(parser.pre_span(page), (13, 18))
+        self.assertEqual(parser.pre_span(memoryview(page)[2:]), (11, 16))
+        self.assertEqual(parser.pre_span(b'<pre>unclosed'), (5, 13))
+        self.assertEqual(parser.pre_span(b'no table'), (8, 8))
+        track = EclipseTrack(date(2015, 3, 20))
+        table = self.page().partition('<pre>')[2].partition('</pre>')[0].encode('utf-8')
+        track.loadFromBytes(b'\xff<pre>' + table + b'</pre>\xfe')
+        self.assertEqual(track.data(), self.expected())
+
+    def test_MissingTableBytes(self):
+        track = EclipseTrack(date(2017, 8, 21))
+        with self.assertRaises(Exception):
+            track.loadFromBytes(b'<html><pre>  </pre></html>')
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'SE2017Aug21Tpath.html')
+            open(path, 'wb').close()
+            with self.assertRaises(Exception):
+                track.loadFromFile(path)
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+
+    # Placeholders in numeric columns convert to None, like the per-row functions of a track
+    def test_Columns(self):
+        rows = [['12:00', '-', '-', '?', '?', '21', '04.6S', '-', '-', '-', '-', '-', '-', '-', '43', '-', '462', '02m12.3s'],
+                ['12:02', '41', '30.2N', '070', '12.5W', '40', '09.8N', '-', '-', '-', '-', '-', '-', '1.045', '44', '170', '-']]
+        track = EclipseTrack(date(2015, 3, 20))
+        for column in track.columns:
+            values = parser.convert(rows, [column])[0]
+            self.assertEqual(values, [getattr(track, column)(row) for row in rows])
+        self.assertEqual(parser.convert(rows, ['SouthLimitLat', 'NorthLimitLon', 'PathWidth']),
+                         [[-21.077, 40.163], [None, -70.208], [462.0, None]])
+        self.assertEqual(track.MSDiamRatio(rows[1]), 1.045)
+        self.assertEqual(track.CentralLineDuration(rows[1]), None)
+        # Large batches are converted with NumPy to the same values
+        self.assertEqual(parser.convert(rows * parser.BULK_ROWS, track.columns),
+                         [values * parser.BULK_ROWS for values in parser.convert(rows, track.columns)])
+
+    def test_UnknownColumn(self):
+        with self.assertRaises(Exception):
+            parser.convert([['12:00']], ['Time', 'Eclipticity'])
+        track = EclipseTrack(date(2015, 3, 20))
+        track.columns = track.columns + ['Eclipticity']
+        with self.assertRaises(Exception):
+            track.parse_row(['12:00'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json, os, random, tempfile, unittest
+
+from eclipsescraper import regions
+
+class RegionsTestCase(unittest.TestCase):
+
+    # The original getRegions() scan over bounding boxes, used as a reference
+    def reference(self, boxes, points):
+        active_regions = []
+        for region, region_range in boxes.items():
+            for position in points:
+                in_lat = region_range[0] < position[1] < region_range[1]
+                if region_range[2] == region_range[3]:
+                    in_lon = True
+                elif region_range[2] > region_range[3]:
+                    in_lon = region_range[2] < position[0] < 180 or -180 < position[0] < region_range[3]
+                else:
+                    in_lon = region_range[2] < position[0] < region_range[3]
+                if in_lat and in_lon:
+                    active_regions.append(region)
+                    break
+        return sorted(active_regions)
+
+    # Random tracks (including ones on region edges and the antimeridian) classify as before
+    def test_DefaultRegionsParity(self):
+        with open(regions.DEFAULT_REGIONS) as f:
+            boxes = {r['name']: r['box'] for r in json.load(f)['regions']}
+        classifier = regions.default_classifier()
+        rng = random.Random(1)
+        for i in range(300):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            points = []
+            for j in range(rng.randint(1, 40)):
+                lat = max(-90, min(90, lat + rng.uniform(-3, 3)))
+                lon = (lon + rng.uniform(0, 6) + 180) % 360 - 180
+                if rng.random() < 0.2:
+                    lat, lon = float(round(lat / 5) * 5), float(round(lon / 5) * 5)
+                points.append((lon, lat))
+            lons = [p[0] for p in points]
+            lats = [p[1] for p in points]
+            self.assertEqual(classifier.classify(lons, lats), self.reference(boxes, points))
+
+    def test_Polygons(self):
+        data = {'regions': [{'name': 'triangle', 'polygon': [[0, 0], [10, 0], [0, 10]]},
+                            {'name': 'square', 'polygon': [[20, 20], [30, 20], [30, 30], [20, 30]]}] +
+                           [{'name': 'box %d' % i, 'box': [i - 90, i - 89, -180, 180]} for i in range(180)]}
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(data, f)
+        try:
+            classifier = regions.RegionClassifier.load(f.name, cell_size=2.0)
+        finally:
+            os.remove(f.name)
+        self.assertEqual(classifier.classify([2, 25], [2.5, 25.5]), ['box 115', 'box 92', 'square', 'triangle'])
+        self.assertEqual(classifier.classify([8], [8.5]), ['box 98'])
+        self.assertEqual(classifier.classify([], []), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import json, os, unittest
+import http.client
+from datetime import date, datetime, timedelta, timezone
+
+from eclipsescraper.catalog import load_event
+from eclipsescraper.server import TrackStore, CZMLServer
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class WindowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.track = load_event(date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))
+
+    def test_TimeIndex(self):
+        index = self.track.time_index()
+        self.assertEqual(index[:2], [33480, 33600])
+        self.assertEqual(index, sorted(index))
+        self.assertEqual(self.track.index_seconds('2015-03-20T09:30:00Z'), 34200)
+        self.assertEqual(self.track.index_seconds('2015-03-21T00:00:00+00:00'), 86400)
+        self.assertEqual(self.track.index_seconds(datetime(2015, 3, 20, 9, 31)), 34260)
+        # Times with an offset are converted to UT
+        self.assertEqual(self.track.index_seconds('2015-03-20T10:30:00+01:00'), 34200)
+        self.assertEqual(self.track.index_seconds('2015-03-19T23:30:00-0230'), 7200)
+        self.assertEqual(self.track.index_seconds(datetime(2015, 3, 20, 10, 31, tzinfo=timezone(timedelta(hours=1)))), 34260)
+        self.assertEqual(self.track.window('2015-03-20T10:30:00+01:00', '2015-03-20T10:32:00+01:00').time, ['09:30', '09:32'])
+
+    def test_Window(self):
+        window = self.track.window('09:30', '2015-03-20T09:40:00Z')
+        self.assertEqual(window.time, ['09:30', '09:32', '09:34', '09:36', '09:38', '09:40'])
+        self.assertEqual(window.position['central'], self.track.position['central'][6:12])
+        self.assertEqual(window.sun_altitude, self.track.sun_altitude[6:12])
+        self.assertEqual(window.central_line_duration, self.track.central_line_duration[6:12])
+        self.assertEqual(len(self.track.window('09:31', '09:31:59').time), 0)
+        self.assertEqual(self.track.window().time, self.track.time)
+
+    def test_WindowCZML(self):
+        doc = self.track.czml(start='09:29', end='09:35')
+        self.assertEqual(doc[0]['clock']['interval'], '2015-03-20T09:30:00Z/2015-03-20T09:34:00Z')
+        self.assertEqual(doc[4]['ellipse']['rotation']['number'][0::2],
+                         ['2015-03-20T09:30:00Z', '2015-03-20T09:32:00Z', '2015-03-20T09:34:00Z'])
+        self.assertEqual(doc[4]['ellipse']['rotation']['number'], self.track.czml()[4]['ellipse']['rotation']['number'][12:18])
+        with self.assertRaises(Exception):
+            self.track.czml(start='11:00')
+
+    # Times of day before the first sample fall on the next day for tracks running past midnight
+    def test_Midnight(self):
+        track = load_event(date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html')).slice(0, 3)
+        track.time = ['23:58', '00:00', '00:02']
+        self.assertEqual(track.time_index(), [86280, 86400, 86520])
+        self.assertEqual(track.window('00:00', '00:05').time, ['00:00', '00:02'])
+
+class ServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CZMLServer(TrackStore.from_directory(DATA_DIR), port=0).start()
+        self.track = load_event(date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html'))
+
+    def tearDown(self):
+        self.server.shutdown()
+
+    def get(self, path):
+        host, port = self.server.server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port)
+        connection.request('GET', path)
+        response = connection.getresponse()
+        body = response.read().decode('utf-8')
+        connection.close()
+        return response, body
+
+    def test_Events(self):
+        response, body = self.get('/events')
+        self.assertEqual([event['iso'] for event in json.loads(body)], ['2015-03-20', '2017-08-21'])
+
+    def test_CZML(self):
+        response, body = self.get('/czml/2015-03-20')
+        self.assertEqual(response.getheader('Transfer-Encoding'), 'chunked')
+        self.assertEqual(json.loads(body), self.track.czml())
+        response, body = self.get('/czml/2015-03-20?start=09:30&end=09:40&compact=1&precision=2')
+        self.assertEqual(json.loads(body), self.track.czml(start='09:30', end='09:40', compact=True, precision=2))
+
+    def test_Errors(self):
+        self.assertEqual(self.get('/czml/2016-03-09')[0].status, 404)
+        self.assertEqual(self.get('/nothing')[0].status, 404)
+        self.assertEqual(self.get('/czml/2015-03-20?start=11:00')[0].status, 400)
+        self.assertEqual(self.get('/czml/2015-03-20?start=soon')[0].status, 400)
+
+    # Successive windows cover every sample exactly once
+    def test_Stream(self):
+        response, body = self.get('/stream/2015-03-20?window=600&start=09:20')
+        self.assertEqual(response.getheader('Content-Type'), 'text/event-stream')
+        events = [json.loads(event[len('data: '):]) for event in body.split('\n\n') if event]
+        self.assertEqual(events[0][0]['clock']['interval'], '2015-03-20T09:20:00Z/2015-03-20T10:14:00Z')
+        times = []
+        for packets in events[1:]:
+            self.assertEqual(len(packets), 4)
+            times += packets[3]['ellipse']['rotation']['number'][0::2]
+        self.assertEqual(len(events), 7)
+        self.assertEqual(times, [self.track.timestamp(t) for t in self.track.time[1:]])
+
+if __name__ == '__main__':
+    unittest.main()
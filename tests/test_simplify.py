@@ -0,0 +1,40 @@
+import io, json, unittest
+
+from eclipsescraper import simplify
+from tests.mirror import load_track
+
+class SimplifyTestCase(unittest.TestCase):
+
+    # Points along one great circle (the equator) reduce to the end points
+    def test_GreatCircle(self):
+        points = [(lon, 0.0) for lon in range(-20, 21, 2)]
+        self.assertEqual(simplify.simplify(points, 1.0), [(-20, 0.0), (20, 0.0)])
+        self.assertEqual(simplify.simplify(points, 0), points)
+        bent = points[:10] + [(0, 1.0)] + points[11:]
+        self.assertEqual(simplify.simplify(bent, 1000.0), [(-20, 0.0), (-2, 0.0), (0, 1.0), (2, 0.0), (20, 0.0)])
+        self.assertEqual(simplify.simplify(bent, 200000.0), [(-20, 0.0), (20, 0.0)])
+
+    def test_ErrorWithinTolerance(self):
+        track = load_track('SE2015Mar20Tpath.html').resample(10)
+        points = track.getPolyline('central')
+        for tolerance in (10, 100, 1000, 10000):
+            indexes = simplify.simplify_indexes(points, tolerance)
+            self.assertLess(len(indexes), len(points))
+            self.assertLessEqual(simplify.simplification_error(points, indexes), tolerance)
+
+    def test_Levels(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        levels = track.czmlLevels((None, 1000, 100000))
+        self.assertEqual(levels[None], track.czml())
+        sizes = [len(levels[t][2]['polyline']['positions']['cartographicDegrees']) for t in (None, 1000, 100000)]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertLess(sizes[2], sizes[0])
+        out = io.StringIO()
+        track.write_czml(out, tolerance=1000)
+        self.assertEqual(out.getvalue(), json.dumps(levels[1000]))
+        rows = simplify.report(track, (None, 1000))
+        self.assertEqual(rows[0]['max_error'], 0.0)
+        self.assertLessEqual(rows[1]['bytes'], rows[0]['bytes'])
+
+if __name__ == '__main__':
+    unittest.main()
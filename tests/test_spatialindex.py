@@ -0,0 +1,54 @@
+import os, tempfile, unittest
+from datetime import date
+
+from eclipsescraper.eclipsescraper import EclipseTrack
+from eclipsescraper.spatialindex import TrackIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+class SpatialIndexTestCase(unittest.TestCase):
+
+    events = [(date(2015, 3, 20), os.path.join(DATA_DIR, 'SE2015Mar20Tpath.html')),
+              (date(2017, 8, 21), os.path.join(DATA_DIR, 'SE2017Aug21Tpath.html'))]
+
+    # A synthetic track running east across the antimeridian
+    def antimeridian_track(self):
+        track = EclipseTrack(date(2030, 1, 1))
+        track.parse_row('10:00 10 00.0N 170 00.0E 08 00.0N 170 00.0E 09 00.0N 170 00.0E 1.01 50 100 200 03m00.0s'.split())
+        track.parse_row('10:10 10 00.0N 175 00.0W 08 00.0N 175 00.0W 09 00.0N 175 00.0W 1.01 50 100 200 03m00.0s'.split())
+        return track
+
+    def test_PointQuery(self):
+        index = TrackIndex.from_pages(self.events)
+        # Central line of 2017-08-21 between the 16:50 and 18:00 samples
+        hits = index.query_point(-130.0, 41.2)
+        self.assertEqual([hit['iso'] for hit in hits], ['2017-08-21'])
+        self.assertEqual(hits[0]['segments'], [('16:50', '18:00')])
+        self.assertEqual(hits[0]['type'], 'total')
+        # Faroe Islands, 2015-03-20
+        hits = index.query_point(-6.9, 62.0)
+        self.assertEqual([(hit['iso'], hit['segments']) for hit in hits], [('2015-03-20', [('09:40', '09:42')])])
+        self.assertEqual(index.query_point(-6.9, 62.0, start=date(2016, 1, 1)), [])
+        self.assertEqual(index.query_point(0.0, 0.0), [])
+
+    def test_Antimeridian(self):
+        index = TrackIndex.build([self.antimeridian_track()])
+        self.assertEqual(len(index.query_point(179.5, 9.0)), 1)
+        self.assertEqual(len(index.query_point(-179.5, 9.0)), 1)
+        self.assertEqual(index.query_point(-179.5, 12.0), [])
+        self.assertEqual(len(index.query_box(178.0, 0.0, -178.0, 20.0)), 1)
+        self.assertEqual(index.query_box(0.0, 0.0, 10.0, 20.0), [])
+
+    def test_BoxQueryAndPersistence(self):
+        index = TrackIndex.from_pages(self.events)
+        hits = index.query_box(-20.0, 55.0, 0.0, 70.0)
+        self.assertEqual([hit['iso'] for hit in hits], ['2015-03-20'])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.npz')
+            index.save(path)
+            loaded = TrackIndex.load(path)
+        self.assertEqual(loaded.query_box(-20.0, 55.0, 0.0, 70.0), hits)
+        self.assertEqual(loaded.query_point(-130.0, 41.2), index.query_point(-130.0, 41.2))
+
+if __name__ == '__main__':
+    unittest.main()
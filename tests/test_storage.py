@@ -0,0 +1,113 @@
+import json, unittest, tracemalloc
+
+from eclipsescraper import storage
+from eclipsescraper.eclipsescraper import EclipseTrack
+from tests.mirror import load_track
+
+# Bytes allocated while building the result of make()
+def allocated(make):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = make()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+class StorageTestCase(unittest.TestCase):
+
+    def test_TimeColumn(self):
+        times = ['09:18', '09:20:30', '23:59', 'bogus', None]
+        column = storage.TimeColumn(times)
+        self.assertEqual(list(column), times)
+        self.assertEqual(column[1], '09:20:30')
+        self.assertEqual(column[-2], 'bogus')
+        self.assertEqual(column[:2], times[:2])
+        self.assertEqual(list(column.values[:3]), [33480, 33630, 86340])
+
+    def test_DurationColumn(self):
+        durations = ['02m35.7s', '00m00.0s', None, '2m3s']
+        self.assertEqual(list(storage.DurationColumn(durations)), durations)
+
+    def test_PointColumn(self):
+        points = [(-7.5, 61.25), None, (170.0, -12.5)]
+        column = storage.PointColumn(points)
+        self.assertEqual(column, points)
+        self.assertEqual(column.array().shape, (3, 2))
+        self.assertEqual(column.array()[2].tolist(), [170.0, -12.5])
+
+    # Columns behave as mutable sequences and mix with lists
+    def test_Sequence(self):
+        column = storage.Column([1.5, None, 2.5])
+        self.assertEqual([0.5] + column, [0.5, 1.5, None, 2.5])
+        self.assertEqual(column + [3.5], [1.5, None, 2.5, 3.5])
+        self.assertEqual(column.index(2.5), 2)
+        self.assertIn(None, column)
+        column[1] = 'n/a'
+        column.insert(0, 0.5)
+        self.assertEqual(column.pop(), 2.5)
+        self.assertEqual(column, [0.5, 1.5, 'n/a'])
+        column[-2:] = [7.0]
+        del column[0]
+        self.assertEqual(column, [7.0])
+        self.assertEqual(json.dumps(storage.plain(column)), '[7.0]')
+
+        times = storage.TimeColumn(['09:18', '09:20'])
+        times[0] = '09:17:30'
+        times += ['09:22']
+        self.assertEqual(times, ['09:17:30', '09:20', '09:22'])
+        points = storage.PointColumn([(1.0, 2.0), None])
+        points[1] = (3.0, 4.0)
+        self.assertEqual(points.pop(0), (1.0, 2.0))
+        self.assertEqual(points.array().tolist(), [[3.0, 4.0]])
+
+    # Batches are encoded at once unless some value wouldn't come back exactly
+    def test_Extend(self):
+        for column_class, values in ((storage.Column, [1.5, None, 'n/a', 2]),
+                                     (storage.TimeColumn, ['09:18', '09:18:00', '24:00', None]),
+                                     (storage.DurationColumn, ['02m35.7s', '2m3s', None, '100m00.0s'])):
+            column = column_class(values[:1])
+            column.extend(values[1:])
+            self.assertEqual(column, values)
+            self.assertEqual(column_class(values), values)
+
+    # Changing a column in place resets the results derived from it
+    def test_Modified(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        ellipses = track.getShadowEllipses()
+        track.sun_altitude[0] = track.sun_altitude[0] / 2
+        self.assertAlmostEqual(track.getShadowEllipses()[0][2], ellipses[0][2] / 2, places=2)
+
+    # Columns read back exactly what was parsed, and data() hands out plain lists
+    def test_Track(self):
+        track = load_track('SE2015Mar20Tpath.html')
+        self.assertIsInstance(track.time, storage.TimeColumn)
+        self.assertEqual(track.time[0], '09:18')
+        self.assertEqual(track.position['central'][0], track.getPolyline('central')[0])
+        data = track.data()
+        self.assertIsInstance(data['time'], list)
+        self.assertIsInstance(data['position']['north'], list)
+        self.assertEqual(data['sun_altitude'], list(track.sun_altitude))
+        self.assertEqual(json.loads(str(track))['time'], data['time'])
+        with self.assertRaises(AttributeError):
+            track.extra = 1
+
+    # Compact columns take well under half the memory of the same waypoints held in lists
+    def test_BytesPerWaypoint(self):
+        track = load_track('SE2015Mar20Tpath.html').resample(1)
+        columns = ('time', 'position', 'ms_diam_ratio', 'sun_altitude', 'sun_azimuth', 'path_width', 'central_line_duration')
+        text = json.dumps(dict((attr, storage.plain(getattr(track, attr))) for attr in columns))
+
+        def compact():
+            copy = EclipseTrack(track.date)
+            for attr, values in json.loads(text).items():
+                setattr(copy, attr, values)
+            return copy
+
+        plain_bytes, plain = allocated(lambda: json.loads(text))
+        compact_bytes, copy = allocated(compact)
+        self.assertEqual(copy.time, plain['time'])
+        self.assertLess(compact_bytes, plain_bytes / 2)
+
+if __name__ == '__main__':
+    unittest.main()
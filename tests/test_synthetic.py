@@ -0,0 +1,27 @@
+import unittest
+
+from tests import synthetic
+
+class SyntheticTestCase(unittest.TestCase):
+
+    # Rows with a hyphen placeholder are dropped, both Limits rows are kept
+    def test_Rows(self):
+        track = synthetic.load(50, hyphens=3)
+        self.assertEqual(len(track.time), 44)
+        self.assertEqual(track.time[0], '10:03')
+        self.assertEqual(len(track.limits['north']), 2)
+        self.assertEqual(len(track.data()['position']['central']), 44)
+
+    def test_Antimeridian(self):
+        lons = [p[0] for p in synthetic.load(50).position['central']]
+        self.assertGreater(max(lons), 170)
+        self.assertLess(min(lons), -100)
+        self.assertTrue(any(a > 0 > b for a, b in zip(lons, lons[1:])))
+
+    def test_Seconds(self):
+        track = synthetic.load(20, step=15, hyphens=0)
+        self.assertEqual(track.time[:3], ['10:00', '10:00:15', '10:00:30'])
+        self.assertEqual(len(track.czml()), 5)
+
+if __name__ == '__main__':
+    unittest.main()